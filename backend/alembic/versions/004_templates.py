@@ -0,0 +1,78 @@
+"""Templates table with the built-in catalog
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    templates = op.create_table(
+        'templates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('prompt', sa.Text(), nullable=False),
+        sa.Column('is_premium', sa.Boolean(), nullable=True, server_default='false'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_templates_id'), 'templates', ['id'], unique=False)
+    op.create_index(op.f('ix_templates_type'), 'templates', ['type'], unique=False)
+
+    op.bulk_insert(templates, [
+        {
+            "name": "Professional Cover Letter",
+            "description": "Generate a professional cover letter tailored to the job",
+            "type": "cover_letter",
+            "category": "standard",
+            "is_premium": False,
+            "prompt": "Generate a professional cover letter based on the resume and job description provided.\n"
+                      "The cover letter should be compelling, personalized, and highlight relevant skills.",
+        },
+        {
+            "name": "LinkedIn Summary Generator",
+            "description": "Create an engaging LinkedIn profile summary",
+            "type": "linkedin",
+            "category": "standard",
+            "is_premium": False,
+            "prompt": "Create an engaging LinkedIn profile summary (2000 characters max) based on the resume.\n"
+                      "Make it professional, impactful, and highlight key achievements.",
+        },
+        {
+            "name": "ATS Optimization Pro",
+            "description": "Optimize resume for Applicant Tracking Systems",
+            "type": "ats_optimization",
+            "category": "premium",
+            "is_premium": True,
+            "prompt": "Optimize the following resume for Applicant Tracking Systems (ATS).\n"
+                      "Improve keyword density, formatting, and structure while maintaining all important information.",
+        },
+        {
+            "name": "Executive Summary",
+            "description": "Write an executive summary for your resume",
+            "type": "cover_letter",
+            "category": "premium",
+            "is_premium": True,
+            "prompt": "Write a concise executive summary for the top of the resume.\n"
+                      "Lead with scope of leadership and measurable business outcomes.",
+        },
+    ])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_templates_type'), table_name='templates')
+    op.drop_index(op.f('ix_templates_id'), table_name='templates')
+    op.drop_table('templates')
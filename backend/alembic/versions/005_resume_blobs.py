@@ -0,0 +1,42 @@
+"""Content-addressed resume blobs with reference counts
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'resume_blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('s3_key', sa.String(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('extracted_text', sa.Text(), nullable=True),
+        sa.Column('refcount', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+    op.add_column('resumes', sa.Column('blob_sha256', sa.String(length=64), nullable=True))
+    op.add_column('resumes', sa.Column('filename', sa.String(), nullable=True))
+    op.create_foreign_key('fk_resumes_blob_sha256', 'resumes', 'resume_blobs', ['blob_sha256'], ['sha256'])
+    op.create_index(op.f('ix_resumes_blob_sha256'), 'resumes', ['blob_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_resumes_blob_sha256'), table_name='resumes')
+    op.drop_constraint('fk_resumes_blob_sha256', 'resumes', type_='foreignkey')
+    op.drop_column('resumes', 'filename')
+    op.drop_column('resumes', 'blob_sha256')
+    op.drop_table('resume_blobs')
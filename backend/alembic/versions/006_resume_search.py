@@ -0,0 +1,42 @@
+"""Full-text and trigram search over resumes
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_resumes_user_id'), 'resumes', ['user_id'], unique=False)
+    op.add_column('users', sa.Column('is_recruiter', sa.Boolean(), nullable=True, server_default='false'))
+
+    # kept in step with extracted_text by Postgres itself; not mapped on the model
+    op.execute(
+        "ALTER TABLE resumes ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(extracted_text, ''))) STORED"
+    )
+    op.create_index('ix_resumes_search_vector', 'resumes', ['search_vector'], postgresql_using='gin')
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_resumes_extracted_text_trgm', 'resumes', ['extracted_text'],
+        postgresql_using='gin', postgresql_ops={'extracted_text': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resumes_extracted_text_trgm', table_name='resumes')
+    op.drop_index('ix_resumes_search_vector', table_name='resumes')
+    op.drop_column('resumes', 'search_vector')
+    op.drop_column('users', 'is_recruiter')
+    op.drop_index(op.f('ix_resumes_user_id'), table_name='resumes')
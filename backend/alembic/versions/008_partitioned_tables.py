@@ -0,0 +1,94 @@
+"""Monthly range-partitioned interview, payment and usage tables
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+TABLES = ('interview_sessions', 'payment_records', 'usage_events')
+
+
+def _month(offset: int) -> date:
+    today = datetime.now(timezone.utc).date()
+    index = today.year * 12 + today.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    # partition key must be part of the primary key; app.db.partitions maintains the partitions
+    partitioned = {'postgresql_partition_by': 'RANGE (created_at)'}
+
+    op.create_table(
+        'interview_sessions',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('role', sa.String(), nullable=True),
+        sa.Column('difficulty', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False, server_default='active'),
+        sa.Column('question_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        **partitioned
+    )
+    op.create_index('ix_interview_sessions_user_created', 'interview_sessions', ['user_id', 'created_at'])
+
+    op.create_table(
+        'payment_records',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('stripe_customer_id', sa.String(), nullable=True),
+        sa.Column('stripe_object_id', sa.String(), nullable=True),
+        sa.Column('plan', sa.String(), nullable=True),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False, server_default='usd'),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        **partitioned
+    )
+    op.create_index('ix_payment_records_status_created', 'payment_records', ['status', 'created_at'])
+    op.create_index('ix_payment_records_user_created', 'payment_records', ['user_id', 'created_at'])
+
+    op.create_table(
+        'usage_events',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('feature', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        **partitioned
+    )
+    op.create_index('ix_usage_events_feature_created', 'usage_events', ['feature', 'created_at'])
+    op.create_index('ix_usage_events_user_created', 'usage_events', ['user_id', 'created_at'])
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # last month through three months ahead; the beat task keeps creating them from here
+        for table in TABLES:
+            for offset in range(-1, 4):
+                start, end = _month(offset), _month(offset + 1)
+                op.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table}_p{start:%Y%m} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')"
+                )
+
+
+def downgrade() -> None:
+    # partitions are dropped with their parent
+    op.drop_table('usage_events')
+    op.drop_table('payment_records')
+    op.drop_table('interview_sessions')
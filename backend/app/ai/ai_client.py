@@ -1,23 +1,203 @@
-import os
-from typing import Any, Dict
+import asyncio
+import json
+import re
+import time
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+from opentelemetry.trace import Status, StatusCode
+
 from ..core.config import settings
+from ..core.metrics import observe_llm
+from ..core.tracing import tracer
+from .fake_provider import FakeProvider
+from .keywords import keyword_match
+from .prompt_budget import assemble, count_tokens
+from .resilience import LLMUnavailable, ResilientLLM
+
+if TYPE_CHECKING:
+    import httpx
+
+_WORD_RE = re.compile(r"\S+\s*")
+
+
+def _observe(span, prompt_id: str, provider: str, seconds: float, usage: Optional[Dict[str, int]]) -> None:
+    """Record an LLM call's latency and tokens as metrics and on its span."""
+    observe_llm(prompt_id, provider, seconds, usage)
+    if not span.is_recording():
+        return
+    span.set_attribute("llm.prompt_id", prompt_id)
+    span.set_attribute("llm.provider", provider)
+    if usage:
+        span.set_attribute("llm.prompt_tokens", usage.get("prompt_tokens", 0))
+        span.set_attribute("llm.completion_tokens", usage.get("completion_tokens", 0))
+
 
 class AIClient:
     def __init__(self):
         self.provider = settings.LLM_PROVIDER
-        # Initialize provider-specific clients (OpenAI, etc.)
+        self._http: Optional["httpx.AsyncClient"] = None
+        self._fake = FakeProvider() if self.provider == "fake" else None
+        self.resilience = ResilientLLM(self.provider, self._provider_call)
+
+    @property
+    def _live(self) -> bool:
+        return self.provider == "openai" and bool(settings.OPENAI_API_KEY)
+
+    def _client(self) -> "httpx.AsyncClient":
+        # one pooled client per process; keep-alive saves a TLS handshake per call
+        if self._http is None:
+            import httpx
+
+            self._http = httpx.AsyncClient(
+                base_url=settings.OPENAI_BASE_URL,
+                headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+                timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=5.0),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @staticmethod
+    def _payload(prompt: str, max_tokens: int, system: Optional[str], **extra: Any) -> Dict[str, Any]:
+        messages: List[Dict[str, str]] = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        return {"model": settings.OPENAI_MODEL, "messages": messages, "max_tokens": max_tokens, **extra}
+
+    def _simulated_text(self) -> str:
+        return "(simulated) response for prompt" if self.provider == "openai" else "(local fallback) response"
+
+    async def call(self, prompt: str, max_tokens: int = 512, system: Optional[str] = None,
+                   prompt_id: str = "adhoc") -> Dict[str, Any]:
+        """Complete ``prompt`` with hedging and circuit breaking (see ``resilience``).
+
+        ``prompt_id`` (a ``PROMPTS`` key, "template" or "adhoc") labels the call's metrics.
+
+        Raises:
+            LLMUnavailable: If the provider's circuit is open or it did not answer
+        """
+        with tracer.start_as_current_span("llm.call") as span:
+            start = time.perf_counter()
+            result = await self.resilience.call(prompt, max_tokens, system)
+            _observe(span, prompt_id, result["provider"], time.perf_counter() - start, result.get("usage"))
+        return result
+
+    async def _provider_call(self, prompt: str, max_tokens: int, system: Optional[str]) -> Dict[str, Any]:
+        if self._fake is not None:
+            return await self._fake(prompt, max_tokens, system)
+        if not self._live:
+            # no credentials (dev/tests): a simulated reply
+            text = self._simulated_text()
+            return {"text": text, "usage": self._usage(prompt, system, text)}
+
+        resp = await self._client().post("/chat/completions", json=self._payload(prompt, max_tokens, system))
+        resp.raise_for_status()
+        body = resp.json()
+        text = body["choices"][0]["message"]["content"] or ""
+        return {"text": text, "usage": body.get("usage") or self._usage(prompt, system, text)}
+
+    async def stream(self, prompt: str, max_tokens: int = 512, system: Optional[str] = None,
+                     prompt_id: str = "adhoc") -> AsyncIterator[Dict[str, Any]]:
+        """Yield ``{"text": chunk}`` events as the provider produces them, then one ``{"usage": {...}}``.
+
+        Chunks are pulled from the provider connection only as fast as the
+        consumer takes them. Closing or cancelling the iterator closes the
+        upstream connection, which aborts generation at the provider.
+
+        Raises:
+            LLMUnavailable: If the provider's circuit is open
+        """
+        # not made current: the span outlives each resumption of this generator
+        span = tracer.start_span("llm.stream")
+        try:
+            async with aclosing(self._stream(prompt, max_tokens, system, prompt_id, span)) as events:
+                async for event in events:
+                    yield event
+        except Exception as e:
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR))
+            raise
+        finally:
+            span.end()
+
+    async def _stream(self, prompt: str, max_tokens: int, system: Optional[str],
+                      prompt_id: str, span) -> AsyncIterator[Dict[str, Any]]:
+        breaker = self.resilience.breaker
+        began = time.perf_counter()
+        provider, text = self.provider, None
+        if not self._live:
+            text = self._simulated_text()
+        elif not breaker.allow():
+            self.resilience.counts["short_circuits"] += 1
+            self.resilience.counts["unavailable"] += 1
+            raise LLMUnavailable(f"LLM provider {self.provider} is unavailable")
+        if text is not None:
+            for word in _WORD_RE.findall(text):
+                yield {"text": word}
+                await asyncio.sleep(0)
+            usage = self._usage(prompt, system, text)
+            _observe(span, prompt_id, provider, time.perf_counter() - began, usage)
+            yield {"usage": usage}
+            return
+
+        payload = self._payload(prompt, max_tokens, system, stream=True, stream_options={"include_usage": True})
+        parts: List[str] = []
+        usage = None
+        start = time.monotonic()
+        recorded = False
+        try:
+            async with self._client().stream("POST", "/chat/completions", json=payload) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    usage = chunk.get("usage") or usage
+                    for choice in chunk.get("choices") or ():
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            parts.append(content)
+                            yield {"text": content}
+        except Exception:
+            breaker.record(False, time.monotonic() - start)
+            recorded = True
+            raise
+        finally:
+            if not recorded:
+                # completed normally, or the client went away (no verdict on the provider)
+                if usage is not None or parts:
+                    breaker.record(True, time.monotonic() - start)
+                else:
+                    breaker.abandon()
+        usage = usage or self._usage(prompt, system, "".join(parts))
+        _observe(span, prompt_id, provider, time.perf_counter() - began, usage)
+        yield {"usage": usage}
 
-    async def call(self, prompt: str, max_tokens: int = 512) -> Dict[str, Any]:
-        # Simple abstraction — in production implement provider selection
-        if self.provider == "openai":
-            # use OPENAI_API_KEY and call OpenAI's API
-            return {"text": "(simulated) response for prompt"}
-        else:
-            # fallback local model or simulated
-            return {"text": "(local fallback) response"}
+    @staticmethod
+    def _usage(prompt: str, system: Optional[str], completion: str) -> Dict[str, int]:
+        """Token usage counted locally (used when the provider doesn't report it)."""
+        prompt_tokens = count_tokens(prompt) + count_tokens(system or "")
+        completion_tokens = count_tokens(completion)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
 
     async def ats_score(self, resume_text: str, job_text: str) -> Dict[str, Any]:
-        prompt = f"Score this resume against job description and list missing keywords:\nJob:\n{job_text}\nResume:\n{resume_text}"
-        return await self.call(prompt)
+        """The model's ATS assessment, or keyword coverage marked ``"degraded": True`` if no model answered."""
+        prompt = assemble("ats_v1", job=job_text, resume=resume_text)
+        try:
+            return await self.call(prompt.text, system=prompt.system, prompt_id=prompt.prompt_id)
+        except LLMUnavailable:
+            match = keyword_match(resume_text, job_text)
+            text = json.dumps({**match.as_dict(), "suggested_bullets": []})
+            return {"text": text, "provider": "keywords", "degraded": True, "usage": {}}
 
 ai_client = AIClient()
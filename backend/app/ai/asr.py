@@ -0,0 +1,60 @@
+"""Speech recognition engines with a streaming interface.
+
+An engine opens one ``stream()`` per spoken answer. Audio chunks are fed in
+recording order; ``feed`` returns the words the engine has settled on so
+far and ``close`` returns the rest once the recording ends. A word cut in
+two by a chunk boundary is only returned once it is complete.
+
+``ASR_ENGINE=fake`` is the only engine. It treats audio as UTF-8 text and
+sleeps ``ASR_FAKE_LATENCY_SECONDS`` per chunk, standing in for a real
+recognizer in development, tests and benchmarks. With ``ASR_ENGINE`` unset
+there is no engine and voice answers are turned off.
+"""
+
+import asyncio
+import re
+
+from ..core.config import settings
+
+
+class FakeAsrStream:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self._pending = ""
+
+    async def feed(self, audio: bytes) -> str:
+        await asyncio.sleep(self.latency)
+        # a trailing partial word waits for the next chunk
+        text = self._pending + audio.decode("utf-8", errors="ignore")
+        settled, self._pending = re.match(r"(.*\s)?(\S*)$", text, re.DOTALL).groups("")
+        return settled.strip()
+
+    async def close(self) -> str:
+        pending, self._pending = self._pending, ""
+        return pending.strip()
+
+
+class FakeAsr:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def stream(self) -> FakeAsrStream:
+        return FakeAsrStream(self.latency)
+
+    async def transcribe(self, audio: bytes) -> str:
+        """Transcript of a complete recording."""
+        stream = self.stream()
+        return " ".join(t for t in (await stream.feed(audio), await stream.close()) if t)
+
+
+def get_asr():
+    """The configured engine, or None (voice answers off) if ``ASR_ENGINE`` is unset.
+
+    Raises:
+        ValueError: If ``ASR_ENGINE`` names anything but "fake", the only engine
+    """
+    if not settings.ASR_ENGINE:
+        return None
+    if settings.ASR_ENGINE == "fake":
+        return FakeAsr(settings.ASR_FAKE_LATENCY_SECONDS)
+    raise ValueError(f"Unknown ASR_ENGINE {settings.ASR_ENGINE!r}")
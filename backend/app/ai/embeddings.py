@@ -0,0 +1,367 @@
+"""Semantic embeddings and nearest-neighbour search for resumes and jobs.
+
+Embedders turn text into L2-normalised float32 vectors, so cosine similarity
+is a dot product:
+
+- ``HashingEmbedder``: deterministic feature hashing of terms and term
+  bigrams. No model download, stable across processes; the default and the
+  one tests use.
+- ``SentenceTransformerEmbedder``: a local CPU model, used when
+  ``EMBEDDING_BACKEND=sentence-transformers`` and the optional
+  ``sentence-transformers`` package is installed.
+
+``VectorIndex`` stores one namespace ("resumes", "jobs") as a memory-mapped
+float32 matrix plus an id array on disk. Queries are an exact matrix-vector
+product (BLAS) while the corpus is small. Above ``EMBEDDING_ANN_THRESHOLD``
+rows they go through an approximate index: HNSW via the optional
+``hnswlib`` package, else a built-in IVF (k-means coarse quantiser).
+Removed items keep their row, zeroed and with the id ``REMOVED``, and are
+never returned.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REMOVED = -1  # id of a removed item's row; rows are never reused
+
+_TERM_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+class HashingEmbedder:
+    """Signed feature hashing of unigrams and bigrams with log-scaled tf."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+        return h % self.dim, (1.0 if (h >> 63) & 1 else -1.0)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _TERM_RE.findall(text.lower())
+            counts: Dict[str, int] = {}
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                counts[feature] = counts.get(feature, 0) + 1
+            for feature, n in counts.items():
+                idx, sign = self._bucket(feature)
+                out[row, idx] += sign * (1.0 + math.log(n))
+        return normalize(out)
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU sentence-embedding model (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=32, convert_to_numpy=True)
+        return normalize(vectors.astype(np.float32, copy=False))
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+_embedder = None
+
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        if settings.EMBEDDING_BACKEND == "sentence-transformers":
+            _embedder = SentenceTransformerEmbedder(settings.EMBEDDING_MODEL)
+        else:
+            _embedder = HashingEmbedder(settings.EMBEDDING_DIM)
+        logger.info(f"✅ Embedding backend: {type(_embedder).__name__} (dim={_embedder.dim})")
+    return _embedder
+
+
+class IVFIndex:
+    """Inverted-file ANN index: vectors are bucketed by nearest k-means centroid
+    and a query scans only the ``nprobe`` closest buckets."""
+
+    def __init__(self, vectors: np.ndarray, nlist: Optional[int] = None, iterations: int = 10, seed: int = 0):
+        n = len(vectors)
+        self.nlist = nlist or max(1, int(math.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, size=min(n, self.nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=self.nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(self.nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = normalize(centroids)
+        self.centroids = centroids
+        assign = self._assign(vectors)
+        order = np.argsort(assign, kind="stable")
+        self.rows = order.astype(np.int64)
+        self.offsets = np.searchsorted(assign[order], np.arange(self.nlist + 1))
+
+    def _assign(self, vectors: np.ndarray, chunk: int = 65536) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(vectors[i:i + chunk] @ self.centroids.T, axis=1)
+            for i in range(0, len(vectors), chunk)
+        ])
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        probes = np.argpartition(-(self.centroids @ query), min(nprobe, self.nlist) - 1)[:nprobe]
+        return np.concatenate([self.rows[self.offsets[c]:self.offsets[c + 1]] for c in probes])
+
+
+class VectorIndex:
+    """Append/upsert/remove vector store for one namespace, backed by memory-mapped files.
+
+    API workers and the indexing task write the same files, so writes hold
+    an exclusive ``flock`` on ``index.lock`` and first catch up with rows
+    other processes appended.
+    """
+
+    def __init__(self, directory: str, dim: int, ann_threshold: int = settings.EMBEDDING_ANN_THRESHOLD,
+                 nprobe: int = settings.EMBEDDING_IVF_NPROBE):
+        self.directory = directory
+        self.dim = dim
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._count = 0
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._ids: Optional[np.memmap] = None
+        self._row_of: Dict[int, int] = {}
+        self._ann = None
+        self._ann_count = 0
+        self._ann_building = False
+        self._meta_mtime = None
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, self._file_lock():
+            if os.path.exists(self._path("meta.json")):
+                self._sync()
+            else:
+                self._open(1024)
+                self._write_meta()
+
+    # --- storage -------------------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive across processes; the thread lock covers this process."""
+        with open(self._path("index.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _open(self, capacity: int) -> None:
+        mode = "r+" if os.path.exists(self._path("vectors.f32")) else "w+"
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode=mode, shape=(capacity, self.dim))
+        self._ids = np.memmap(self._path("ids.i64"), dtype=np.int64, mode=mode, shape=(capacity,))
+        self._capacity = capacity
+
+    def _sync(self) -> None:
+        """Catch up with ``meta.json``: remap if the files grew, learn appended rows."""
+        meta_path = self._path("meta.json")
+        mtime = os.path.getmtime(meta_path)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim:
+            raise ValueError(f"Index at {self.directory} has dim {meta['dim']}, expected {self.dim}")
+        if meta["capacity"] != self._capacity:
+            self._open(meta["capacity"])
+        for row in range(self._count, meta["count"]):  # rows are append-only
+            self._row_of[int(self._ids[row])] = row
+        self._count = meta["count"]
+        self._meta_mtime = mtime
+
+    def _write_meta(self) -> None:
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "count": self._count, "capacity": self._capacity}, f)
+        os.replace(tmp, self._path("meta.json"))
+        self._meta_mtime = os.path.getmtime(self._path("meta.json"))
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._vectors.flush()
+        self._ids.flush()
+        for name, itemsize in (("vectors.f32", 4 * self.dim), ("ids.i64", 8)):
+            with open(self._path(name), "r+b") as f:
+                f.truncate(capacity * itemsize)
+        self._open(capacity)  # searches still holding the old maps keep them valid
+
+    def refresh(self) -> None:
+        """Pick up rows written by another process (e.g. the indexing worker)."""
+        meta_path = self._path("meta.json")
+        if os.path.exists(meta_path) and os.path.getmtime(meta_path) != self._meta_mtime:
+            with self._lock:
+                self._sync()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def upsert(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        with self._lock, self._file_lock():
+            self._sync()  # another process may have appended since we last looked
+            new = [i for i in dict.fromkeys(ids) if i not in self._row_of]
+            if self._count + len(new) > self._capacity:
+                self._grow(self._count + len(new))
+            for item_id, vector in zip(ids, vectors):
+                row = self._row_of.get(item_id)
+                if row is None:
+                    row = self._row_of[item_id] = self._count
+                    self._count += 1
+                self._ids[row] = item_id
+                self._vectors[row] = vector
+            self._vectors.flush()
+            self._ids.flush()
+            self._write_meta()
+
+    def remove(self, ids: Sequence[int]) -> None:
+        """Drop items. Other processes stop returning them at once (the id
+        array is shared); their rows stay, zeroed, so row numbers never move."""
+        with self._lock, self._file_lock():
+            self._sync()
+            for item_id in ids:
+                row = self._row_of.pop(item_id, None)
+                if row is not None:
+                    self._ids[row] = REMOVED
+                    self._vectors[row] = 0
+            self._vectors.flush()
+            self._ids.flush()
+
+    # --- search --------------------------------------------------------------
+
+    def _build_ann(self, data: np.ndarray):
+        try:
+            import hnswlib
+        except ImportError:
+            return IVFIndex(data)
+        ann = hnswlib.Index(space="ip", dim=self.dim)
+        ann.init_index(max_elements=len(data), ef_construction=200, M=16)
+        ann.add_items(data, np.arange(len(data)))
+        ann.set_ef(max(64, self.nprobe * 4))
+        return ann
+
+    def _current_ann(self):
+        """The ANN index and the row count it covers, or ``(None, 0)`` while the
+        first one is being built.
+
+        It is rebuilt once the corpus has grown 20% past the last build. The
+        build runs outside the lock, so searches keep using the previous index
+        (or an exact scan) meanwhile, and only one thread builds at a time.
+        """
+        with self._lock:
+            n, ann, built = self._count, self._ann, self._ann_count
+            if (ann is not None and n <= built * 1.2) or self._ann_building:
+                return ann, built
+            self._ann_building = True
+            data = self._vectors[:n]
+        try:
+            ann = self._build_ann(np.asarray(data))
+            with self._lock:
+                self._ann, self._ann_count = ann, n
+        finally:
+            self._ann_building = False
+        return ann, n
+
+    def search(self, query: np.ndarray, k: int = 10, exact: Optional[bool] = None,
+               exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Top-k (id, cosine similarity) for a normalised query vector."""
+        query = np.asarray(query, dtype=np.float32)  # a float64 query would upcast the whole matrix
+        ann, built = None, 0
+        if not (exact if exact is not None else self._count <= self.ann_threshold):
+            ann, built = self._current_ann()
+        with self._lock:
+            # rows are append-only and the maps outlive a grow, so views taken here stay valid
+            n = self._count
+            matrix, ids = self._vectors[:n], self._ids[:n]
+        if n == 0:
+            return []
+        k_eff = min(k + (exclude is not None), n)
+        if ann is None:
+            row_ids, scores = ids, matrix @ query
+        else:
+            if isinstance(ann, IVFIndex):
+                rows = ann.candidates(query, self.nprobe)
+            else:
+                labels, _ = ann.knn_query(query, k=min(k_eff, built))
+                rows = labels[0].astype(np.int64)
+            rows = np.concatenate([rows, np.arange(built, n)])  # plus rows added since the build
+            # score only the candidates, not a buffer over the whole corpus
+            row_ids, scores = ids[rows], matrix[rows] @ query
+        scores[row_ids == REMOVED] = -np.inf
+        top = np.argpartition(-scores, min(k_eff, len(scores)) - 1)[:k_eff]
+        top = top[np.argsort(-scores[top])]
+        results = [(int(row_ids[t]), float(scores[t])) for t in top]
+        return [r for r in results if r[0] != exclude and r[0] != REMOVED][:k]
+
+    def vector(self, item_id: int) -> Optional[np.ndarray]:
+        row = self._row_of.get(item_id)
+        if row is None or self._ids[row] != item_id:  # removed by another process
+            return None
+        return np.array(self._vectors[row])
+
+
+_indexes: Dict[str, VectorIndex] = {}
+
+
+def get_index(namespace: str) -> VectorIndex:
+    """Process-wide index for a namespace ("resumes", "jobs")."""
+    index = _indexes.get(namespace)
+    if index is None:
+        index = _indexes[namespace] = VectorIndex(
+            os.path.join(settings.EMBEDDING_INDEX_DIR, namespace), get_embedder().dim
+        )
+    else:
+        index.refresh()
+    return index
+
+
+def index_texts(namespace: str, items: Dict[int, str]) -> None:
+    """Embed and upsert ``{id: text}`` into a namespace."""
+    if items:
+        ids = list(items)
+        get_index(namespace).upsert(ids, get_embedder().embed([items[i] for i in ids]))
+
+
+def nearest(namespace: str, text: str, k: int = 10) -> List[Tuple[int, float]]:
+    return get_index(namespace).search(get_embedder().embed([text])[0], k)
+
+
+def similar(namespace: str, item_id: int, text: str, k: int = 10) -> List[Tuple[int, float]]:
+    """Nearest neighbours of an item, indexing it first if it is missing."""
+    index = get_index(namespace)
+    vector = index.vector(item_id)
+    if vector is None:
+        vector = get_embedder().embed([text])[0]
+        index.upsert([item_id], vector[None, :])
+    return index.search(vector, k, exclude=item_id)
@@ -0,0 +1,57 @@
+"""Local fake LLM provider with injectable latency and failures.
+
+Used by the resilience tests and for load-testing without provider
+credentials (``LLM_PROVIDER=fake``). Latency, jitter, error rate and the
+rate of pathologically slow responses are all configurable and seeded, so
+fault-injection scenarios are reproducible.
+"""
+
+import asyncio
+import random
+from typing import Any, Dict, Optional
+
+from .prompt_budget import count_tokens
+
+
+class ProviderError(Exception):
+    """Injected provider failure (stands in for a 5xx or a reset connection)."""
+
+
+class FakeProvider:
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 5.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self, prompt: str, max_tokens: int = 512, system: Optional[str] = None) -> Dict[str, Any]:
+        self.calls += 1
+        slow = self.rng.random() < self.slow_rate
+        fail = self.rng.random() < self.error_rate
+        delay = self.slow_latency if slow else max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if fail:
+            raise ProviderError("injected provider error")
+        text = "(fake) response for prompt"
+        prompt_tokens = count_tokens(prompt) + count_tokens(system or "")
+        return {
+            "text": text,
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": count_tokens(text),
+                      "total_tokens": prompt_tokens + count_tokens(text)},
+        }
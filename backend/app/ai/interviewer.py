@@ -0,0 +1,149 @@
+"""Mock interview sessions: questions and streamed answer evaluation.
+
+Session state lives in ``interview_sessions`` rather than in a worker, so
+the HTTP endpoints and the WebSocket channel (``/interview/session/{id}/ws``)
+can be served by any API worker.
+
+Everything the channel tells the client is published on
+``interview_fanout`` under the session id. The worker holding the socket
+relays it, whichever process produced it:
+
+- ``question``              ``{"question": {"id", "text"}}``
+- ``evaluation.started``    ``{"question_id"}``
+- ``feedback.delta``        ``{"question_id", "text"}`` per LLM chunk
+- ``evaluation.completed``  ``{"question_id", "score", "feedback"}``
+- ``evaluation.failed``     ``{"question_id", "detail"}``
+- ``transcript.partial``    ``{"question_id", "text"}`` while a voice answer is recorded
+- ``evaluation.partial``    ``{"question_id", "score", "words"}`` provisional voice scores
+
+Voice answers are scored while they are spoken; see ``app.ai.voice``.
+
+Evaluation runs as a task in the worker that received the answer, or in
+Celery (``app.tasks.evaluate_interview_answer``) when
+``INTERVIEW_EVAL_IN_CELERY`` is set and Redis is there to carry its events.
+"""
+
+import asyncio
+import json
+import logging
+import re
+from typing import Optional, Set, Tuple
+
+from sqlalchemy import insert, select, update
+
+from ..core.config import settings
+from ..core.fanout import interview_fanout
+from ..core.redis_client import get_redis
+from ..db.database import engine
+from ..db.models import InterviewSession
+from .ai_client import ai_client
+from .prompt_budget import assemble
+
+logger = logging.getLogger(__name__)
+
+_tasks: Set[asyncio.Task] = set()
+
+
+async def create_session(role: Optional[str], difficulty: Optional[str], user_id: Optional[int] = None) -> str:
+    async with engine.begin() as conn:
+        result = await conn.execute(insert(InterviewSession).values(user_id=user_id, role=role, difficulty=difficulty))
+    return result.inserted_primary_key[0]
+
+
+async def get_session(session_id: str):
+    async with engine.connect() as conn:
+        return (await conn.execute(select(InterviewSession).where(InterviewSession.id == session_id))).first()
+
+
+def question_for(session, index: int) -> dict:
+    """The session's ``index``-th question (the same placeholder text the HTTP endpoints have always served)."""
+    return {"id": f"q{index}", "text": f"Sample question for role {session.role} (difficulty {session.difficulty})"}
+
+
+def question_index(question_id: str) -> Optional[int]:
+    match = re.fullmatch(r"q(\d+)", question_id or "")
+    return int(match.group(1)) if match else None
+
+
+async def issued_question(session_id: str, question_id: str) -> Optional[dict]:
+    """The question ``question_id`` if the session has already asked it, else None."""
+    index = question_index(question_id)
+    session = await get_session(session_id) if index is not None else None
+    if session is None or index >= session.question_count:
+        return None
+    return question_for(session, index)
+
+
+async def next_question(session_id: str) -> Optional[dict]:
+    """Advance the session and return its next question, or None if there is no such session."""
+    async with engine.begin() as conn:
+        advanced = await conn.execute(
+            update(InterviewSession)
+            .where(InterviewSession.id == session_id)
+            .values(question_count=InterviewSession.question_count + 1)
+        )
+        if not advanced.rowcount:
+            return None
+        session = (await conn.execute(select(InterviewSession).where(InterviewSession.id == session_id))).one()
+    return question_for(session, session.question_count - 1)
+
+
+def parse_score(feedback: str) -> Optional[float]:
+    """The 0-100 score from an ``eval_v1`` reply: its JSON ``score``, else the first number."""
+    try:
+        score = json.loads(feedback).get("score")
+    except (ValueError, AttributeError):
+        match = re.search(r"\b(\d{1,3}(?:\.\d+)?)\b", feedback)
+        score = match.group(1) if match else None
+    try:
+        return min(max(float(score), 0.0), 100.0) if score is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+async def score_answer(question: str, answer: str) -> Tuple[Optional[float], str]:
+    """(score, feedback) for an answer from one non-streamed ``eval_v1`` call."""
+    prompt = assemble("eval_v1", question=question, answer=answer)
+    result = await ai_client.call(prompt.text, system=prompt.system, prompt_id=prompt.prompt_id)
+    return parse_score(result["text"]), result["text"]
+
+
+async def evaluate_answer(session_id: str, question_id: str, question: str, answer: str) -> Optional[float]:
+    """Evaluate an answer with ``eval_v1``, publishing the feedback as it streams."""
+    publish = interview_fanout.publish
+    await publish(session_id, {"type": "evaluation.started", "question_id": question_id})
+    prompt = assemble("eval_v1", question=question, answer=answer)
+    parts = []
+    try:
+        async for chunk in ai_client.stream(prompt.text, system=prompt.system, prompt_id=prompt.prompt_id):
+            if "text" in chunk:
+                parts.append(chunk["text"])
+                await publish(session_id, {"type": "feedback.delta", "question_id": question_id,
+                                           "text": chunk["text"]})
+    except Exception as e:
+        logger.error(f"❌ Evaluation of {session_id}/{question_id} failed: {e}")
+        await publish(session_id, {"type": "evaluation.failed", "question_id": question_id,
+                                   "detail": "Evaluation failed"})
+        return None
+    feedback = "".join(parts)
+    score = parse_score(feedback)
+    await publish(session_id, {"type": "evaluation.completed", "question_id": question_id,
+                               "score": score, "feedback": feedback})
+    return score
+
+
+async def dispatch_evaluation(session_id: str, question_id: str, question: str, answer: str) -> None:
+    """Start ``evaluate_answer`` in Celery or in this worker; its events arrive on the fan-out."""
+    if settings.INTERVIEW_EVAL_IN_CELERY and get_redis() is not None:
+        from ..tasks import evaluate_interview_answer  # celery: loaded on first use, not at startup
+
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, evaluate_interview_answer.delay, session_id, question_id,
+                                       question, answer)
+            return
+        except Exception as e:
+            logger.warning(f"⚠️  Could not enqueue evaluation, running it here: {e}")
+    task = asyncio.create_task(evaluate_answer(session_id, question_id, question, answer))
+    _tasks.add(task)  # keep a reference until it finishes
+    task.add_done_callback(_tasks.discard)
@@ -0,0 +1,191 @@
+"""Compact term data for keyword extraction and local ATS scoring.
+
+Terms are interned once in a process-wide ``Vocabulary`` and represented
+by int ids from then on. A document becomes a ``TermVector``: sorted ids in
+an ``array('I')`` and their weights in an ``array('f')``. That is 8 bytes
+per distinct term, against a str object plus a dict slot per occurrence
+for lists of strings. Membership is a binary search over the sorted ids.
+
+The vocabulary is capped at ``VOCAB_MAX_TERMS`` so arbitrary user text
+cannot grow it without bound. Once it is full, new terms get ids above
+the cap from a ``Scratch`` mapping that belongs to one call and is dropped
+with it.
+
+``array`` rather than NumPy keeps these modules importable at startup
+without loading NumPy (see ``benchmarks/bench_startup.py``).
+"""
+
+import re
+import sys
+import threading
+from array import array
+from math import log
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from ..core.config import settings
+
+_WORD_RE = re.compile(r"\S+")
+_TERM_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+STOPWORDS = frozenset(
+    "a about above after all also an and any are as at be been being both but by can could did do does "
+    "for from had has have having he her here his how i if in into is it its just may more most must "
+    "no not of on or our out over own per she should so some such than that the their them then there "
+    "these they this those through to too under up us very was we were what when where which while who "
+    "will with within would you your".split()
+)
+
+
+class Vocabulary:
+    """Term <-> id mapping shared by every request in the process."""
+
+    def __init__(self, max_terms: int):
+        self.max_terms = max_terms
+        self._ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def id(self, term: str, scratch: "Scratch") -> int:
+        term_id = self._ids.get(term)
+        if term_id is not None:
+            return term_id
+        with self._lock:
+            term_id = self._ids.get(term)
+            if term_id is None and len(self._terms) < self.max_terms:
+                term = sys.intern(term)
+                term_id = self._ids[term] = len(self._terms)
+                self._terms.append(term)
+        return term_id if term_id is not None else scratch.id(term)
+
+    def term(self, term_id: int, scratch: "Scratch") -> str:
+        if term_id < len(self._terms):
+            return self._terms[term_id]
+        return scratch.terms[term_id - self.max_terms]
+
+
+class Scratch:
+    """Ids above the vocabulary cap for terms seen only in this call."""
+
+    __slots__ = ("base", "ids", "terms")
+
+    def __init__(self, vocabulary: Vocabulary):
+        self.base = vocabulary.max_terms
+        self.ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+    def id(self, term: str) -> int:
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = self.ids[term] = self.base + len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+
+vocabulary = Vocabulary(settings.VOCAB_MAX_TERMS)
+
+
+def iter_terms(text: str) -> Iterator[str]:
+    """Lowercased terms of ``text``, stopwords and single characters skipped."""
+    for match in _TERM_RE.finditer(text.lower()):
+        term = match.group().rstrip(".")
+        if len(term) > 1 and term not in STOPWORDS:
+            yield term
+
+
+class TermVector:
+    """Sparse log-tf weights of a document, ids ascending."""
+
+    __slots__ = ("ids", "weights")
+
+    def __init__(self, ids: array, weights: array):
+        self.ids = ids
+        self.weights = weights
+
+    @classmethod
+    def from_terms(cls, terms: Iterable[str], scratch: Scratch) -> "TermVector":
+        counts: Dict[int, int] = {}
+        for term in terms:
+            term_id = vocabulary.id(term, scratch)
+            counts[term_id] = counts.get(term_id, 0) + 1
+        ids = array("I", sorted(counts))
+        return cls(ids, array("f", (1.0 + log(counts[i]) for i in ids)))
+
+    @classmethod
+    def from_text(cls, text: str, scratch: Scratch) -> "TermVector":
+        return cls.from_terms(iter_terms(text), scratch)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, term_id: int) -> bool:
+        ids = self.ids
+        lo, hi = 0, len(ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ids[mid] < term_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < len(ids) and ids[lo] == term_id
+
+    def top(self, limit: int) -> List[Tuple[int, float]]:
+        """The ``limit`` heaviest (id, weight) pairs, heaviest first; ties by id."""
+        return sorted(zip(self.ids, self.weights), key=lambda p: (-p[1], p[0]))[:limit]
+
+
+class KeywordMatch:
+    """How well a resume covers a job's keywords."""
+
+    __slots__ = ("score", "matched", "missing")
+
+    def __init__(self, score: float, matched: List[str], missing: List[str]):
+        self.score = score
+        self.matched = matched
+        self.missing = missing
+
+    def as_dict(self) -> dict:
+        return {"score": self.score, "matched_keywords": self.matched, "missing_keywords": self.missing}
+
+
+def extract_keywords(text: str, limit: int = 50) -> List[str]:
+    """Distinct words among the first ``limit`` longer than three characters, in order.
+
+    Words are read lazily, so a long posting is only scanned as far as needed.
+    They are raw, case-sensitive tokens that live only as long as the result,
+    so they stay out of the shared vocabulary.
+    """
+    seen = set()
+    keywords = []
+    taken = 0
+    for match in _WORD_RE.finditer(text):
+        if taken == limit:
+            break
+        word = match.group()
+        if len(word) <= 3:
+            continue
+        taken += 1
+        word = word.strip(".,")
+        if word not in seen:
+            seen.add(word)
+            keywords.append(word)
+    return keywords
+
+
+def keyword_match(resume_text: str, job_text: str, limit: int = 50) -> KeywordMatch:
+    """Score (0-100) a resume by the weight of the job's top ``limit`` terms it contains."""
+    scratch = Scratch(vocabulary)
+    job = TermVector.from_text(job_text, scratch)
+    resume = TermVector.from_text(resume_text, scratch)
+    matched, missing = [], []
+    total = covered = 0.0
+    for term_id, weight in job.top(limit):
+        total += weight
+        if term_id in resume:
+            covered += weight
+            matched.append(vocabulary.term(term_id, scratch))
+        else:
+            missing.append(vocabulary.term(term_id, scratch))
+    return KeywordMatch(round(100.0 * covered / total, 1) if total else 0.0, matched, missing)
@@ -0,0 +1,161 @@
+"""Token-aware prompt assembly.
+
+Prompt inputs (resumes, job posts, extra context) are user-sized, and LLM
+latency and cost grow with them. Before a prompt is sent, its fields are:
+
+1. cleaned: job posts lose boilerplate paragraphs (EEO statements,
+   benefits/perks sections) and any paragraph repeated verbatim;
+2. budgeted: the template's ``max_input_tokens`` is shared between fields,
+   with short fields kept whole and the rest split evenly;
+3. truncated by relevance: an over-budget field keeps its paragraphs that
+   share the most terms with the other fields (plus section-heading hints),
+   in original order.
+
+Tokens are counted with ``tiktoken`` when it is installed and with a local
+approximation (word pieces of up to four characters, plus punctuation)
+otherwise.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from .prompts import PROMPTS
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional dependency (or its BPE files) unavailable
+    _ENCODING = None
+
+DEFAULT_MAX_INPUT_TOKENS = 3000
+
+# Fields holding job postings, which get boilerplate stripped
+JOB_FIELDS = frozenset({"job", "job_description"})
+
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+_TERM_RE = re.compile(r"[a-z][a-z0-9+#.]{2,}")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+_BOILERPLATE_RE = re.compile(
+    r"equal (employment )?opportunity|without regard to (race|age|sex)|reasonable accommodation"
+    r"|e-verify|affirmative action|^\W*(benefits|perks|what we offer|why (work|join)|our benefits)\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+_PRIORITY_HEADING_RE = re.compile(
+    r"^\W*(requirements|qualifications|responsibilities|skills|experience|what you('| wi)ll do|must have)",
+    re.IGNORECASE,
+)
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(_TOKEN_RE.findall(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Keep at most the first ``max_tokens`` tokens of ``text``."""
+    if max_tokens <= 0:
+        return ""
+    if _ENCODING is not None:
+        tokens = _ENCODING.encode(text)
+        return text if len(tokens) <= max_tokens else _ENCODING.decode(tokens[:max_tokens])
+    for i, match in enumerate(_TOKEN_RE.finditer(text)):
+        if i == max_tokens:
+            return text[:match.start()].rstrip()
+    return text
+
+
+def terms(text: str) -> Set[str]:
+    return set(_TERM_RE.findall(text.lower()))
+
+
+def strip_boilerplate(text: str) -> str:
+    """Drop EEO/benefits paragraphs and verbatim-repeated paragraphs."""
+    kept, seen = [], set()
+    for paragraph in _PARAGRAPH_RE.split(text):
+        key = " ".join(paragraph.lower().split())
+        if not key or key in seen or _BOILERPLATE_RE.search(paragraph):
+            continue
+        seen.add(key)
+        kept.append(paragraph.strip())
+    return "\n\n".join(kept)
+
+
+def truncate_by_relevance(text: str, max_tokens: int, query_terms: Iterable[str] = ()) -> str:
+    """Fit ``text`` into ``max_tokens`` keeping its most relevant paragraphs."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    query = set(query_terms)
+    paragraphs = [p.strip() for p in _PARAGRAPH_RE.split(text) if p.strip()]
+    scored = []
+    for i, paragraph in enumerate(paragraphs):
+        para_terms = terms(paragraph)
+        overlap = len(para_terms & query) / (len(para_terms) or 1)
+        prior = 1.0 if _PRIORITY_HEADING_RE.search(paragraph) else 0.0
+        # earlier paragraphs win ties (summaries and headlines come first)
+        scored.append((overlap + prior, -i, i))
+
+    chosen: Dict[int, str] = {}
+    remaining = max_tokens
+    for _score, _order, i in sorted(scored, reverse=True):
+        if remaining <= 0:
+            break
+        cost = count_tokens(paragraphs[i])
+        chosen[i] = paragraphs[i] if cost <= remaining else truncate_tokens(paragraphs[i], remaining)
+        remaining -= min(cost, remaining)
+    return "\n\n".join(chosen[i] for i in sorted(chosen))
+
+
+def fit_fields(fields: Dict[str, Optional[str]], budget: int) -> Dict[str, Optional[str]]:
+    """Clean and shrink prompt fields so their total fits ``budget`` tokens."""
+    cleaned = {
+        name: (strip_boilerplate(value) if name in JOB_FIELDS else value) if value else value
+        for name, value in fields.items()
+    }
+    sizes = {name: count_tokens(value or "") for name, value in cleaned.items()}
+    if sum(sizes.values()) <= budget:
+        return cleaned
+
+    # water-filling: fields under the fair share keep everything, the rest split what's left
+    allowance: Dict[str, int] = {}
+    pending = sorted((n for n in sizes if sizes[n]), key=sizes.get)
+    remaining = max(budget, 0)
+    while pending:
+        share = remaining // len(pending)
+        name = pending[0]
+        if sizes[name] > share:
+            for n in pending:
+                allowance[n] = share
+            break
+        allowance[name] = sizes[name]
+        remaining -= sizes[name]
+        pending.pop(0)
+
+    fitted = dict(cleaned)
+    for name, limit in allowance.items():
+        if sizes[name] > limit:
+            others = set().union(*(terms(v) for n, v in cleaned.items() if n != name and v))
+            fitted[name] = truncate_by_relevance(cleaned[name], limit, others)
+    return fitted
+
+
+class AssembledPrompt:
+    __slots__ = ("prompt_id", "system", "text", "input_tokens")
+
+    def __init__(self, prompt_id: str, system: str, text: str):
+        self.prompt_id = prompt_id
+        self.system = system
+        self.text = text
+        self.input_tokens = count_tokens(system) + count_tokens(text)
+
+
+def assemble(prompt_id: str, **fields: str) -> AssembledPrompt:
+    """Render ``PROMPTS[prompt_id]`` with fields fitted to its token budget."""
+    spec = PROMPTS[prompt_id]
+    overhead = count_tokens(spec["system"]) + count_tokens(spec["template"].format(**{k: "" for k in fields}))
+    budget = spec.get("max_input_tokens", DEFAULT_MAX_INPUT_TOKENS) - overhead
+    fitted = fit_fields(fields, budget)
+    return AssembledPrompt(prompt_id, spec["system"], spec["template"].format(**{k: v or "" for k, v in fitted.items()}))
@@ -0,0 +1,249 @@
+"""Failover for LLM calls: hedged requests, a circuit breaker and an optional fallback.
+
+``ResilientLLM`` wraps a primary provider call:
+
+1. If the provider's circuit breaker is open, the call goes straight to the
+   fallback without waiting on a sick provider.
+2. Otherwise the request is sent; if it hasn't answered after the provider's
+   recent p95 latency (clamped to ``[hedge_min_delay, hedge_max_delay]``), a
+   second identical request is sent and whichever answers first wins. Hedges
+   are capped at ``max_hedge_ratio`` of recent calls so a provider-wide
+   slowdown cannot double our traffic.
+3. If every attempt fails or the overall timeout passes, the fallback answers.
+
+Without a fallback, both cases raise ``LLMUnavailable`` (served as 503).
+
+The breaker trips when, over its recent window, the error rate or the rate
+of calls slower than the latency SLO crosses its threshold. After a cooldown
+one probe request is let through (half-open); its outcome closes or re-opens
+the breaker. Every decision is counted in ``stats()``.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LLMCall = Callable[[str, int, Optional[str]], Awaitable[Dict[str, Any]]]
+
+
+class LLMUnavailable(Exception):
+    """No provider answered: its circuit is open, or every attempt failed or timed out."""
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies."""
+
+    __slots__ = ("_samples", "min_samples")
+
+    def __init__(self, window: int = 256, min_samples: int = 20):
+        self._samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float, default: float) -> float:
+        if len(self._samples) < self.min_samples:
+            return default
+        ordered = sorted(self._samples)
+        return ordered[int(q * (len(ordered) - 1))]
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        window: int = 50,
+        min_calls: int = 10,
+        error_rate: float = 0.5,
+        slow_rate: float = 0.5,
+        slow_seconds: float = 10.0,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = self.CLOSED
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)  # (ok, slow)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now (claims the probe when half-open)."""
+        if self.state == self.OPEN:
+            if self.clock() < self._opened_at + self.cooldown:
+                return False
+            self.state, self._probe_in_flight = self.HALF_OPEN, False
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record(self, ok: bool, seconds: float) -> None:
+        slow = seconds > self.slow_seconds
+        if self.state == self.HALF_OPEN:
+            if ok and not slow:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+                logger.info("✅ LLM circuit breaker closed")
+            else:
+                self._open()
+            return
+        self._outcomes.append((ok, slow))
+        n = len(self._outcomes)
+        if self.state == self.CLOSED and n >= self.min_calls:
+            errors = sum(1 for o, _ in self._outcomes if not o)
+            slows = sum(1 for _, s in self._outcomes if s)
+            if errors / n >= self.error_rate or slows / n >= self.slow_rate:
+                self._open()
+
+    def abandon(self) -> None:
+        """A claimed request was cancelled before it produced an outcome."""
+        self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = self.clock()
+        self._probe_in_flight = False
+        self.trips += 1
+        logger.warning("⚠️  LLM circuit breaker opened")
+
+
+class ResilientLLM:
+    def __init__(
+        self,
+        name: str,
+        primary: LLMCall,
+        fallback: Optional[LLMCall] = None,
+        *,
+        hedge: bool = settings.LLM_HEDGE_ENABLED,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+        hedge_max_delay: float = settings.LLM_HEDGE_MAX_DELAY_SECONDS,
+        max_hedge_ratio: float = 0.1,
+        timeout: float = settings.LLM_TIMEOUT_SECONDS,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.primary = primary
+        self.fallback = fallback
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_delay = hedge_max_delay
+        self.max_hedge_ratio = max_hedge_ratio
+        self.timeout = timeout
+        self.latency = LatencyTracker()
+        self.breaker = breaker or CircuitBreaker(
+            min_calls=settings.LLM_BREAKER_MIN_CALLS,
+            error_rate=settings.LLM_BREAKER_ERROR_RATE,
+            slow_seconds=settings.LLM_LATENCY_SLO_SECONDS,
+            cooldown=settings.LLM_BREAKER_COOLDOWN_SECONDS,
+        )
+        self.counts: Counter = Counter()
+        self._recent_hedges = deque(maxlen=100)
+
+    def hedge_delay(self) -> float:
+        p = self.latency.quantile(self.hedge_quantile, default=self.hedge_max_delay)
+        return min(max(p, self.hedge_min_delay), self.hedge_max_delay)
+
+    def _may_hedge(self) -> bool:
+        if not self.hedge or self.breaker.state != CircuitBreaker.CLOSED:
+            return False
+        return sum(self._recent_hedges) < self.max_hedge_ratio * self._recent_hedges.maxlen
+
+    async def _attempt(self, prompt: str, max_tokens: int, system: Optional[str]) -> Dict[str, Any]:
+        start = time.monotonic()
+        try:
+            result = await self.primary(prompt, max_tokens, system)
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except Exception:
+            self.breaker.record(False, time.monotonic() - start)
+            raise
+        elapsed = time.monotonic() - start
+        self.latency.observe(elapsed)
+        self.breaker.record(True, elapsed)
+        return result
+
+    async def _hedged(self, prompt: str, max_tokens: int, system: Optional[str]) -> Dict[str, Any]:
+        first = asyncio.ensure_future(self._attempt(prompt, max_tokens, system))
+        pending = {first}
+        hedged = False
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if not done and self._may_hedge():
+                hedged = True
+                self.counts["hedges"] += 1
+                pending.add(asyncio.ensure_future(self._attempt(prompt, max_tokens, system)))
+            self._recent_hedges.append(hedged)
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.counts["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, prompt: str, max_tokens: int = 512, system: Optional[str] = None) -> Dict[str, Any]:
+        self.counts["calls"] += 1
+        if not self.breaker.allow():
+            self.counts["short_circuits"] += 1
+            return await self._fall_back(prompt, max_tokens, system)
+
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self._hedged(prompt, max_tokens, system), self.timeout)
+        except asyncio.TimeoutError:
+            self.counts["timeouts"] += 1
+            self.breaker.record(False, time.monotonic() - start)
+            logger.warning(f"⚠️  LLM provider {self.name} timed out after {self.timeout}s")
+            return await self._fall_back(prompt, max_tokens, system)
+        except Exception as e:
+            self.counts["errors"] += 1
+            logger.warning(f"⚠️  LLM provider {self.name} failed ({e})")
+            return await self._fall_back(prompt, max_tokens, system)
+        self.counts["primary_ok"] += 1
+        return {**result, "provider": self.name}
+
+    async def _fall_back(self, prompt: str, max_tokens: int, system: Optional[str]) -> Dict[str, Any]:
+        if self.fallback is None:
+            self.counts["unavailable"] += 1
+            raise LLMUnavailable(f"LLM provider {self.name} is unavailable")
+        self.counts["fallbacks"] += 1
+        result = await self.fallback(prompt, max_tokens, system)
+        return {**result, "provider": "local"}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.name,
+            "breaker_state": self.breaker.state,
+            "breaker_trips": self.breaker.trips,
+            "hedge_delay_seconds": round(self.hedge_delay(), 4),
+            "p50_seconds": round(self.latency.quantile(0.5, 0.0), 4),
+            "p95_seconds": round(self.latency.quantile(0.95, 0.0), 4),
+            **{k: self.counts[k] for k in
+               ("calls", "primary_ok", "hedges", "hedge_wins", "errors", "timeouts", "short_circuits", "fallbacks",
+                "unavailable")},
+        }
@@ -0,0 +1,209 @@
+"""In-process cache of the template catalog and its compiled prompts.
+
+The ``templates`` table is read once per worker into an immutable snapshot:
+catalog listings are pre-serialized JSON bodies with a strong ETag, and
+each template's prompt is parsed once into render segments. Admin edits
+call ``publish_invalidation()``, which drops the snapshot locally and
+broadcasts on a Redis channel that every worker subscribes to; the next
+request reloads. Loads normally read from a replica, but within
+``REPLICA_STICKY_SECONDS`` of an invalidation they read from the primary so
+a replica that has not caught up with the edit is never cached.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from string import Formatter
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import select
+
+from ..core.config import settings
+from ..core.metrics import cache_counters
+from ..core.redis_client import get_redis
+from ..db.routing import read_session
+from ..db.models import Template
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "templates:invalidate"
+
+# Request fields a prompt may reference; any not placed inline in the prompt
+# are appended as labelled sections when present.
+PROMPT_SECTIONS = (
+    ("Resume", "resume_content"),
+    ("Job description", "job_description"),
+    ("Additional context", "additional_context"),
+)
+PROMPT_FIELDS = frozenset(field for _, field in PROMPT_SECTIONS)
+
+LISTING_FIELDS = ("id", "name", "description", "type", "category", "is_premium")
+
+_SNAPSHOT_HIT, _SNAPSHOT_MISS = cache_counters("template_catalog")
+
+
+def parse_prompt(prompt: str) -> List[Tuple[str, Optional[str]]]:
+    """Split a prompt into (literal, field) segments.
+
+    Raises:
+        ValueError: If the prompt has malformed braces or unknown fields
+    """
+    segments = []
+    for literal, field, _spec, _conversion in Formatter().parse(prompt):
+        if field is not None and field not in PROMPT_FIELDS:
+            raise ValueError(f"Unknown prompt field {{{field}}}; allowed: {', '.join(sorted(PROMPT_FIELDS))}")
+        segments.append((literal, field))
+    return segments
+
+
+class CompiledTemplate:
+    """A template with its prompt pre-parsed for rendering."""
+
+    __slots__ = ("id", "name", "type", "category", "is_premium", "prompt", "_segments", "_sections")
+
+    def __init__(self, row: Template):
+        self.id = row.id
+        self.name = row.name
+        self.type = row.type
+        self.category = row.category
+        self.is_premium = bool(row.is_premium)
+        self.prompt = row.prompt
+        try:
+            self._segments = parse_prompt(row.prompt)
+        except ValueError as e:
+            logger.warning(f"⚠️  Template {row.id} prompt is not a valid format string, using it verbatim: {e}")
+            self._segments = [(row.prompt, None)]
+        inline = {field for _, field in self._segments if field}
+        self._sections = tuple(s for s in PROMPT_SECTIONS if s[1] not in inline)
+
+    def render(self, values: Dict[str, Optional[str]]) -> str:
+        parts = []
+        for literal, field in self._segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(values.get(field) or "")
+        for header, field in self._sections:
+            if values.get(field):
+                parts.append(f"\n\n{header}:\n{values[field]}")
+        return "".join(parts)
+
+
+def _listing(rows: List[dict]) -> Tuple[bytes, str]:
+    body = orjson.dumps(rows)
+    return body, f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+EMPTY_LISTING = _listing([])
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one point in time."""
+
+    __slots__ = ("version", "by_id", "by_type", "_rows", "_categories", "_listings")
+
+    def __init__(self, rows: List[Template]):
+        self._rows = [{f: getattr(r, f) for f in LISTING_FIELDS} for r in rows]
+        self._categories = frozenset(r.category for r in rows)
+        self.by_id = {r.id: CompiledTemplate(r) for r in rows}
+        self.by_type: Dict[str, CompiledTemplate] = {}
+        for template in self.by_id.values():  # lowest id wins per type
+            self.by_type.setdefault(template.type, template)
+        digest = hashlib.sha1()
+        for r in rows:
+            digest.update(repr((r.id, r.name, r.description, r.type, r.category, r.is_premium, r.prompt)).encode())
+        self.version = digest.hexdigest()[:16]
+        self._listings: Dict[Optional[str], Tuple[bytes, str]] = {}
+
+    def listing(self, category: Optional[str] = None) -> Tuple[bytes, str]:
+        """Serialized catalog listing and its strong ETag.
+
+        Only the full listing and real categories are cached: ``category``
+        comes from the query string, and caching every value sent would grow
+        the snapshot without bound.
+        """
+        cached = self._listings.get(category)
+        if cached is None:
+            if category is not None and category not in self._categories:
+                return EMPTY_LISTING
+            rows = [r for r in self._rows if category is None or r["category"] == category]
+            cached = self._listings[category] = _listing(rows)
+        return cached
+
+    def listing_row(self, template_id: int) -> Optional[dict]:
+        return next((r for r in self._rows if r["id"] == template_id), None)
+
+
+class TemplateCatalog:
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._generation = 0
+        self._invalidated_at = float("-inf")
+        self._lock: Optional[asyncio.Lock] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            _SNAPSHOT_HIT.inc()
+            return snapshot
+        _SNAPSHOT_MISS.inc()
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._snapshot is None:
+                generation = self._generation
+                recent = time.monotonic() - self._invalidated_at < settings.REPLICA_STICKY_SECONDS
+                async with read_session(primary=recent) as session:
+                    rows = (await session.execute(select(Template).order_by(Template.id))).scalars().all()
+                snapshot = CatalogSnapshot(rows)
+                # an invalidation that raced with the load means these rows may be stale
+                if generation == self._generation:
+                    self._snapshot = snapshot
+                return snapshot
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._invalidated_at = time.monotonic()
+        self._snapshot = None
+
+    async def publish_invalidation(self) -> None:
+        """Invalidate here and tell every other worker to do the same."""
+        self.invalidate()
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.publish(INVALIDATION_CHANNEL, "1")
+            except Exception as e:
+                logger.error(f"❌ Failed to publish template invalidation: {e}")
+
+    async def _listen(self) -> None:
+        redis = get_redis()
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                self.invalidate()  # messages may have been missed while disconnected
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.invalidate()
+            except Exception as e:
+                logger.warning(f"⚠️  Template invalidation listener error, reconnecting: {e}")
+            finally:
+                await pubsub.close()  # one connection per attempt, returned before the next
+            await asyncio.sleep(1)
+
+    def start_listener(self) -> None:
+        """Subscribe to invalidations from other workers (no-op without Redis)."""
+        if get_redis() is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+
+template_catalog = TemplateCatalog()
@@ -0,0 +1,141 @@
+"""Voice answers scored while they are being spoken.
+
+The serial flow records the whole answer, transcribes it, then evaluates
+the transcript: two full round trips after the candidate stops talking.
+``VoiceAnswer`` overlaps them with the recording instead. Audio chunks
+arriving over the interview socket are transcribed one by one as they
+come in (see ``app.ai.asr``). ``eval_v1`` then re-scores the growing
+transcript in the background:
+
+- at most one evaluation is in flight;
+- a new one starts once ``VOICE_EVAL_MIN_NEW_WORDS`` words have been added
+  since the last, or as soon as a chunk brings no new words (a pause);
+- each result is pushed as a provisional ``evaluation.partial``.
+
+When the recording ends, the final score is whichever evaluation covers
+the complete transcript. Candidates usually finish with a pause, so that
+evaluation has typically started, or already finished, by the time the
+last chunk arrives. Only if words came in after it started does a final
+evaluation run from scratch. Scoring partial transcripts costs extra LLM
+calls: at most ``VOICE_MAX_PROVISIONAL_EVALS`` per answer, after which the
+transcript is only scored at the end. An answer that runs past
+``VOICE_MAX_SECONDS`` or ``VOICE_MAX_BYTES`` of audio is rejected with
+``VoiceLimitExceeded``.
+"""
+
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.fanout import interview_fanout
+from . import interviewer
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceLimitExceeded(ValueError):
+    pass
+
+
+class VoiceAnswer:
+    def __init__(self, session_id: str, question_id: str, question: str, asr,
+                 min_new_words: Optional[int] = None):
+        self.session_id = session_id
+        self.question_id = question_id
+        self.question = question
+        self.min_new_words = min_new_words or settings.VOICE_EVAL_MIN_NEW_WORDS
+        self._stream = asr.stream()
+        self._words: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+        self._task_words = 0  # words covered by _task
+        self._provisional = 0  # evaluations started before finish()
+        self._bytes = 0
+        self._deadline = time.monotonic() + settings.VOICE_MAX_SECONDS
+        self._finished = False
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self._words)
+
+    async def _publish(self, event: dict) -> None:
+        await interview_fanout.publish(self.session_id, {**event, "question_id": self.question_id})
+
+    def _check_limits(self, audio: bytes) -> None:
+        self._bytes += len(audio)
+        if self._bytes > settings.VOICE_MAX_BYTES:
+            raise VoiceLimitExceeded(f"Voice answer exceeds {settings.VOICE_MAX_BYTES} bytes of audio")
+        if time.monotonic() > self._deadline:
+            raise VoiceLimitExceeded(f"Voice answer exceeds {settings.VOICE_MAX_SECONDS:g} seconds")
+
+    async def feed(self, audio: bytes) -> None:
+        """Transcribe the next chunk and re-score when enough has been said.
+
+        Raises:
+            VoiceLimitExceeded: If the answer is over its size or time limit
+        """
+        self._check_limits(audio)
+        text = await self._stream.feed(audio)
+        if text:
+            self._words.extend(text.split())
+            await self._publish({"type": "transcript.partial", "text": text})
+        self._maybe_evaluate(pause=not text)
+
+    def _maybe_evaluate(self, pause: bool = False) -> None:
+        if self._finished or (self._task is not None and not self._task.done()):
+            return
+        if self._provisional >= settings.VOICE_MAX_PROVISIONAL_EVALS:
+            return  # the rest is scored once, by finish()
+        new = len(self._words) - self._task_words
+        if new >= self.min_new_words or (pause and new > 0):
+            self._provisional += 1
+            self._task_words = len(self._words)
+            self._task = asyncio.create_task(self._evaluate(self.transcript, self._task_words))
+            # catch up with words that arrived while it ran
+            self._task.add_done_callback(lambda _: self._maybe_evaluate())
+
+    async def _evaluate(self, transcript: str, words: int) -> Optional[Tuple[Optional[float], str]]:
+        try:
+            score, feedback = await interviewer.score_answer(self.question, transcript)
+        except Exception as e:
+            logger.warning(f"⚠️  Provisional evaluation of {self.session_id}/{self.question_id} failed: {e}")
+            return None
+        if not self._finished:
+            await self._publish({"type": "evaluation.partial", "score": score, "words": words})
+        return score, feedback
+
+    async def finish(self, audio: bytes = b"") -> Optional[float]:
+        """Transcribe the last audio and publish the final score of the whole answer.
+
+        Raises:
+            VoiceLimitExceeded: If the last audio takes the answer over its limits
+        """
+        if audio:
+            self._check_limits(audio)
+        settled = await self._stream.feed(audio) if audio else ""
+        tail = " ".join(t for t in (settled, await self._stream.close()) if t)
+        if tail:
+            self._words.extend(tail.split())
+            await self._publish({"type": "transcript.partial", "text": tail})
+        self._finished = True
+        result = None
+        if self._task is not None and self._task_words == len(self._words):
+            result = await self._task
+        elif self._task is not None:
+            self._task.cancel()
+        try:
+            score, feedback = result or await interviewer.score_answer(self.question, self.transcript)
+        except Exception as e:
+            logger.error(f"❌ Voice evaluation of {self.session_id}/{self.question_id} failed: {e}")
+            await self._publish({"type": "evaluation.failed", "detail": "Evaluation failed"})
+            return None
+        await self._publish({"type": "evaluation.completed", "score": score, "feedback": feedback,
+                             "transcript": self.transcript})
+        return score
+
+    def cancel(self) -> None:
+        """Abandon the answer (socket closed mid-recording)."""
+        self._finished = True
+        if self._task is not None:
+            self._task.cancel()
@@ -1,20 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Literal, Optional
+import csv
+import io
+import orjson
+from ..db import crud
+from ..core.usage import usage_tracker, ACTIVE, FEATURE_NAMES
+from ..ai.ai_client import ai_client
+from ..core import profiling
+from ..core.config import settings
+from .deps import require_admin
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(require_admin)])
 
 # Models
 class UserStats(BaseModel):
     id: int
     email: str
-    full_name: str
+    full_name: Optional[str] = None
     created_at: datetime
-    last_login: datetime
-    subscription_plan: str
+    last_login: Optional[datetime] = None
+    subscription_plan: str = "free"
     total_resumes: int
 
+class UserPage(BaseModel):
+    items: List[UserStats]
+    next_cursor: Optional[str] = None
+
 class DashboardMetrics(BaseModel):
     total_users: int
     active_users_today: int
@@ -39,11 +53,11 @@ class SubscriptionStats(BaseModel):
 @router.get("/dashboard", response_model=DashboardMetrics)
 async def get_dashboard_metrics():
     """Get high-level dashboard metrics"""
-    # TODO: Implement actual metrics from database
+    # TODO: Implement remaining metrics from database
     return {
         "total_users": 1250,
-        "active_users_today": 145,
-        "active_users_week": 420,
+        "active_users_today": await usage_tracker.unique_users(ACTIVE, days=1),
+        "active_users_week": await usage_tracker.unique_users(ACTIVE, days=7),
         "total_resumes_generated": 3500,
         "total_interviews": 890,
         "total_revenue": 12450.75,
@@ -51,11 +65,52 @@ async def get_dashboard_metrics():
         "conversion_rate": 0.24
     }
 
-@router.get("/users", response_model=List[UserStats])
-async def list_users(skip: int = 0, limit: int = 100):
-    """List all users with pagination"""
-    # TODO: Implement user listing with actual DB query
-    return []
+@router.get("/users", response_model=UserPage)
+async def list_users(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
+    """List users with keyset pagination.
+
+    Pass the returned ``next_cursor`` back as ``cursor`` to fetch the next page.
+    """
+    try:
+        rows, next_cursor = await crud.list_users_page(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": rows, "next_cursor": next_cursor}
+
+EXPORT_FIELDS = ["id", "email", "full_name", "is_active", "is_admin", "created_at", "total_resumes"]
+
+async def _export_csv(batch_size: int):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    async for batch in crud.iter_users_with_resume_counts(batch_size=batch_size):
+        writer.writerows(batch)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+async def _export_ndjson(batch_size: int):
+    async for batch in crud.iter_users_with_resume_counts(batch_size=batch_size):
+        yield b"".join(orjson.dumps({k: row[k] for k in EXPORT_FIELDS}) + b"\n" for row in batch)
+
+@router.get("/users/export")
+async def export_users(format: Literal["csv", "ndjson"] = "csv", batch_size: int = Query(1000, ge=1, le=10000)):
+    """Stream every user as CSV or NDJSON.
+
+    Rows are read from a server-side cursor in batches and written out as
+    they arrive, so exports of any size run in constant memory.
+    """
+    if format == "csv":
+        body, media_type = _export_csv(batch_size), "text/csv"
+    else:
+        body, media_type = _export_ndjson(batch_size), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=users.{format}"},
+    )
 
 @router.get("/users/{user_id}/stats")
 async def get_user_stats(user_id: int):
@@ -72,32 +127,25 @@ async def get_user_stats(user_id: int):
     }
 
 @router.get("/metrics/usage", response_model=List[UsageMetrics])
-async def get_usage_metrics():
-    """Get feature usage metrics"""
-    # TODO: Implement usage tracking
+async def get_usage_metrics(days: int = Query(30, ge=1, le=90)):
+    """Get feature usage metrics over the last N days.
+
+    Unique users are HyperLogLog estimates (about 1.6% standard error).
+    """
     return [
         {
-            "feature_name": "Resume Generation",
-            "usage_count": 3500,
-            "unique_users": 1200
-        },
-        {
-            "feature_name": "Interview Prep",
-            "usage_count": 890,
-            "unique_users": 450
-        },
-        {
-            "feature_name": "ATS Optimization",
-            "usage_count": 1200,
-            "unique_users": 600
-        },
-        {
-            "feature_name": "Cover Letter",
-            "usage_count": 950,
-            "unique_users": 500
+            "feature_name": name,
+            "usage_count": await usage_tracker.usage_count(feature, days=days),
+            "unique_users": await usage_tracker.unique_users(feature, days=days),
         }
+        for feature, name in FEATURE_NAMES.items()
     ]
 
+@router.get("/metrics/llm")
+async def get_llm_metrics():
+    """LLM failover state: breaker, hedging and fallback counters, recent latency."""
+    return ai_client.resilience.stats()
+
 @router.get("/metrics/subscriptions", response_model=List[SubscriptionStats])
 async def get_subscription_metrics():
     """Get subscription and revenue metrics"""
@@ -127,7 +175,7 @@ async def get_subscription_metrics():
 async def get_daily_metrics(days: int = 30):
     """Get daily metrics for the last N days"""
     # TODO: Implement daily metrics aggregation
-    return {
+    return ORJSONResponse({
         "period_days": days,
         "daily_data": [
             {
@@ -138,7 +186,7 @@ async def get_daily_metrics(days: int = 30):
             }
             for i in range(days)
         ]
-    }
+    })
 
 @router.get("/metrics/revenue")
 async def get_revenue_metrics():
@@ -185,3 +233,37 @@ async def send_announcement(message: str, user_segment: str = "all"):
         "message": message,
         "target_segment": user_segment
     }
+
+# --- Profiling (this worker only) ---------------------------------------------
+
+@router.post("/profile/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+):
+    """Sample this worker's stacks for a while; returns collapsed stacks for a flamegraph."""
+    try:
+        stacks, samples = await profiling.cpu_profile(seconds, interval_ms / 1000)
+    except profiling.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(stacks, headers={"X-Profile-Samples": str(samples)})
+
+@router.post("/profile/memory")
+async def profile_memory(
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    top: int = Query(50, ge=1, le=500),
+):
+    """Trace allocations for a while; returns the biggest growth by traceback."""
+    try:
+        return await profiling.allocation_profile(seconds, top)
+    except profiling.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/profile/requests/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(profile_id: str):
+    """Collapsed stacks of a request captured with the ``X-Profile`` header."""
+    found = profiling.recent_profile(profile_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Profile not found (it may have been evicted)")
+    stacks, info = found
+    return PlainTextResponse(stacks, headers={f"X-Profile-{k.replace('_', '-').title()}": str(v) for k, v in info.items()})
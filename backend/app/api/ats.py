@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from ..ai.ai_client import ai_client
 
 router = APIRouter()
@@ -9,4 +10,4 @@ async def score(payload: dict):
     resume = payload.get("resume", "")
     job = payload.get("job", "")
     result = await ai_client.ats_score(resume, job)
-    return result
+    return ORJSONResponse(result)  # plain JSON types already: skip jsonable_encoder
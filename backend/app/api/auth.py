@@ -1,7 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
-import httpx
-import jwt
 from datetime import datetime, timedelta
 from ..core.config import settings
 from ..core.security import create_access_token, verify_password, get_password_hash
@@ -24,7 +22,7 @@ async def register(data: RegisterIn):
     if user:
         raise HTTPException(status_code=400, detail="Email already registered")
     new = await crud.create_user(email=data.email, password=data.password, full_name=data.full_name)
-    access = create_access_token({"sub": new.email})
+    access = create_access_token({"sub": new.email, "user_id": new.id})
     return {"access_token": access}
 
 class LoginIn(BaseModel):
@@ -36,7 +34,7 @@ async def login(data: LoginIn):
     user = await crud.get_user_by_email(data.email)
     if not user or not verify_password(data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    access = create_access_token({"sub": user.email})
+    access = create_access_token({"sub": user.email, "user_id": user.id})
     return {"access_token": access}
 
 @router.post("/refresh", response_model=TokenOut)
@@ -55,6 +53,8 @@ class GoogleTokenRequest(BaseModel):
 @router.post("/google/callback", response_model=TokenOut)
 async def google_callback(request: GoogleTokenRequest):
     """Handle Google OAuth callback"""
+    import httpx
+
     try:
         # Verify token with Google
         async with httpx.AsyncClient() as client:
@@ -92,6 +92,8 @@ class GitHubTokenRequest(BaseModel):
 @router.post("/github/callback", response_model=TokenOut)
 async def github_callback(request: GitHubTokenRequest):
     """Handle GitHub OAuth callback"""
+    import httpx
+
     try:
         # Exchange code for access token
         async with httpx.AsyncClient() as client:
@@ -0,0 +1,109 @@
+"""Shared FastAPI dependencies (authentication, plan quotas)."""
+
+from typing import Any, AsyncIterator
+
+from fastapi import Depends, Header, HTTPException
+from jose import JWTError
+
+from ..billing.entitlements import entitlements
+from ..core.security import decode_access_token
+from ..db import crud
+
+
+async def get_current_user_id(authorization: str = Header(None)) -> int:
+    """Resolve the user id from the bearer access token."""
+    if not authorization or authorization[:7].lower() != "bearer ":
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        claims = decode_access_token(authorization[7:])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    user_id = claims.get("user_id")
+    if user_id is None:
+        # tokens issued before user_id was added to the claims
+        user = await crud.get_user_by_email(claims.get("sub"))
+        if not user:
+            raise HTTPException(status_code=401, detail="Unknown user")
+        user_id = user.id
+    return int(user_id)
+
+
+class QuotaCharge:
+    """One use of a quota by the current request.
+
+    Handlers spend it once the request has been validated, and it is
+    refunded if the work it pays for fails: ``async with charge:`` around a
+    call, or ``charge.guard(chunks)`` around a stream after ``spend()``.
+    """
+
+    def __init__(self, user_id: int, quota: str, amount: int):
+        self.user_id = user_id
+        self.quota = quota
+        self.amount = amount
+        self.spent = False
+
+    async def spend(self) -> None:
+        """Count the use, or reject with 402 if the plan's limit is reached."""
+        result = await entitlements.consume(self.user_id, self.quota, self.amount)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=402,
+                detail=f"Monthly {self.quota} limit of {result.limit} reached for your plan. Upgrade to continue."
+            )
+        self.spent = True
+
+    async def refund(self) -> None:
+        if self.spent:
+            self.spent = False
+            await entitlements.refund(self.user_id, self.quota, self.amount)
+
+    async def __aenter__(self) -> "QuotaCharge":
+        await self.spend()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None and issubclass(exc_type, Exception):
+            await self.refund()
+
+    async def guard(self, chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Relay ``chunks``, refunding if the stream fails."""
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except Exception:
+            await self.refund()
+            raise
+
+
+def require_quota(quota: str, amount: int = 1):
+    """Dependency factory: a ``QuotaCharge`` of ``quota`` for the authenticated user."""
+    async def dependency(user_id: int = Depends(get_current_user_id)) -> QuotaCharge:
+        return QuotaCharge(user_id, quota, amount)
+    return dependency
+
+
+async def require_admin(user_id: int = Depends(get_current_user_id)) -> int:
+    """Allow only users flagged ``is_admin``."""
+    user = await crud.get_user_by_id(user_id)
+    if not user or not user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return user_id
+
+
+async def require_recruiter(user_id: int = Depends(get_current_user_id)) -> int:
+    """Allow users flagged ``is_recruiter`` and admins."""
+    user = await crud.get_user_by_id(user_id)
+    if not user or not (user.is_recruiter or user.is_admin):
+        raise HTTPException(status_code=403, detail="Recruiter privileges required")
+    return user_id
+
+
+def require_plan(*plans: str):
+    """Dependency factory: allow only users whose current plan is one of ``plans``."""
+    async def dependency(user_id: int = Depends(get_current_user_id)) -> int:
+        entitlement = await entitlements.get(user_id)
+        if entitlement.plan not in plans:
+            raise HTTPException(status_code=403, detail=f"Requires the {' or '.join(plans)} plan")
+        return user_id
+    return dependency
@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from datetime import datetime
 import logging
+from ..core.health import health_monitor
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -27,22 +28,16 @@ async def health_check():
 async def ready():
     """Readiness probe - checks if app is ready to serve requests.
     
-    Performs checks on:
-    - Database connectivity
+    Serves the cached result of the background dependency checks:
+    - Database connectivity (pooled connection)
     - MinIO/S3 storage
-    - Redis cache (if used)
+    - Redis cache (if used; reported, not required)
     """
-    checks = {
-        "database": await check_database(),
-        "minio": await check_minio(),
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    result = await health_monitor.status()
+    checks = {name: status["ok"] for name, status in result["checks"].items()}
     
-    # All checks must pass for readiness
-    all_ready = all(checks.values())
-    
-    if not all_ready:
-        logger.warning(f"Readiness check failed: {checks}")
+    if not result["ready"]:
+        logger.warning(f"Readiness check failed: {result['checks']}")
         raise HTTPException(
             status_code=503,
             detail="Service not ready - some dependencies failed"
@@ -50,7 +45,8 @@ async def ready():
     
     return JSONResponse(
         status_code=200,
-        content={"status": "ready", **checks}
+        content={"status": "ready", **checks, "checked_at": result["checked_at"],
+                 "timestamp": datetime.utcnow().isoformat()}
     )
 
 
@@ -68,60 +64,16 @@ async def live():
 
 @router.get("/detailed", tags=["health"])
 async def detailed_health():
-    """Detailed health check with all service statuses."""
+    """Detailed health check with all service statuses, latencies and errors."""
+    result = await health_monitor.status()
     return JSONResponse(
         status_code=200,
         content={
             "status": "ok",
-            "database": await check_database(),
-            "minio": await check_minio(),
+            **{name: status["ok"] for name, status in result["checks"].items()},
+            "checks": result["checks"],
+            "checked_at": result["checked_at"],
+            "age_seconds": result["age_seconds"],
             "timestamp": datetime.utcnow().isoformat()
         }
     )
-
-
-async def check_database() -> bool:
-    """Check database connectivity.
-    
-    Returns:
-        bool: True if database is accessible, False otherwise
-    """
-    try:
-        from sqlalchemy import text
-        from app.core.config import settings
-        import asyncpg
-        
-        # Create async connection to test database
-        conn = await asyncpg.connect(
-            settings.DATABASE_URL.replace("+asyncpg", "").replace("postgresql", "postgresql+asyncpg")
-        )
-        await conn.execute("SELECT 1")
-        await conn.close()
-        
-        logger.debug("✅ Database check passed")
-        return True
-    except Exception as e:
-        logger.error(f"❌ Database check failed: {e}")
-        return False
-
-
-async def check_minio() -> bool:
-    """Check MinIO/S3 storage connectivity.
-    
-    Returns:
-        bool: True if MinIO is accessible, False otherwise
-    """
-    try:
-        from app.core.minio_utils import get_minio_client
-        from app.core.config import settings
-        
-        client = get_minio_client()
-        # Check if bucket exists (this tests connectivity)
-        client.bucket_exists(settings.MINIO_BUCKET)
-        
-        logger.debug("✅ MinIO check passed")
-        return True
-    except Exception as e:
-        logger.error(f"❌ MinIO check failed: {e}")
-        return False
-
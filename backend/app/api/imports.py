@@ -0,0 +1,77 @@
+import asyncio
+import json
+import uuid
+import zipfile
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from pydantic import BaseModel
+from sqlalchemy import insert, select
+from ..core import bulk_import, minio_utils
+from ..core.config import settings
+from ..db.database import AsyncSessionLocal, engine
+from ..db.models import ImportJob
+from .deps import get_current_user_id, require_plan
+
+router = APIRouter()
+
+class MinioImportRequest(BaseModel):
+    prefix: str
+
+def _job_out(job) -> dict:
+    return {
+        "id": job.id,
+        "source": job.source,
+        "status": job.status,
+        "processed": job.processed,
+        "imported": job.imported,
+        "failed": job.failed,
+        "errors": json.loads(job.errors) if job.errors else [],
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+async def _enqueue(user_id: int, source: str, location: str) -> dict:
+    from ..tasks import import_resumes  # celery: loaded on first use, not at startup
+
+    async with engine.begin() as conn:
+        result = await conn.execute(insert(ImportJob).values(user_id=user_id, source=source, location=location))
+        job_id = result.inserted_primary_key[0]
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, import_resumes.delay, job_id)
+    async with AsyncSessionLocal() as session:
+        return _job_out(await session.get(ImportJob, job_id))
+
+def _store_archive(fileobj, key: str) -> None:
+    if not zipfile.is_zipfile(fileobj):
+        raise ValueError("Upload is not a zip archive")
+    size = fileobj.seek(0, 2)
+    fileobj.seek(0)
+    minio_utils.get_minio_client().put_object(settings.MINIO_BUCKET, key, fileobj, size,
+                                              content_type="application/zip")
+
+@router.post("/zip", status_code=202)
+async def import_zip(file: UploadFile = File(...), user_id: int = Depends(require_plan("enterprise"))):
+    """Queue an import of every PDF/text resume in a zip archive; poll ``GET /imports/{id}`` for progress."""
+    key = bulk_import.archive_key(user_id, f"{uuid.uuid4().hex}.zip")
+    try:
+        await asyncio.to_thread(_store_archive, file.file, key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await _enqueue(user_id, "zip", key)
+
+@router.post("/minio", status_code=202)
+async def import_minio(request: MinioImportRequest, user_id: int = Depends(require_plan("enterprise"))):
+    """Queue an import of the resumes uploaded under ``imports/{user_id}/`` in the resume bucket."""
+    if not request.prefix.startswith(bulk_import.user_prefix(user_id)):
+        raise HTTPException(status_code=403, detail=f"Prefix must start with {bulk_import.user_prefix(user_id)}")
+    return await _enqueue(user_id, "minio", request.prefix)
+
+@router.get("/{job_id}")
+async def import_status(job_id: int, user_id: int = Depends(get_current_user_id)):
+    """Progress and per-file errors of an import."""
+    async with AsyncSessionLocal() as session:
+        job = (await session.execute(
+            select(ImportJob).where(ImportJob.id == job_id, ImportJob.user_id == user_id)
+        )).scalar_one_or_none()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return _job_out(job)
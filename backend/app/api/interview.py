@@ -1,42 +1,160 @@
-from fastapi import APIRouter, UploadFile, File
-from uuid import uuid4
+import asyncio
+import json
+from fastapi import APIRouter, UploadFile, File, WebSocket, WebSocketDisconnect, Query, Header
+from jose import JWTError
 from ..ai.ai_client import ai_client
+from ..ai import interviewer
+from ..ai.asr import get_asr
+from ..ai.voice import VoiceAnswer, VoiceLimitExceeded
+from ..core.fanout import interview_fanout
+from ..core.security import decode_access_token
 
 router = APIRouter()
 
-sessions = {}
+# WebSocket close codes
+POLICY_VIOLATION = 1008
+TRY_AGAIN_LATER = 1013
+
+
+def _token_user_id(token: str | None) -> int | None:
+    """User id in an access token, or None if it is missing or invalid."""
+    if not token:
+        return None
+    try:
+        user_id = decode_access_token(token).get("user_id")
+    except JWTError:
+        return None
+    return int(user_id) if user_id is not None else None
+
 
 @router.post("/session/create")
-async def create_session(payload: dict):
+async def create_session(payload: dict, authorization: str = Header(None)):
     # payload: {role, difficulty, language}
-    sid = str(uuid4())
-    sessions[sid] = {"role": payload.get("role"), "difficulty": payload.get("difficulty"), "q_index": 0}
+    user_id = None
+    if authorization and authorization[:7].lower() == "bearer ":
+        user_id = _token_user_id(authorization[7:])
+    sid = await interviewer.create_session(payload.get("role"), payload.get("difficulty"), user_id)
     return {"id": sid}
 
 @router.post("/session/{id}/next_question")
 async def next_question(id: str):
-    s = sessions.get(id)
-    if not s:
+    q = await interviewer.next_question(id)
+    if not q:
         return {"error": "session not found"}
-    # generate a question using ai_client (stubbed)
-    q = {"id": f"q{ s['q_index'] }", "text": f"Sample question for role {s['role']} (difficulty {s['difficulty']})"}
-    s['q_index'] += 1
     return {"question": q}
 
 @router.post("/session/{id}/submit_answer")
 async def submit_answer(id: str, answer: str = ""):
-    s = sessions.get(id)
-    if not s:
+    if not await interviewer.get_session(id):
         return {"error": "session not found"}
     # evaluate answer
     eval_res = await ai_client.call(f"Evaluate answer: {answer}")
     return {"evaluation": eval_res}
 
+@router.websocket("/session/{id}/ws")
+async def session_channel(websocket: WebSocket, id: str, token: str = Query(None)):
+    """Interview over one socket: questions, evaluation progress and streamed feedback are pushed.
+
+    Client messages: ``{"type": "next_question"}``,
+    ``{"type": "answer", "question_id": "q0", "answer": "..."}``, and for a
+    spoken answer ``{"type": "voice.start", "question_id": "q0"}``, binary
+    audio chunks as they are recorded, then ``{"type": "voice.end"}``.
+    Server messages are the events listed in ``app.ai.interviewer``, plus
+    ``{"type": "error", "detail"}`` for a message that cannot be handled.
+    """
+    user_id = _token_user_id(token)
+    session = await interviewer.get_session(id) if user_id is not None else None
+    if session is None or (session.user_id is not None and session.user_id != user_id):
+        await websocket.close(code=POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    async with interview_fanout.subscribe(id) as events:
+        async def relay():
+            async for event in events:
+                await websocket.send_json(event)
+
+        voice: VoiceAnswer | None = None
+
+        async def handle():
+            nonlocal voice
+            while True:
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(frame.get("code", 1000))
+                if frame.get("bytes") is not None:
+                    if voice is None:
+                        await websocket.send_json({"type": "error", "detail": "send voice.start before audio"})
+                        continue
+                    try:
+                        await voice.feed(frame["bytes"])
+                    except VoiceLimitExceeded as e:
+                        voice.cancel()
+                        voice = None
+                        await websocket.send_json({"type": "error", "detail": str(e)})
+                    continue
+                try:
+                    message = json.loads(frame.get("text") or "")
+                except ValueError:
+                    message = None
+                kind = message.get("type") if isinstance(message, dict) else None
+                if kind == "next_question":
+                    question = await interviewer.next_question(id)
+                    if question is None:
+                        await websocket.send_json({"type": "error", "detail": "session not found"})
+                        continue
+                    await interview_fanout.publish(id, {"type": "question", "question": question})
+                elif kind == "answer":
+                    if not isinstance(message.get("answer"), str):
+                        await websocket.send_json({"type": "error", "detail": "answer needs question_id and answer"})
+                        continue
+                    question = await interviewer.issued_question(id, message.get("question_id"))
+                    if question is None:
+                        await websocket.send_json({"type": "error", "detail": "question_id was not asked"})
+                        continue
+                    await interviewer.dispatch_evaluation(id, question["id"], question["text"], message["answer"])
+                elif kind == "voice.start":
+                    asr = get_asr()
+                    if asr is None:
+                        await websocket.send_json({"type": "error", "detail": "voice answers are not enabled"})
+                        continue
+                    question = await interviewer.issued_question(id, message.get("question_id"))
+                    if question is None:
+                        await websocket.send_json({"type": "error", "detail": "question_id was not asked"})
+                        continue
+                    if voice is not None:
+                        voice.cancel()
+                    voice = VoiceAnswer(id, question["id"], question["text"], asr)
+                elif kind == "voice.end" and voice is not None:
+                    answer, voice = voice, None
+                    await answer.finish()
+                else:
+                    await websocket.send_json({"type": "error", "detail": f"unknown message type {kind!r}"})
+
+        tasks = [asyncio.create_task(relay()), asyncio.create_task(handle())]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if voice is not None:
+                voice.cancel()
+        for task in done:
+            if isinstance(task.exception(), WebSocketDisconnect):
+                return
+            if task.exception() is not None:
+                raise task.exception()
+    # the relay ended: this client fell too far behind, it reconnects and carries on
+    await websocket.close(code=TRY_AGAIN_LATER)
+
 @router.post("/transcribe")
 async def transcribe(file: UploadFile = File(...)):
-    # TODO: integrate whisper or fallback
+    asr = get_asr()
+    if asr is None:
+        # TODO: integrate whisper or fallback
+        return {"transcript": "(simulated) transcribed text"}
     content = await file.read()
-    return {"transcript": "(simulated) transcribed text"}
+    return {"transcript": await asr.transcribe(content)}
 
 @router.post("/evaluate")
 async def evaluate(payload: dict):
@@ -1,10 +1,60 @@
-from fastapi import APIRouter
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+
+from ..ai.keywords import extract_keywords
+from ..db.database import AsyncSessionLocal
+from ..db.models import Resume
+from .deps import get_current_user_id, require_admin
 
 router = APIRouter()
 
+
+class JobPosting(BaseModel):
+    id: int
+    text: str = Field(..., min_length=1)
+
+
+class JobMatchRequest(BaseModel):
+    resume_id: Optional[int] = None
+    resume_text: Optional[str] = None
+    k: int = Field(10, ge=1, le=100)
+
+
+class Match(BaseModel):
+    id: int
+    score: float
+
+
 @router.post("/parse")
 async def parse_job(text: str):
-    # Simple keyword extraction demo — in production use NLP
-    words = [w.strip('.,') for w in text.split() if len(w) > 3][:50]
-    keywords = list(dict.fromkeys(words))
-    return {"keywords": keywords}
+    return {"keywords": extract_keywords(text)}
+
+
+@router.post("/index")
+async def index_jobs(jobs: List[JobPosting], _admin: int = Depends(require_admin)):
+    """Embed job descriptions into the matching index (upsert by id)."""
+    from ..ai import embeddings  # numpy: loaded on first use, not at startup
+
+    await run_in_threadpool(embeddings.index_texts, "jobs", {j.id: j.text for j in jobs})
+    return {"indexed": len(jobs)}
+
+
+@router.post("/match", response_model=List[Match])
+async def match_jobs(req: JobMatchRequest, user_id: int = Depends(get_current_user_id)):
+    """Top-k indexed jobs for a resume, by embedding similarity."""
+    text = req.resume_text
+    if req.resume_id is not None:
+        async with AsyncSessionLocal() as session:
+            resume = await session.get(Resume, req.resume_id)
+        if not resume or resume.user_id != user_id:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        text = resume.extracted_text
+    if not text:
+        raise HTTPException(status_code=400, detail="Provide resume_id of an extracted resume or resume_text")
+    from ..ai import embeddings
+
+    results = await run_in_threadpool(embeddings.nearest, "jobs", text, req.k)
+    return [Match(id=i, score=s) for i, s in results]
@@ -6,17 +6,18 @@ with a helpful message directing developers to set up Stripe credentials.
 
 from fastapi import APIRouter, Request, HTTPException
 from pydantic import BaseModel
-import stripe
 import logging
 from ..core.config import settings
+from ..billing import webhooks
+from ..billing.gateway import stripe_gateway, stripe_sdk
+from ..billing.plans import STRIPE_PLANS
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Validate Stripe API key on startup
+# The SDK is imported (and given the key) on first use, see stripe_sdk()
 if settings.STRIPE_API_KEY:
-    stripe.api_key = settings.STRIPE_API_KEY
     logger.info("✅ Stripe API key configured")
 else:
     logger.warning("⚠️  Stripe API key not configured - payment features disabled")
@@ -29,46 +30,6 @@ class CreateCheckoutSessionResponse(BaseModel):
     session_id: str
     session_url: str
 
-STRIPE_PLANS = {
-    "basic": {
-        "name": "Basic Plan",
-        "price": 990,  # $9.90/month
-        "currency": "usd",
-        "billing_period": "month",
-        "features": [
-            "5 resumes per month",
-            "Basic AI templates",
-            "PDF export"
-        ]
-    },
-    "pro": {
-        "name": "Pro Plan",
-        "price": 1990,  # $19.90/month
-        "currency": "usd",
-        "billing_period": "month",
-        "features": [
-            "Unlimited resumes",
-            "All AI templates",
-            "Premium PDF templates",
-            "Interview prep",
-            "Priority support"
-        ]
-    },
-    "enterprise": {
-        "name": "Enterprise Plan",
-        "price": 4990,  # $49.90/month
-        "currency": "usd",
-        "billing_period": "month",
-        "features": [
-            "Everything in Pro",
-            "Team collaboration",
-            "Custom templates",
-            "API access",
-            "Dedicated support"
-        ]
-    }
-}
-
 @router.post("/create-checkout-session", response_model=CreateCheckoutSessionResponse)
 async def create_checkout_session(request: CreateCheckoutSessionRequest):
     """Create a Stripe checkout session for subscription.
@@ -81,37 +42,12 @@ async def create_checkout_session(request: CreateCheckoutSessionRequest):
             detail="Stripe is not configured. Set STRIPE_API_KEY in .env to enable payments."
         )
     
+    if request.plan_type not in STRIPE_PLANS:
+        raise HTTPException(status_code=400, detail="Invalid plan type")
+
+    stripe = stripe_sdk()
     try:
-        if request.plan_type not in STRIPE_PLANS:
-            raise HTTPException(status_code=400, detail="Invalid plan type")
-        
-        plan = STRIPE_PLANS[request.plan_type]
-        
-        session = stripe.checkout.Session.create(
-            customer_email=request.email,
-            payment_method_types=["card"],
-            line_items=[
-                {
-                    "price_data": {
-                        "currency": plan["currency"],
-                        "product_data": {
-                            "name": plan["name"],
-                            "description": ", ".join(plan["features"][:2]) + "..."
-                        },
-                        "unit_amount": plan["price"],
-                        "recurring": {
-                            "interval": "month",
-                            "interval_count": 1
-                        }
-                    },
-                    "quantity": 1,
-                }
-            ],
-            mode="subscription",
-            success_url=f"{settings.FRONTEND_URL}/payment/success?session_id={{CHECKOUT_SESSION_ID}}",
-            cancel_url=f"{settings.FRONTEND_URL}/payment/cancelled",
-        )
-        
+        session = await stripe_gateway.create_checkout_session(request.plan_type, request.email)
         return {
             "session_id": session.id,
             "session_url": session.url
@@ -134,15 +70,10 @@ async def retrieve_session(request: RetrieveSessionRequest):
             status_code=501,
             detail="Stripe is not configured. Set STRIPE_API_KEY in .env to enable payments."
         )
-    
+
+    stripe = stripe_sdk()
     try:
-        session = stripe.checkout.Session.retrieve(request.session_id)
-        return {
-            "id": session.id,
-            "payment_status": session.payment_status,
-            "customer_email": session.customer_email,
-            "subscription_id": session.subscription,
-        }
+        return await stripe_gateway.retrieve_session(request.session_id)
     except stripe.error.StripeError as e:
         logger.error(f"Stripe error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -163,36 +94,18 @@ async def manage_subscription(request: ManageSubscriptionRequest):
             status_code=501,
             detail="Stripe is not configured. Set STRIPE_API_KEY in .env to enable payments."
         )
-    
+
+    stripe = stripe_sdk()
     try:
         if request.action == "cancel":
-            stripe.Subscription.delete(request.subscription_id)
+            await stripe_gateway.cancel_subscription(request.subscription_id)
             return {"status": "subscription_cancelled"}
         
         elif request.action == "update_plan":
             if not request.new_plan_type or request.new_plan_type not in STRIPE_PLANS:
                 raise HTTPException(status_code=400, detail="Invalid plan type")
             
-            subscription = stripe.Subscription.retrieve(request.subscription_id)
-            new_plan = STRIPE_PLANS[request.new_plan_type]
-            
-            stripe.Subscription.modify(
-                request.subscription_id,
-                items=[{
-                    "id": subscription["items"]["data"][0].id,
-                    "price_data": {
-                        "currency": new_plan["currency"],
-                        "product_data": {
-                            "name": new_plan["name"],
-                        },
-                        "unit_amount": new_plan["price"],
-                        "recurring": {
-                            "interval": "month"
-                        }
-                    }
-                }]
-            )
-            
+            await stripe_gateway.change_plan(request.subscription_id, request.new_plan_type)
             return {"status": "subscription_updated"}
     
     except stripe.error.StripeError as e:
@@ -205,10 +118,22 @@ async def list_plans():
 
 @router.post("/webhook")
 async def stripe_webhook(request: Request):
-    """Handle Stripe webhook events"""
+    """Handle Stripe webhook events.
+
+    Verifies the signature, stores the raw event (idempotently, keyed by the
+    Stripe event id) and acks immediately; the event is applied
+    asynchronously by a Celery worker. Duplicate deliveries are no-ops.
+    """
+    if not settings.STRIPE_WEBHOOK_SECRET:
+        raise HTTPException(
+            status_code=501,
+            detail="Stripe webhooks are not configured. Set STRIPE_WEBHOOK_SECRET in .env."
+        )
+
     payload = await request.body()
     sig = request.headers.get('stripe-signature')
-    
+
+    stripe = stripe_sdk()
     try:
         event = stripe.Webhook.construct_event(
             payload,
@@ -220,15 +145,8 @@ async def stripe_webhook(request: Request):
     except stripe.error.SignatureVerificationError:
         raise HTTPException(status_code=400, detail="Invalid signature")
     
-    # Handle the event
-    if event["type"] == "checkout.session.completed":
-        session = event["data"]["object"]
-        # TODO: Create or update user subscription in DB
-        pass
-    
-    elif event["type"] == "customer.subscription.deleted":
-        subscription = event["data"]["object"]
-        # TODO: Update user subscription status in DB
-        pass
-    
+    if not await webhooks.record_event(event, payload):
+        return {"status": "duplicate"}
+
+    await webhooks.enqueue_processing(webhooks.customer_of(event))
     return {"status": "success"}
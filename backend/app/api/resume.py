@@ -1,17 +1,38 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from ..ai.ai_client import AIClient
+from pydantic import BaseModel
+from sqlalchemy import select
+from ..ai.ai_client import AIClient, ai_client
+from ..ai.prompt_budget import assemble
+from ..core.blobs import UploadTooLarge, release_resume, store_resume
 from ..core.config import settings
+from ..core.sse import sse_response, stream_completion
+from ..db.database import AsyncSessionLocal
+from ..db.models import Resume
+from .deps import QuotaCharge, get_current_user_id, require_quota, require_recruiter
 
 router = APIRouter()
 
 @router.post("/upload")
-async def upload_resume(file: UploadFile = File(...)):
-    # TODO: store to MinIO and create Resume record
-    content = await file.read()
-    # naive text extraction for demo
-    text = content.decode(errors="ignore")[:1000]
-    return JSONResponse({"filename": file.filename, "extracted_preview": text})
+async def upload_resume(file: UploadFile = File(...), user_id: int = Depends(get_current_user_id)):
+    """Store an uploaded resume; content seen before is reused, not re-uploaded or re-extracted."""
+    try:
+        stored = await store_resume(user_id, file.file, file.filename, file.content_type)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return JSONResponse({
+        "id": stored.id,
+        "filename": file.filename,
+        "sha256": stored.sha256,
+        "extracted_preview": (stored.extracted_text or "")[:1000],
+    })
+
+@router.delete("/{resume_id}", status_code=204)
+async def delete_resume(resume_id: int, user_id: int = Depends(get_current_user_id)):
+    """Delete a resume; its stored file goes once no other resume shares it."""
+    if not await release_resume(resume_id, user_id):
+        raise HTTPException(status_code=404, detail="Resume not found")
 
 @router.post("/extract")
 async def extract_resume():
@@ -23,7 +44,41 @@ async def rewrite_resume():
     # TODO: call AIClient with resume rewrite prompt
     return {"rewritten": "TODO"}
 
+class RewriteRequest(BaseModel):
+    resume_text: str
+    role: str = ""
+
+@router.post("/rewrite/stream")
+async def rewrite_resume_stream(request: RewriteRequest, charge: QuotaCharge = Depends(require_quota("resumes"))):
+    """Rewrite a resume for a role, streamed as Server-Sent Events"""
+    prompt = assemble("rewrite_v1", role=request.role, resume=request.resume_text)
+    await charge.spend()
+    chunks = charge.guard(ai_client.stream(prompt.text, system=prompt.system, prompt_id=prompt.prompt_id))
+    return sse_response(stream_completion(chunks, prompt_id=prompt.prompt_id))
+
 @router.get("/download")
 async def download_resume():
     # TODO: stream file from MinIO
     raise HTTPException(status_code=501, detail="Not implemented")
+
+@router.get("/{resume_id}/similar")
+async def similar_resumes(
+    resume_id: int,
+    k: int = Query(10, ge=1, le=100),
+    user_id: int = Depends(require_recruiter),
+):
+    """Ids and similarity scores of the indexed resumes closest to this one (recruiters only)."""
+    async with AsyncSessionLocal() as session:
+        resume = await session.get(Resume, resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    if not resume.extracted_text:
+        raise HTTPException(status_code=409, detail="Resume text has not been extracted yet")
+    from ..ai import embeddings  # numpy: loaded on first use, not at startup
+
+    results = await run_in_threadpool(embeddings.similar, "resumes", resume_id, resume.extracted_text, k)
+    async with AsyncSessionLocal() as session:
+        # the index drops deleted resumes asynchronously
+        rows = await session.execute(select(Resume.id).where(Resume.id.in_([i for i, _ in results])))
+        live = set(rows.scalars())
+    return [{"id": i, "score": s} for i, s in results if i in live]
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from ..core import search
+from .deps import require_recruiter
+
+router = APIRouter()
+
+@router.get("/resumes")
+async def search_resumes(
+    q: str = Query(..., min_length=1, max_length=200),
+    skill: List[str] = Query([], max_items=5),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user_id: int = Depends(require_recruiter),
+):
+    """Ranked, highlighted resume search; pass ``next_cursor`` back as ``cursor`` for the next page."""
+    try:
+        hits, next_cursor = await search.search_resumes(q, skill, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "items": [
+            {
+                "id": h.id,
+                "user_id": h.user_id,
+                "filename": h.filename,
+                "created_at": h.created_at.isoformat() if h.created_at else None,
+                "rank": h.rank,
+                "highlight": h.highlight,
+            }
+            for h in hits
+        ],
+        "next_cursor": next_cursor,
+    }
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel, validator
 from typing import List
 from ..db import crud
+from ..db.database import AsyncSessionLocal
+from ..db.models import Template
+from ..ai.ai_client import ai_client
+from ..ai.template_cache import template_catalog, parse_prompt
+from ..ai.prompt_budget import count_tokens, fit_fields
+from ..core.config import settings
+from ..core.sse import sse_response, stream_completion
+from .deps import QuotaCharge, require_quota, require_admin
 
 router = APIRouter()
 
@@ -11,6 +19,12 @@ class TemplateCreate(BaseModel):
     type: str  # "cover_letter", "linkedin", "ats_optimization"
     prompt: str
     category: str = "default"
+    is_premium: bool = False
+
+    @validator("prompt")
+    def validate_prompt(cls, v):
+        parse_prompt(v)
+        return v
 
 class TemplateOut(BaseModel):
     id: int
@@ -20,45 +34,21 @@ class TemplateOut(BaseModel):
     category: str
     is_premium: bool
 
+    class Config:
+        orm_mode = True
+
 @router.get("/templates", response_model=List[TemplateOut])
-async def list_templates(category: str = None):
-    """List available AI templates"""
-    # TODO: implement fetching templates from DB
-    templates = [
-        {
-            "id": 1,
-            "name": "Professional Cover Letter",
-            "description": "Generate a professional cover letter tailored to the job",
-            "type": "cover_letter",
-            "category": "standard",
-            "is_premium": False
-        },
-        {
-            "id": 2,
-            "name": "LinkedIn Summary Generator",
-            "description": "Create an engaging LinkedIn profile summary",
-            "type": "linkedin",
-            "category": "standard",
-            "is_premium": False
-        },
-        {
-            "id": 3,
-            "name": "ATS Optimization Pro",
-            "description": "Optimize resume for Applicant Tracking Systems",
-            "type": "ats_optimization",
-            "category": "premium",
-            "is_premium": True
-        },
-        {
-            "id": 4,
-            "name": "Executive Summary",
-            "description": "Write an executive summary for your resume",
-            "type": "cover_letter",
-            "category": "premium",
-            "is_premium": True
-        },
-    ]
-    return templates
+async def list_templates(request: Request, category: str = None):
+    """List available AI templates.
+
+    Served from the in-process catalog with a strong ETag; clients that send
+    a matching ``If-None-Match`` get ``304 Not Modified``.
+    """
+    body, etag = (await template_catalog.snapshot()).listing(category)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 class GenerateRequest(BaseModel):
     template_type: str
@@ -71,32 +61,81 @@ class GenerateResponse(BaseModel):
     tokens_used: int
     template_type: str
 
+async def _render_generation_prompt(request: GenerateRequest) -> str:
+    template = (await template_catalog.snapshot()).by_type.get(request.template_type)
+    if template is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+
+    budget = settings.TEMPLATE_MAX_INPUT_TOKENS - count_tokens(template.prompt)
+    fields = fit_fields({
+        "resume_content": request.resume_content,
+        "job_description": request.job_description,
+        "additional_context": request.additional_context,
+    }, budget)
+    return template.render(fields)
+
 @router.post("/templates/generate", response_model=GenerateResponse)
-async def generate_from_template(request: GenerateRequest):
+async def generate_from_template(request: GenerateRequest, charge: QuotaCharge = Depends(require_quota("resumes"))):
     """Generate content using AI templates"""
-    # TODO: implement calling AI service with template-specific prompts
-    
-    prompts = {
-        "cover_letter": """Generate a professional cover letter based on the resume and job description provided.
-The cover letter should be compelling, personalized, and highlight relevant skills.""",
-        
-        "linkedin": """Create an engaging LinkedIn profile summary (2000 characters max) based on the resume.
-Make it professional, impactful, and highlight key achievements.""",
-        
-        "ats_optimization": """Optimize the following resume for Applicant Tracking Systems (ATS).
-Improve keyword density, formatting, and structure while maintaining all important information.""",
-    }
-    
-    prompt = prompts.get(request.template_type, "")
+    prompt = await _render_generation_prompt(request)
+    async with charge:
+        result = await ai_client.call(prompt, prompt_id="template")
     
     return {
-        "generated_content": "Generated content will be created based on AI model response",
-        "tokens_used": 150,
+        "generated_content": result["text"],
+        "tokens_used": result["usage"]["total_tokens"],
         "template_type": request.template_type
     }
 
+@router.post("/templates/generate/stream")
+async def stream_from_template(request: GenerateRequest, charge: QuotaCharge = Depends(require_quota("resumes"))):
+    """Generate content using AI templates, streamed as Server-Sent Events"""
+    prompt = await _render_generation_prompt(request)
+    await charge.spend()
+    chunks = charge.guard(ai_client.stream(prompt, prompt_id="template"))
+    return sse_response(stream_completion(chunks, template_type=request.template_type))
+
 @router.get("/templates/{template_id}", response_model=TemplateOut)
 async def get_template(template_id: int):
     """Get a specific template details"""
-    # TODO: fetch from DB
-    raise HTTPException(status_code=404, detail="Template not found")
+    row = (await template_catalog.snapshot()).listing_row(template_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return row
+
+@router.post("/templates", response_model=TemplateOut, status_code=201)
+async def create_template(data: TemplateCreate, admin_id: int = Depends(require_admin)):
+    """Create a template (admin only)"""
+    async with AsyncSessionLocal() as session:
+        template = Template(**data.dict())
+        session.add(template)
+        await session.commit()
+        await session.refresh(template)
+    await template_catalog.publish_invalidation()
+    return template
+
+@router.put("/templates/{template_id}", response_model=TemplateOut)
+async def update_template(template_id: int, data: TemplateCreate, admin_id: int = Depends(require_admin)):
+    """Replace a template (admin only)"""
+    async with AsyncSessionLocal() as session:
+        template = await session.get(Template, template_id)
+        if template is None:
+            raise HTTPException(status_code=404, detail="Template not found")
+        for field, value in data.dict().items():
+            setattr(template, field, value)
+        await session.commit()
+        await session.refresh(template)
+    await template_catalog.publish_invalidation()
+    return template
+
+@router.delete("/templates/{template_id}", status_code=204)
+async def delete_template(template_id: int, admin_id: int = Depends(require_admin)):
+    """Delete a template (admin only)"""
+    async with AsyncSessionLocal() as session:
+        template = await session.get(Template, template_id)
+        if template is None:
+            raise HTTPException(status_code=404, detail="Template not found")
+        await session.delete(template)
+        await session.commit()
+    await template_catalog.publish_invalidation()
+    return Response(status_code=204)
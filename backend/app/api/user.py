@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from ..db import crud
+from ..billing.entitlements import entitlements
+from .deps import get_current_user_id
 
 router = APIRouter()
 
@@ -9,6 +11,14 @@ async def me():
     return {"msg": "user me placeholder"}
 
 @router.get("/subscription")
-async def subscription():
-    # TODO: return subscription status
-    return {"subscription": "free", "credits": 10}
+async def subscription(user_id: int = Depends(get_current_user_id)):
+    """Current plan and this period's remaining resume credits."""
+    ent = await entitlements.get(user_id)
+    limit = ent.limit("resumes")
+    used = await entitlements.usage(user_id, "resumes")
+    return {
+        "subscription": ent.plan,
+        "status": ent.status,
+        "period_end": ent.period_end.isoformat(),
+        "credits": None if limit is None else max(limit - used, 0),
+    }
@@ -0,0 +1,219 @@
+"""Per-user plan entitlements and usage quotas.
+
+Plan checks sit on the AI request path, so they must not hit Stripe or
+Postgres per request. Entitlements are resolved through three tiers:
+
+1. an in-process LRU with a short TTL (a dict lookup on the hot path),
+2. a Redis copy shared by all workers,
+3. the ``subscriptions`` table, which webhook processing keeps current.
+
+Usage is counted per user, quota and billing period with an atomic Redis
+``INCRBY`` (rolled back if it would exceed the limit) on a key that expires
+at the end of the period. Unlimited quotas skip counting entirely. Without
+Redis, counters are kept in-process. ``refund`` gives units back when the
+request they paid for fails.
+"""
+
+import json
+import logging
+import time
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+
+from ..core.config import settings
+from ..core.metrics import cache_counters
+from ..core.redis_client import get_redis
+from ..db.database import AsyncSessionLocal
+from ..db.models import Subscription
+from .plans import PLAN_QUOTAS
+
+logger = logging.getLogger(__name__)
+
+_LOCAL_HIT, _LOCAL_MISS = cache_counters("entitlement_local")
+_REDIS_HIT, _REDIS_MISS = cache_counters("entitlement_redis")
+
+# Subscription states that grant the paid plan
+ACTIVE_STATUSES = ("active", "trialing", "past_due")
+
+_CONSUME_SCRIPT = """
+local used = redis.call('INCRBY', KEYS[1], ARGV[1])
+if used == tonumber(ARGV[1]) then
+    redis.call('EXPIREAT', KEYS[1], ARGV[3])
+end
+if used > tonumber(ARGV[2]) then
+    redis.call('DECRBY', KEYS[1], ARGV[1])
+    return {0, used - tonumber(ARGV[1])}
+end
+return {1, used}
+"""
+
+
+@dataclass(frozen=True)
+class Entitlement:
+    user_id: int
+    plan: str
+    status: str
+    period_start: datetime
+    period_end: datetime
+
+    def limit(self, quota: str) -> Optional[int]:
+        return PLAN_QUOTAS.get(self.plan, PLAN_QUOTAS["free"]).get(quota)
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["period_start"] = self.period_start.isoformat()
+        data["period_end"] = self.period_end.isoformat()
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Entitlement":
+        data = json.loads(raw)
+        data["period_start"] = datetime.fromisoformat(data["period_start"])
+        data["period_end"] = datetime.fromisoformat(data["period_end"])
+        return cls(**data)
+
+
+@dataclass(frozen=True)
+class QuotaResult:
+    allowed: bool
+    used: int
+    limit: Optional[int]
+
+
+def _calendar_month(now: datetime) -> Tuple[datetime, datetime]:
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def _aware(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def entitlement_from_subscription(user_id: int, sub: Optional[Subscription]) -> Entitlement:
+    """Derive a user's effective entitlement from their subscription row."""
+    now = datetime.now(timezone.utc)
+    if sub is not None and sub.status in ACTIVE_STATUSES and sub.plan in PLAN_QUOTAS:
+        start, end = _aware(sub.current_period_start), _aware(sub.current_period_end)
+        if start is None or end is None or end <= now:
+            start, end = _calendar_month(now)
+        return Entitlement(user_id, sub.plan, sub.status, start, end)
+    start, end = _calendar_month(now)
+    return Entitlement(user_id, "free", "active", start, end)
+
+
+class EntitlementCache:
+    """Tiered entitlement lookup plus atomic per-period usage counters."""
+
+    def __init__(
+        self,
+        local_ttl: float = settings.ENTITLEMENT_CACHE_SECONDS,
+        redis_ttl: int = settings.ENTITLEMENT_REDIS_CACHE_SECONDS,
+        max_local_entries: int = 10_000,
+    ):
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.max_local_entries = max_local_entries
+        self._local: "OrderedDict[int, Tuple[float, Entitlement]]" = OrderedDict()
+        self._counters: Counter = Counter()
+        self._consume_script = None
+        self._script_client = None
+
+    async def get(self, user_id: int) -> Entitlement:
+        cached = self._local.get(user_id)
+        if cached is not None and cached[0] > time.monotonic():
+            _LOCAL_HIT.inc()
+            self._local.move_to_end(user_id)
+            return cached[1]
+        _LOCAL_MISS.inc()
+
+        redis = get_redis()
+        entitlement = None
+        if redis is not None:
+            raw = await redis.get(f"entitlement:{user_id}")
+            if raw:
+                entitlement = Entitlement.from_json(raw)
+            (_REDIS_HIT if raw else _REDIS_MISS).inc()
+        if entitlement is None:
+            entitlement = await self._load(user_id)
+            if redis is not None:
+                await redis.set(f"entitlement:{user_id}", entitlement.to_json(), ex=self.redis_ttl)
+
+        self._local[user_id] = (time.monotonic() + self.local_ttl, entitlement)
+        self._local.move_to_end(user_id)
+        if len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+        return entitlement
+
+    async def _load(self, user_id: int) -> Entitlement:
+        async with AsyncSessionLocal() as session:
+            sub = (await session.execute(
+                select(Subscription).where(Subscription.user_id == user_id)
+            )).scalars().first()
+        return entitlement_from_subscription(user_id, sub)
+
+    async def invalidate(self, user_id: int) -> None:
+        """Drop cached entitlements after a subscription change.
+
+        Other workers' in-process copies expire within ``local_ttl``.
+        """
+        self._local.pop(user_id, None)
+        redis = get_redis()
+        if redis is not None:
+            await redis.delete(f"entitlement:{user_id}")
+
+    @staticmethod
+    def _counter_key(ent: Entitlement, quota: str) -> str:
+        return f"quota:{ent.user_id}:{quota}:{int(ent.period_start.timestamp())}"
+
+    async def consume(self, user_id: int, quota: str, amount: int = 1) -> QuotaResult:
+        """Atomically count ``amount`` units of ``quota`` if within the plan limit."""
+        ent = await self.get(user_id)
+        limit = ent.limit(quota)
+        if limit is None:
+            return QuotaResult(True, 0, None)
+
+        key = self._counter_key(ent, quota)
+        redis = get_redis()
+        if redis is not None:
+            if self._script_client is not redis:
+                self._consume_script, self._script_client = redis.register_script(_CONSUME_SCRIPT), redis
+            # keep the counter a day past the period end to absorb clock skew
+            expire_at = int(ent.period_end.timestamp()) + 86400
+            allowed, used = await self._consume_script(keys=[key], args=[amount, limit, expire_at])
+            return QuotaResult(bool(allowed), int(used), limit)
+
+        used = self._counters[key] + amount
+        if used > limit:
+            return QuotaResult(False, used - amount, limit)
+        self._counters[key] = used
+        return QuotaResult(True, used, limit)
+
+    async def refund(self, user_id: int, quota: str, amount: int = 1) -> None:
+        """Give back ``amount`` units taken by ``consume`` in this period."""
+        ent = await self.get(user_id)
+        if ent.limit(quota) is None:
+            return
+        key = self._counter_key(ent, quota)
+        redis = get_redis()
+        if redis is not None:
+            await redis.decrby(key, amount)
+        else:
+            self._counters[key] = max(self._counters[key] - amount, 0)
+
+    async def usage(self, user_id: int, quota: str) -> int:
+        ent = await self.get(user_id)
+        key = self._counter_key(ent, quota)
+        redis = get_redis()
+        if redis is not None:
+            return int(await redis.get(key) or 0)
+        return self._counters[key]
+
+
+entitlements = EntitlementCache()
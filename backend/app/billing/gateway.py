@@ -0,0 +1,186 @@
+"""Non-blocking access to the Stripe API.
+
+The ``stripe`` SDK is synchronous, so every call is run on a small bounded
+thread pool instead of the event loop. Plan prices are created once in
+Stripe (looked up by ``plan_lookup_key``) and their ids cached, so checkout
+sessions reference a Price instead of sending inline ``price_data``.
+Checkout-session lookups are cached briefly and concurrent lookups of the
+same session share one request.
+
+The SDK itself is imported on first use (``stripe_sdk()``): it is one of the
+heaviest imports in the app and most workers never talk to Stripe.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..core.metrics import cache_counters
+from .plans import STRIPE_PLANS, plan_lookup_key
+
+logger = logging.getLogger(__name__)
+
+# Expired session-cache entries are swept once the cache grows past this
+SESSION_CACHE_SWEEP_SIZE = 1024
+
+_SESSION_HIT, _SESSION_MISS = cache_counters("stripe_session")
+
+
+def stripe_sdk():
+    """The ``stripe`` module, imported and given the API key on first use."""
+    import stripe
+
+    if settings.STRIPE_API_KEY and not stripe.api_key:
+        stripe.api_key = settings.STRIPE_API_KEY
+    return stripe
+
+
+class StripeGateway:
+    """Async facade over the Stripe SDK."""
+
+    def __init__(
+        self,
+        max_workers: int = settings.STRIPE_MAX_WORKERS,
+        session_cache_ttl: float = settings.STRIPE_SESSION_CACHE_SECONDS,
+    ):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stripe")
+        self._session_cache_ttl = session_cache_ttl
+        self._session_cache: Dict[str, Tuple[float, dict]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._price_ids: Dict[str, str] = {}
+        self._prices_lock: Optional[asyncio.Lock] = None
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking SDK call on the Stripe thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    # --- Price catalog -------------------------------------------------------
+
+    async def ensure_prices(self) -> Dict[str, str]:
+        """Look up (creating if missing) the Stripe Price for every plan.
+
+        Returns:
+            dict: plan type -> Stripe price id
+        """
+        if self._prices_lock is None:
+            self._prices_lock = asyncio.Lock()
+        async with self._prices_lock:
+            missing = [p for p in STRIPE_PLANS if p not in self._price_ids]
+            if not missing:
+                return dict(self._price_ids)
+
+            keys = {plan_lookup_key(p): p for p in missing}
+            existing = await self.run(stripe_sdk().Price.list, lookup_keys=list(keys), active=True, limit=len(keys))
+            for price in existing.data:
+                self._price_ids[keys[price.lookup_key]] = price.id
+
+            to_create = [p for p in missing if p not in self._price_ids]
+            created = await asyncio.gather(*(self._create_price(p) for p in to_create))
+            self._price_ids.update(zip(to_create, created))
+            if to_create:
+                logger.info(f"✅ Created Stripe prices for plans: {', '.join(to_create)}")
+            return dict(self._price_ids)
+
+    async def _create_price(self, plan_type: str) -> str:
+        plan = STRIPE_PLANS[plan_type]
+        product = await self.run(
+            stripe_sdk().Product.create,
+            name=plan["name"],
+            description=", ".join(plan["features"][:2]) + "...",
+        )
+        price = await self.run(
+            stripe_sdk().Price.create,
+            product=product.id,
+            currency=plan["currency"],
+            unit_amount=plan["price"],
+            recurring={"interval": plan["billing_period"], "interval_count": 1},
+            lookup_key=plan_lookup_key(plan_type),
+        )
+        return price.id
+
+    async def price_id(self, plan_type: str) -> str:
+        if plan_type not in self._price_ids:
+            await self.ensure_prices()
+        return self._price_ids[plan_type]
+
+    def plan_for_price(self, price_id: str) -> Optional[str]:
+        """Reverse lookup of a cached price id to its plan type."""
+        for plan_type, cached in self._price_ids.items():
+            if cached == price_id:
+                return plan_type
+        return None
+
+    # --- Checkout / subscriptions ------------------------------------------
+
+    async def create_checkout_session(self, plan_type: str, email: str):
+        return await self.run(
+            stripe_sdk().checkout.Session.create,
+            customer_email=email,
+            payment_method_types=["card"],
+            line_items=[{"price": await self.price_id(plan_type), "quantity": 1}],
+            mode="subscription",
+            metadata={"plan_type": plan_type},
+            subscription_data={"metadata": {"plan_type": plan_type}},
+            success_url=f"{settings.FRONTEND_URL}/payment/success?session_id={{CHECKOUT_SESSION_ID}}",
+            cancel_url=f"{settings.FRONTEND_URL}/payment/cancelled",
+        )
+
+    async def retrieve_session(self, session_id: str) -> dict:
+        """Fetch a checkout session summary, cached for a few seconds."""
+        cached = self._session_cache.get(session_id)
+        if cached and cached[0] > time.monotonic():
+            _SESSION_HIT.inc()
+            return cached[1]
+        _SESSION_MISS.inc()
+
+        inflight = self._inflight.get(session_id)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[session_id] = future
+        try:
+            session = await self.run(stripe_sdk().checkout.Session.retrieve, session_id)
+            result = {
+                "id": session.id,
+                "payment_status": session.payment_status,
+                "customer_email": session.customer_email,
+                "subscription_id": session.subscription,
+            }
+            now = time.monotonic()
+            if len(self._session_cache) >= SESSION_CACHE_SWEEP_SIZE:
+                self._session_cache = {k: v for k, v in self._session_cache.items() if v[0] > now}
+            self._session_cache[session_id] = (now + self._session_cache_ttl, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # raised to our caller below; don't warn if nobody else waited
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[session_id]
+
+    async def cancel_subscription(self, subscription_id: str):
+        return await self.run(stripe_sdk().Subscription.delete, subscription_id)
+
+    async def change_plan(self, subscription_id: str, plan_type: str):
+        """Move a subscription's single item to another plan's price."""
+        subscription, price = await asyncio.gather(
+            self.run(stripe_sdk().Subscription.retrieve, subscription_id),
+            self.price_id(plan_type),
+        )
+        return await self.run(
+            stripe_sdk().Subscription.modify,
+            subscription_id,
+            items=[{"id": subscription["items"]["data"][0].id, "price": price}],
+        )
+
+
+stripe_gateway = StripeGateway()
@@ -0,0 +1,70 @@
+"""Subscription plan catalog.
+
+Prices are in the smallest currency unit. Each plan maps to a Stripe Price
+through a lookup key derived from its price terms, so changing a price here
+creates a new Stripe Price instead of mutating the old one.
+"""
+
+from ..core.config import settings
+
+STRIPE_PLANS = {
+    "basic": {
+        "name": "Basic Plan",
+        "price": 990,  # $9.90/month
+        "currency": "usd",
+        "billing_period": "month",
+        "features": [
+            "5 resumes per month",
+            "Basic AI templates",
+            "PDF export"
+        ]
+    },
+    "pro": {
+        "name": "Pro Plan",
+        "price": 1990,  # $19.90/month
+        "currency": "usd",
+        "billing_period": "month",
+        "features": [
+            "Unlimited resumes",
+            "All AI templates",
+            "Premium PDF templates",
+            "Interview prep",
+            "Priority support"
+        ]
+    },
+    "enterprise": {
+        "name": "Enterprise Plan",
+        "price": 4990,  # $49.90/month
+        "currency": "usd",
+        "billing_period": "month",
+        "features": [
+            "Everything in Pro",
+            "Team collaboration",
+            "Custom templates",
+            "API access",
+            "Dedicated support"
+        ]
+    }
+}
+
+
+def plan_lookup_key(plan_type: str) -> str:
+    """Stripe Price lookup key for a plan's current terms."""
+    plan = STRIPE_PLANS[plan_type]
+    return f"{plan_type}_{plan['price']}_{plan['currency']}_{plan['billing_period']}"
+
+
+# Monthly quotas per plan (None = unlimited). Users without an active
+# subscription get the "free" plan, unlimited unless FREE_PLAN_MONTHLY_RESUMES is set.
+PLAN_QUOTAS = {
+    "free": {"resumes": settings.FREE_PLAN_MONTHLY_RESUMES},
+    "basic": {"resumes": 5},
+    "pro": {"resumes": None},
+    "enterprise": {"resumes": None},
+}
+
+
+def plan_from_lookup_key(lookup_key: str) -> str:
+    """Inverse of ``plan_lookup_key``; returns "" for foreign prices."""
+    plan_type = (lookup_key or "").split("_", 1)[0]
+    return plan_type if plan_type in STRIPE_PLANS else ""
@@ -0,0 +1,272 @@
+"""Stripe webhook ingestion and ordered asynchronous processing.
+
+The webhook endpoint only verifies the signature and stores the raw event
+with a single ``INSERT ... ON CONFLICT DO NOTHING`` keyed by Stripe's event
+id, then hands off to Celery and acks. Replays and duplicate deliveries hit
+the conflict and are dropped.
+
+Processing happens in ``process_pending_events``: a worker takes a
+per-customer lock (events without a customer share one) and applies that
+customer's unprocessed events in Stripe ``created`` order, one transaction
+per event. Whichever task gets the lock
+first drains the whole backlog for the customer, so the order in which
+Celery happens to run tasks does not matter. A task that finds the lock
+taken does not wait for it (that would hold a worker slot per queued
+event); it raises ``CustomerBusy`` and is retried a few seconds later, in
+case its event arrived after the holder's last read.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from datetime import datetime, timezone
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..db.database import engine
+from ..db.models import PaymentRecord, StripeEvent, Subscription, User
+from .entitlements import entitlements
+from .plans import plan_from_lookup_key
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[AsyncConnection, dict], Awaitable[Optional[int]]]
+
+# Stripe event type -> handler(conn, event["data"]["object"]), returning the
+# id of a user whose entitlements changed (invalidated once the event commits)
+EVENT_HANDLERS: Dict[str, EventHandler] = {}
+
+
+def handles(event_type: str):
+    """Register a coroutine as the handler for a Stripe event type."""
+    def decorator(fn: EventHandler) -> EventHandler:
+        EVENT_HANDLERS[event_type] = fn
+        return fn
+    return decorator
+
+
+def customer_of(event: dict) -> Optional[str]:
+    """Stripe customer id an event belongs to (its ordering key), if any."""
+    obj = event.get("data", {}).get("object", {})
+    customer = obj.get("customer")
+    if isinstance(customer, dict):
+        customer = customer.get("id")
+    return customer
+
+
+BUSY_RETRY_SECONDS = 5
+
+
+class CustomerBusy(Exception):
+    """Another worker holds the customer's lock and is applying its events."""
+
+
+def _insert(table):
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    return dialect.insert(table)
+
+
+async def record_event(event: dict, payload: bytes) -> bool:
+    """Persist a verified event. Returns False if it was already recorded."""
+    stmt = _insert(StripeEvent.__table__).values(
+        id=event["id"],
+        type=event["type"],
+        customer_id=customer_of(event),
+        stripe_created=event.get("created") or 0,
+        payload=payload.decode(),
+    ).on_conflict_do_nothing(index_elements=["id"])
+    async with engine.begin() as conn:
+        result = await conn.execute(stmt)
+    return result.rowcount == 1
+
+
+async def enqueue_processing(customer_id: Optional[str]) -> None:
+    """Queue processing for a customer without blocking the event loop.
+
+    A broker outage is logged and tolerated: the event is already stored
+    and the periodic sweep will pick it up.
+    """
+    from ..tasks import process_stripe_events
+
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, process_stripe_events.delay, customer_id)
+    except Exception as e:
+        logger.warning(f"⚠️  Could not enqueue Stripe event processing (sweep will retry): {e}")
+
+
+def _lock_name(customer_id: Optional[str]) -> str:
+    # events without a customer are one more queue, serialized like any other
+    return "stripe:" if customer_id is None else f"stripe:{customer_id}"
+
+
+def _customer_clause(customer_id: Optional[str]):
+    if customer_id is None:
+        return StripeEvent.customer_id.is_(None)
+    return StripeEvent.customer_id == customer_id
+
+
+async def process_pending_events(customer_id: Optional[str]) -> int:
+    """Apply one customer's unprocessed events in order.
+
+    Stops at the first failing event (recording its error) and re-raises so
+    the task is retried; later events for the customer wait behind it.
+
+    Returns:
+        int: Number of events processed
+
+    Raises:
+        CustomerBusy: If another worker is processing this customer's events
+    """
+    use_lock = engine.dialect.name == "postgresql"
+    lock_key = func.hashtext(_lock_name(customer_id))
+    processed = 0
+    async with engine.connect() as conn:
+        if use_lock:
+            acquired = (await conn.execute(select(func.pg_try_advisory_lock(lock_key)))).scalar()
+            await conn.commit()
+            if not acquired:
+                raise CustomerBusy(f"Stripe events of {customer_id} are being processed by another worker")
+        try:
+            pending = (await conn.execute(
+                select(StripeEvent.id, StripeEvent.type, StripeEvent.payload)
+                .where(_customer_clause(customer_id), StripeEvent.processed_at.is_(None))
+                .order_by(StripeEvent.stripe_created, StripeEvent.received_at, StripeEvent.id)
+            )).all()
+            await conn.commit()
+
+            for event_id, event_type, payload in pending:
+                handler = EVENT_HANDLERS.get(event_type)
+                changed_user = None
+                try:
+                    async with conn.begin():
+                        if handler is not None:
+                            changed_user = await handler(conn, json.loads(payload)["data"]["object"])
+                        await conn.execute(
+                            update(StripeEvent)
+                            .where(StripeEvent.id == event_id)
+                            .values(processed_at=func.now(), last_error=None)
+                        )
+                except Exception as e:
+                    logger.error(f"❌ Stripe event {event_id} ({event_type}) failed: {e}")
+                    async with conn.begin():
+                        await conn.execute(
+                            update(StripeEvent).where(StripeEvent.id == event_id).values(last_error=repr(e))
+                        )
+                    raise
+                if changed_user is not None:
+                    # only after commit: a read in between would re-cache the old plan
+                    await _invalidate(changed_user)
+                processed += 1
+        finally:
+            if use_lock:
+                await conn.execute(select(func.pg_advisory_unlock(lock_key)))
+                await conn.commit()
+    return processed
+
+
+async def _invalidate(user_id: int) -> None:
+    try:
+        await entitlements.invalidate(user_id)
+    except Exception as e:  # the event is committed; cached entitlements expire on their own
+        logger.warning(f"⚠️  Could not invalidate entitlements of user {user_id}: {e}")
+
+
+async def customers_with_pending_events() -> List[Optional[str]]:
+    """Customers that still have unprocessed events (for the periodic sweep)."""
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(StripeEvent.customer_id).where(StripeEvent.processed_at.is_(None)).distinct()
+        )
+        return [row[0] for row in result]
+
+
+def _timestamp(value: Optional[int]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, tz=timezone.utc) if value else None
+
+
+@handles("checkout.session.completed")
+async def _checkout_session_completed(conn: AsyncConnection, session: dict) -> Optional[int]:
+    email = session.get("customer_email") or (session.get("customer_details") or {}).get("email")
+    user_id = (await conn.execute(select(User.id).where(User.email == email))).scalar()
+    if user_id is None:
+        logger.warning(f"⚠️  Checkout {session.get('id')} completed for unknown email; skipping")
+        return None
+    values = {
+        "stripe_customer_id": session.get("customer"),
+        "stripe_subscription_id": session.get("subscription"),
+        "plan": (session.get("metadata") or {}).get("plan_type") or "basic",
+        "status": "active",
+    }
+    await conn.execute(
+        _insert(Subscription.__table__)
+        .values(user_id=user_id, **values)
+        .on_conflict_do_update(index_elements=["user_id"], set_={**values, "updated_at": func.now()})
+    )
+    return user_id
+
+
+@handles("customer.subscription.created")
+@handles("customer.subscription.updated")
+@handles("customer.subscription.deleted")
+async def _subscription_changed(conn: AsyncConnection, subscription: dict) -> Optional[int]:
+    row = (await conn.execute(
+        select(Subscription.id, Subscription.user_id).where(or_(
+            Subscription.stripe_subscription_id == subscription.get("id"),
+            Subscription.stripe_customer_id == subscription.get("customer"),
+        ))
+    )).first()
+    if row is None:
+        # Not linked to a user yet; checkout.session.completed will create the row
+        logger.info(f"Subscription {subscription.get('id')} has no local record yet; skipping")
+        return None
+
+    values = {
+        "stripe_subscription_id": subscription.get("id"),
+        "status": subscription.get("status") or "active",
+        "current_period_start": _timestamp(subscription.get("current_period_start")),
+        "current_period_end": _timestamp(subscription.get("current_period_end")),
+    }
+    items = (subscription.get("items") or {}).get("data") or []
+    plan = (subscription.get("metadata") or {}).get("plan_type")
+    if not plan and items:
+        plan = plan_from_lookup_key((items[0].get("price") or {}).get("lookup_key"))
+    if plan:
+        values["plan"] = plan
+    await conn.execute(update(Subscription).where(Subscription.id == row.id).values(**values))
+    return row.user_id
+
+
+async def _record_payment(conn: AsyncConnection, obj: dict, amount_field: str, status: str) -> None:
+    customer_id = obj.get("customer")
+    sub = (await conn.execute(
+        select(Subscription.user_id, Subscription.plan).where(Subscription.stripe_customer_id == customer_id)
+    )).first()
+    await conn.execute(insert(PaymentRecord).values(
+        user_id=sub.user_id if sub else None,
+        stripe_customer_id=customer_id,
+        stripe_object_id=obj.get("id"),
+        plan=sub.plan if sub else None,
+        amount=obj.get(amount_field) or 0,
+        currency=obj.get("currency") or "usd",
+        status=status,
+    ))
+
+
+@handles("invoice.payment_succeeded")
+async def _invoice_payment_succeeded(conn: AsyncConnection, invoice: dict) -> None:
+    await _record_payment(conn, invoice, "amount_paid", "succeeded")
+
+
+@handles("invoice.payment_failed")
+async def _invoice_payment_failed(conn: AsyncConnection, invoice: dict) -> None:
+    await _record_payment(conn, invoice, "amount_due", "failed")
+
+
+@handles("charge.refunded")
+async def _charge_refunded(conn: AsyncConnection, charge: dict) -> None:
+    await _record_payment(conn, charge, "amount_refunded", "refunded")
@@ -0,0 +1,282 @@
+"""Content-addressed storage for uploaded resumes.
+
+An upload is hashed (SHA-256) while it is read from the spooled request
+body, and its bytes are stored once under ``blob_key(sha256)`` however many
+users or times it is uploaded. A ``ResumeBlob`` row per digest holds the
+object key, the extracted text and a reference count; every ``Resume``
+points at its blob. A repeat upload only bumps the count and reuses the
+stored text: no second MinIO upload and no second extraction.
+
+Reference counts change inside the same transaction as the ``Resume`` row
+they account for. New content is uploaded and its text extracted before
+that transaction, so neither a slow object store nor a large PDF holds a
+connection or a row lock; the transaction then inserts the blob row, or
+takes a reference on the one a concurrent upload inserted first.
+
+Removal happens once the last reference is committed away, in its own
+transaction that holds the blob row while the object is deleted. An upload
+of the same content waits for it, then finds no row (and inserts its own)
+or, if the removal failed or rolled back, an unreferenced row whose object
+it restores. No referenced row ever points at a removed object.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..db.database import engine
+from ..db.models import Resume, ResumeBlob
+from . import minio_utils
+from .config import settings
+from .metrics import observe_minio
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class StoredResume:
+    id: int
+    sha256: str
+    s3_key: str
+    size: int
+    extracted_text: Optional[str]
+    deduplicated: bool
+
+
+def blob_key(sha256: str) -> str:
+    """Object key for content with this digest (two-level fan-out by prefix)."""
+    return f"{minio_utils.BLOB_PREFIX}{sha256[:2]}/{sha256}"
+
+
+def digest(fileobj: BinaryIO, max_bytes: int = None) -> tuple:
+    """SHA-256 hex digest and size of a file, read in chunks and rewound.
+
+    Raises:
+        UploadTooLarge: If the file is longer than ``max_bytes``
+    """
+    max_bytes = settings.MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    sha, size = hashlib.sha256(), 0
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        sha.update(chunk)
+    fileobj.seek(0)
+    return sha.hexdigest(), size
+
+
+def extract_text(fileobj: BinaryIO, filename: str = "", content_type: Optional[str] = None) -> str:
+    """Plain text of a PDF (via PyPDF2) or of any other file decoded as UTF-8."""
+    fileobj.seek(0)
+    data = fileobj.read()
+    fileobj.seek(0)
+    if content_type == "application/pdf" or (filename or "").lower().endswith(".pdf"):
+        try:
+            from PyPDF2 import PdfReader
+
+            return "\n".join(page.extract_text() or "" for page in PdfReader(io.BytesIO(data)).pages)
+        except Exception as e:
+            logger.warning(f"⚠️ PDF text extraction failed for {filename!r}, falling back to raw text: {e}")
+    return data.decode(errors="ignore")
+
+
+def _insert(table):
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    return dialect.insert(table)
+
+
+async def _lookup(sha256: str):
+    """(refcount, extracted_text) of a blob, read without locking; None if there is none."""
+    async with engine.connect() as conn:
+        return (await conn.execute(
+            select(ResumeBlob.refcount, ResumeBlob.extracted_text).where(ResumeBlob.sha256 == sha256)
+        )).one_or_none()
+
+
+def put_blob(fileobj: BinaryIO, key: str, size: int, content_type: Optional[str]) -> None:
+    """Upload content to its blob key; repeating it rewrites the same bytes."""
+    fileobj.seek(0)
+    with observe_minio("put_object"):
+        minio_utils.get_minio_client().put_object(
+            settings.MINIO_BUCKET, key, fileobj, size, content_type=content_type or "application/octet-stream"
+        )
+    fileobj.seek(0)
+
+
+async def _ensure_object(fileobj: BinaryIO, key: str, size: int, content_type: Optional[str]) -> None:
+    """Put the object back if a removal took it after this upload; call with the blob row
+    locked, or once a committed reference keeps it from being removed again."""
+    from minio.error import S3Error
+
+    try:
+        with observe_minio("stat_object"):
+            await asyncio.to_thread(minio_utils.get_minio_client().stat_object, settings.MINIO_BUCKET, key)
+    except S3Error:
+        logger.warning(f"⚠️ Resume blob {key} was removed during an upload of it; restoring")
+        await asyncio.to_thread(put_blob, fileobj, key, size, content_type)
+
+
+async def _reference(conn: AsyncConnection, fileobj: BinaryIO, sha256: str, size: int,
+                     content_type: Optional[str], text: Optional[str], uploaded: bool):
+    """Take a reference on the content's blob row, inserting it if there is none.
+
+    Returns (key, extracted text, deduplicated), or None if the content has
+    to be uploaded first: its row is gone, or unreferenced and its object
+    may have been removed.
+    """
+    key = blob_key(sha256)
+    if uploaded:
+        created = await conn.execute(
+            _insert(ResumeBlob.__table__)
+            .values(sha256=sha256, s3_key=key, size=size, content_type=content_type, refcount=1,
+                    extracted_text=text)
+            .on_conflict_do_nothing(index_elements=["sha256"])
+        )
+        if created.rowcount:
+            await _ensure_object(fileobj, key, size, content_type)
+            logger.info(f"✅ Stored resume blob {sha256[:12]} ({size} bytes)")
+            return key, text, False
+
+    locked = (
+        select(ResumeBlob.s3_key, ResumeBlob.refcount, ResumeBlob.extracted_text)
+        .where(ResumeBlob.sha256 == sha256)
+    )
+    if engine.dialect.name == "postgresql":
+        locked = locked.with_for_update()
+    row = (await conn.execute(locked)).one_or_none()
+    if row is None or (row.refcount == 0 and not uploaded):
+        return None
+    if row.refcount == 0:
+        await _ensure_object(fileobj, row.s3_key, size, content_type)
+    values = {"refcount": ResumeBlob.refcount + 1}
+    if row.extracted_text is None and text is not None:
+        values["extracted_text"] = text
+    await conn.execute(update(ResumeBlob).where(ResumeBlob.sha256 == sha256).values(**values))
+    return row.s3_key, row.extracted_text or text, True
+
+
+async def _enqueue(task_name: str, resume_ids: List[int]) -> None:
+    if not resume_ids:
+        return
+    from .. import tasks  # celery: loaded on first use, not at startup
+
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, getattr(tasks, task_name).delay, resume_ids)
+    except Exception as e:
+        logger.warning(f"⚠️  Could not enqueue {task_name} of {len(resume_ids)} resumes: {e}")
+
+
+async def enqueue_indexing(resume_ids: List[int]) -> None:
+    """Queue resumes for the similarity index without blocking the event loop.
+
+    A broker outage is logged and tolerated: ``/resume/{id}/similar`` indexes
+    a missing resume on first use.
+    """
+    await _enqueue("index_resumes", resume_ids)
+
+
+async def enqueue_unindexing(resume_ids: List[int]) -> None:
+    """Queue deleted resumes for removal from the similarity index.
+
+    A broker outage is logged and tolerated: ``/resume/{id}/similar`` drops
+    ids whose resume no longer exists.
+    """
+    await _enqueue("unindex_resumes", resume_ids)
+
+
+async def store_resume(user_id: int, fileobj: BinaryIO, filename: str = "",
+                       content_type: Optional[str] = None) -> StoredResume:
+    """Create a Resume for an upload, storing its content only if it is new.
+
+    Raises:
+        UploadTooLarge: If the file is longer than ``MAX_UPLOAD_BYTES``
+    """
+    sha256, size = await asyncio.to_thread(digest, fileobj)
+    known = await _lookup(sha256)
+    # content with live references already has its object and text: only the count changes
+    upload = known is None or known.refcount == 0 or known.extracted_text is None
+    text = known.extracted_text if known is not None else None
+    for _ in range(3):
+        if upload:
+            await asyncio.to_thread(put_blob, fileobj, blob_key(sha256), size, content_type)
+            if text is None:
+                text = await asyncio.to_thread(extract_text, fileobj, filename, content_type)
+        async with engine.begin() as conn:
+            taken = await _reference(conn, fileobj, sha256, size, content_type, text, upload)
+            if taken is not None:
+                key, text, deduplicated = taken
+                result = await conn.execute(
+                    _insert(Resume.__table__).values(
+                        user_id=user_id, s3_key=key, blob_sha256=sha256, filename=filename, extracted_text=text
+                    )
+                )
+                resume_id = result.inserted_primary_key[0]
+                break
+        upload = True  # removed, or released to zero, since the lookup
+    else:
+        raise RuntimeError(f"Could not store resume blob {sha256}")
+    if text:
+        await enqueue_indexing([resume_id])
+    return StoredResume(resume_id, sha256, key, size, text, deduplicated)
+
+
+async def release_blob(conn: AsyncConnection, sha256: str) -> bool:
+    """Drop one reference. True if it was the last: pass the digest to
+    ``collect_blob`` once the transaction has committed."""
+    await conn.execute(
+        update(ResumeBlob).where(ResumeBlob.sha256 == sha256).values(refcount=ResumeBlob.refcount - 1)
+    )
+    refcount = (await conn.execute(select(ResumeBlob.refcount).where(ResumeBlob.sha256 == sha256))).scalar()
+    return refcount is not None and refcount <= 0
+
+
+async def collect_blob(sha256: str) -> None:
+    """Remove an unreferenced blob's object and row; see the module docstring."""
+    async with engine.begin() as conn:
+        locked = select(ResumeBlob.s3_key).where(ResumeBlob.sha256 == sha256, ResumeBlob.refcount <= 0)
+        if engine.dialect.name == "postgresql":
+            locked = locked.with_for_update()
+        key = (await conn.execute(locked)).scalar()
+        if key is None:
+            return  # referenced again in the meantime
+        removed = await asyncio.to_thread(minio_utils.delete_object, settings.MINIO_BUCKET, key, True)
+        if removed:
+            await conn.execute(delete(ResumeBlob).where(ResumeBlob.sha256 == sha256))
+            logger.info(f"✅ Removed unreferenced resume blob {sha256[:12]}")
+        else:
+            logger.warning(f"⚠️ Kept unreferenced resume blob {sha256[:12]} at refcount 0; removal failed")
+
+
+async def release_resume(resume_id: int, user_id: int) -> bool:
+    """Delete a user's Resume and release its blob. False if there is no such resume."""
+    async with engine.begin() as conn:
+        row = (await conn.execute(
+            select(Resume.blob_sha256, Resume.s3_key).where(Resume.id == resume_id, Resume.user_id == user_id)
+        )).one_or_none()
+        if row is None:
+            return False
+        await conn.execute(delete(Resume).where(Resume.id == resume_id))
+        last = bool(row.blob_sha256) and await release_blob(conn, row.blob_sha256)
+    await enqueue_unindexing([resume_id])
+    # objects go only once nothing committed refers to them
+    if last:
+        await collect_blob(row.blob_sha256)
+    elif not row.blob_sha256 and row.s3_key:
+        # uploaded before content addressing: the object is this resume's alone
+        await asyncio.to_thread(minio_utils.delete_object, settings.MINIO_BUCKET, row.s3_key)
+    return True
@@ -0,0 +1,369 @@
+"""Bulk resume import from a zip archive or a MinIO prefix.
+
+Entries are streamed one at a time: zip members are read straight from the
+archive into memory and MinIO objects from ``get_object``, and nothing is
+extracted to disk. The pipeline works on batches of up to
+``IMPORT_BATCH_SIZE`` entries or ``IMPORT_BATCH_MAX_BYTES`` of file content,
+whichever is reached first. Batches are read on a thread, the next one while
+the current one is processed, so at most two are held at a time:
+
+1. Hash every entry in this process; entries whose content is already a
+   ``ResumeBlob`` (see ``app.core.blobs``) reuse its stored text.
+2. Extract text from the remaining, distinct contents on a process pool
+   (``IMPORT_WORKERS`` processes, one per core by default). PDF parsing is
+   CPU-bound and would serialize on the GIL in threads.
+3. Upload objects for contents that had no references at the lookup,
+   before any row is locked.
+4. Write the batch in one transaction: insert the new blobs, lock the
+   batch's blob rows, add the batch's references with one ``executemany``,
+   and insert the ``Resume`` rows with another. Once it has committed, the
+   objects of blobs that had no references under the lock are checked and
+   restored if a concurrent removal took them (the new references keep
+   them from being removed again).
+5. Record progress and per-file errors on the ``ImportJob`` row, in the
+   same transaction as the batch's rows, and queue the new resumes for the
+   similarity index (``app.tasks.index_resumes``).
+
+Because progress commits with the rows it counts, a job interrupted by a
+worker crash is picked up where it stopped: the redelivered task skips the
+``processed`` entries it has already stored (see ``run_job``).
+
+The pool forks worker processes, so imports run in a Celery worker started
+with ``--pool=solo`` (prefork children are daemonic and may not have
+children of their own); see ``app.tasks.import_resumes``.
+"""
+
+import asyncio
+import hashlib
+import io
+import itertools
+import json
+import logging
+import os
+import tempfile
+import zipfile
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..db.database import engine
+from ..db.models import ImportJob, Resume, ResumeBlob
+from . import minio_utils
+from .blobs import _ensure_object, _insert, blob_key, enqueue_indexing, extract_text, put_blob
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".md")
+MAX_RECORDED_ERRORS = 1000
+
+
+@dataclass
+class Entry:
+    name: str
+    data: Optional[bytes] = None
+    error: Optional[str] = None
+
+
+def _check(name: str, size: int) -> Optional[str]:
+    """Why an entry is skipped, or None if it should be imported."""
+    if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+        return "unsupported file type"
+    if size > settings.MAX_UPLOAD_BYTES:
+        return f"larger than {settings.MAX_UPLOAD_BYTES} bytes"
+    return None
+
+
+def iter_zip(path: str) -> Iterator[Entry]:
+    """Files in a zip archive, read member by member (directories and macOS metadata skipped)."""
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            hidden = info.filename.startswith("__MACOSX/") or os.path.basename(info.filename).startswith(".")
+            if info.is_dir() or hidden:
+                continue
+            error = _check(info.filename, info.file_size)
+            if error:
+                yield Entry(info.filename, error=error)
+                continue
+            try:
+                yield Entry(info.filename, archive.read(info))
+            except (zipfile.BadZipFile, OSError, RuntimeError) as e:  # corrupt or encrypted member
+                yield Entry(info.filename, error=str(e))
+
+
+def iter_minio(prefix: str) -> Iterator[Entry]:
+    """Objects under a prefix of the resume bucket, downloaded one at a time."""
+    from minio.error import S3Error
+
+    client = minio_utils.get_minio_client()
+    for obj in client.list_objects(settings.MINIO_BUCKET, prefix=prefix, recursive=True):
+        error = _check(obj.object_name, obj.size or 0)
+        if error:
+            yield Entry(obj.object_name, error=error)
+            continue
+        try:
+            response = client.get_object(settings.MINIO_BUCKET, obj.object_name)
+            try:
+                yield Entry(obj.object_name, response.read())
+            finally:
+                response.close()
+                response.release_conn()
+        except S3Error as e:
+            yield Entry(obj.object_name, error=str(e))
+
+
+def _batches(entries: Iterable[Entry], size: int, max_bytes: int) -> Iterator[List[Entry]]:
+    batch, held = [], 0
+    for entry in entries:
+        batch.append(entry)
+        held += len(entry.data or b"")
+        if len(batch) == size or held >= max_bytes:
+            yield batch
+            batch, held = [], 0
+    if batch:
+        yield batch
+
+
+def extract_entry(name: str, data: bytes) -> str:
+    """Process-pool task: text of one file."""
+    return extract_text(io.BytesIO(data), name)
+
+
+@dataclass
+class BatchResult:
+    imported: int = 0
+    deduplicated: int = 0
+    errors: List[dict] = field(default_factory=list)
+    size: int = 0  # entries in the batch
+    indexable: List[int] = field(default_factory=list)  # Resume ids to (re-)embed
+
+
+async def _extract_all(pool: Executor, todo: Dict[str, Entry]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Extract text for each digest on the pool; (texts, errors) keyed by digest."""
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(pool, extract_entry, e.name, e.data) for e in todo.values()),
+        return_exceptions=True,
+    )
+    texts, errors = {}, {}
+    for sha256, result in zip(todo, results):
+        if isinstance(result, BaseException):
+            errors[sha256] = f"text extraction failed: {result}"
+        else:
+            texts[sha256] = result
+    return texts, errors
+
+
+Record = Callable[[AsyncConnection, BatchResult], Awaitable[None]]
+
+
+async def _record_alone(record: Optional[Record], result: BatchResult) -> BatchResult:
+    if record is not None:
+        async with engine.begin() as conn:
+            await record(conn, result)
+    return result
+
+
+async def import_batch(pool: Executor, user_id: int, batch: List[Entry],
+                       record: Optional[Record] = None) -> BatchResult:
+    """Store one batch of entries as Resume rows; see the module docstring.
+
+    ``record`` runs exactly once with the batch's result, inside the
+    transaction that writes its rows when there are any.
+    """
+    result = BatchResult(size=len(batch), errors=[{"file": e.name, "error": e.error} for e in batch if e.error])
+    named = [(e, hashlib.sha256(e.data).hexdigest()) for e in batch if not e.error]
+    if not named:
+        return await _record_alone(record, result)
+    content = {sha256: e for e, sha256 in named}
+
+    async with engine.connect() as conn:
+        known = {r.sha256: r for r in (await conn.execute(
+            select(ResumeBlob.sha256, ResumeBlob.refcount, ResumeBlob.extracted_text)
+            .where(ResumeBlob.sha256.in_(content))
+        )).all()}
+    texts = {s: r.extracted_text for s, r in known.items() if r.extracted_text is not None}
+    extracted, failed = await _extract_all(pool, {s: e for s, e in content.items() if s not in texts})
+    texts.update(extracted)
+    result.errors += [{"file": e.name, "error": failed[s]} for e, s in named if s in failed]
+    named = [(e, s) for e, s in named if s not in failed]
+    if not named:
+        return await _record_alone(record, result)
+
+    # sorted, so concurrent imports take the blob row locks in the same order
+    references = dict(sorted(Counter(s for _, s in named).items()))
+    # new, or left behind by a failed removal: (re)write their objects before taking any lock
+    await asyncio.gather(*(
+        asyncio.to_thread(put_blob, io.BytesIO(content[s].data), blob_key(s), len(content[s].data), None)
+        for s in references if s not in known or known[s].refcount == 0
+    ))
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            _insert(ResumeBlob.__table__).on_conflict_do_nothing(index_elements=["sha256"]),
+            [
+                {"sha256": s, "s3_key": blob_key(s), "size": len(content[s].data), "content_type": None,
+                 "refcount": 0, "extracted_text": texts[s]}
+                for s in references
+            ],
+        )
+        locked = (
+            select(ResumeBlob.sha256, ResumeBlob.refcount, ResumeBlob.extracted_text)
+            .where(ResumeBlob.sha256.in_(references))
+            .order_by(ResumeBlob.sha256)
+        )
+        if engine.dialect.name == "postgresql":
+            locked = locked.with_for_update()
+        rows = {r.sha256: r for r in (await conn.execute(locked)).all()}
+        unreferenced = [s for s in references if rows[s].refcount == 0]
+
+        table = ResumeBlob.__table__
+        await conn.execute(
+            update(table)
+            .where(table.c.sha256 == bindparam("b_sha256"))
+            .values(refcount=table.c.refcount + bindparam("b_count"),
+                    extracted_text=func.coalesce(table.c.extracted_text, bindparam("b_text"))),
+            [{"b_sha256": s, "b_count": n, "b_text": texts[s]} for s, n in references.items()],
+        )
+        await conn.execute(
+            insert(Resume.__table__),
+            [
+                {"user_id": user_id, "s3_key": blob_key(s), "blob_sha256": s, "filename": e.name,
+                 "extracted_text": rows[s].extracted_text or texts[s]}
+                for e, s in named
+            ],
+        )
+        # may include this user's earlier copies of the same content; re-indexing those is a no-op
+        indexable = await conn.execute(
+            select(Resume.id)
+            .where(Resume.user_id == user_id, Resume.blob_sha256.in_(references),
+                   Resume.extracted_text.isnot(None))
+            .order_by(Resume.id)
+        )
+        result.indexable = list(indexable.scalars())
+        result.imported = len(named)
+        result.deduplicated = len(named) - len(unreferenced)
+        if record is not None:
+            await record(conn, result)
+    await asyncio.gather(*(
+        _ensure_object(io.BytesIO(content[s].data), blob_key(s), len(content[s].data), None)
+        for s in unreferenced
+    ))
+    return result
+
+
+async def _update_job(job_id: int, **values) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(update(ImportJob).where(ImportJob.id == job_id).values(**values))
+
+
+COUNTERS = ("processed", "imported", "deduplicated", "failed")
+
+
+async def run_import(job_id: int, user_id: int, entries: Iterable[Entry], pool: Optional[Executor] = None,
+                     batch_size: Optional[int] = None) -> dict:
+    """Import every entry for a user, recording progress on the ImportJob with each batch.
+
+    Progress already on the job (from an interrupted run) is kept, and its
+    ``processed`` entries are skipped: sources list entries in a stable order.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    async with engine.connect() as conn:
+        job = (await conn.execute(select(ImportJob).where(ImportJob.id == job_id))).one()
+    totals = {name: getattr(job, name) or 0 for name in COUNTERS}
+    errors: List[dict] = json.loads(job.errors) if job.errors else []
+    if totals["processed"]:
+        logger.info(f"Import {job_id}: resuming after {totals['processed']} entries")
+    entries = itertools.islice(entries, totals["processed"], None)
+
+    async def record(conn: AsyncConnection, result: BatchResult) -> None:
+        progress = {
+            "processed": totals["processed"] + result.size,
+            "imported": totals["imported"] + result.imported,
+            "deduplicated": totals["deduplicated"] + result.deduplicated,
+            "failed": totals["failed"] + len(result.errors),
+        }
+        recorded = errors + result.errors[:MAX_RECORDED_ERRORS - len(errors)]
+        await conn.execute(
+            update(ImportJob).where(ImportJob.id == job_id).values(errors=json.dumps(recorded), **progress)
+        )
+        # only counted once the batch's transaction is about to commit
+        totals.update(progress)
+        errors[:] = recorded
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=settings.IMPORT_WORKERS or os.cpu_count())
+    await _update_job(job_id, status="running")
+    batches = _batches(entries, batch_size, settings.IMPORT_BATCH_MAX_BYTES)
+
+    def read_next() -> "asyncio.Future[Optional[List[Entry]]]":
+        # sources block on zip reads and downloads: keep them off the event loop
+        return asyncio.ensure_future(asyncio.to_thread(next, batches, None))
+
+    pending = read_next()
+    try:
+        while (batch := await pending) is not None:
+            pending = read_next()  # fetched while this batch is extracted and stored
+            result = await import_batch(pool, user_id, batch, record)
+            await enqueue_indexing(result.indexable)
+            logger.info(f"Import {job_id}: {totals['processed']} processed, {totals['failed']} failed")
+    except Exception as e:
+        logger.error(f"❌ Import {job_id} failed: {e}")
+        errors.append({"file": None, "error": str(e)})
+        await _update_job(job_id, status="failed", errors=json.dumps(errors),
+                          finished_at=datetime.now(timezone.utc))
+        raise
+    finally:
+        await asyncio.gather(pending, return_exceptions=True)  # the reader thread may still be using the source
+        if own_pool:
+            pool.shutdown()
+    await _update_job(job_id, status="completed", finished_at=datetime.now(timezone.utc))
+    logger.info(f"✅ Import {job_id} completed: {totals['imported']} imported, {totals['failed']} failed")
+    return totals
+
+
+def archive_key(user_id: int, name: str) -> str:
+    """Where an uploaded zip waits for its import (outside the importable ``imports/`` prefix)."""
+    return f"import-archives/{user_id}/{name}"
+
+
+def user_prefix(user_id: int) -> str:
+    """The only MinIO prefix a user may import from."""
+    return f"imports/{user_id}/"
+
+
+async def run_job(job_id: int) -> dict:
+    """Run a queued ImportJob from its source; the uploaded archive is deleted afterwards.
+
+    Safe to run again for the same job (the task is redelivered if its
+    worker dies): a finished job is left alone and a running one resumes.
+    """
+    async with engine.connect() as conn:
+        job = (await conn.execute(select(ImportJob).where(ImportJob.id == job_id))).one()
+    if job.status in ("completed", "failed"):
+        logger.info(f"Import {job_id} already {job.status}; nothing to do")
+        return {name: getattr(job, name) for name in COUNTERS}
+    if job.source == "minio":
+        return await run_import(job.id, job.user_id, iter_minio(job.location))
+
+    client = minio_utils.get_minio_client()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "archive.zip")
+        await asyncio.to_thread(client.fget_object, settings.MINIO_BUCKET, job.location, path)
+        ended = False
+        try:
+            totals = await run_import(job.id, job.user_id, iter_zip(path))
+            ended = True
+            return totals
+        except Exception:
+            ended = True  # recorded as failed: the job will not run again
+            raise
+        finally:
+            if ended:  # otherwise the worker is going down and the redelivered task needs the archive
+                await asyncio.to_thread(minio_utils.delete_object, settings.MINIO_BUCKET, job.location)
@@ -18,20 +18,94 @@ class Settings(BaseSettings):
     # LLM / OpenAI
     LLM_PROVIDER: str = Field("openai", env="LLM_PROVIDER")
     OPENAI_API_KEY: Optional[str] = Field(None, env="OPENAI_API_KEY")
+    OPENAI_MODEL: str = Field("gpt-4o-mini", env="OPENAI_MODEL")
+    OPENAI_BASE_URL: str = Field("https://api.openai.com/v1", env="OPENAI_BASE_URL")
+    LLM_TIMEOUT_SECONDS: float = Field(60.0, env="LLM_TIMEOUT_SECONDS")
+    LLM_HEDGE_ENABLED: bool = Field(True, env="LLM_HEDGE_ENABLED")
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = Field(0.5, env="LLM_HEDGE_MIN_DELAY_SECONDS")
+    LLM_HEDGE_MAX_DELAY_SECONDS: float = Field(10.0, env="LLM_HEDGE_MAX_DELAY_SECONDS")
+    LLM_LATENCY_SLO_SECONDS: float = Field(20.0, env="LLM_LATENCY_SLO_SECONDS")
+    LLM_BREAKER_MIN_CALLS: int = Field(10, env="LLM_BREAKER_MIN_CALLS")
+    LLM_BREAKER_ERROR_RATE: float = Field(0.5, env="LLM_BREAKER_ERROR_RATE")
+    LLM_BREAKER_COOLDOWN_SECONDS: float = Field(30.0, env="LLM_BREAKER_COOLDOWN_SECONDS")
+    TEMPLATE_MAX_INPUT_TOKENS: int = Field(3000, env="TEMPLATE_MAX_INPUT_TOKENS")
+
+    # Embeddings / semantic matching
+    EMBEDDING_BACKEND: str = Field("hashing", env="EMBEDDING_BACKEND")  # "hashing" or "sentence-transformers"
+    EMBEDDING_MODEL: str = Field("all-MiniLM-L6-v2", env="EMBEDDING_MODEL")
+    EMBEDDING_DIM: int = Field(384, env="EMBEDDING_DIM")
+    EMBEDDING_INDEX_DIR: str = Field("data/embeddings", env="EMBEDDING_INDEX_DIR")
+    EMBEDDING_ANN_THRESHOLD: int = Field(20000, env="EMBEDDING_ANN_THRESHOLD")
+    EMBEDDING_IVF_NPROBE: int = Field(8, env="EMBEDDING_IVF_NPROBE")
+    VOCAB_MAX_TERMS: int = Field(200_000, env="VOCAB_MAX_TERMS")  # interned keyword terms per process
 
     # Payment
     STRIPE_API_KEY: Optional[str] = Field(None, env="STRIPE_API_KEY")
     STRIPE_WEBHOOK_SECRET: Optional[str] = Field(None, env="STRIPE_WEBHOOK_SECRET")
+    STRIPE_MAX_WORKERS: int = Field(8, env="STRIPE_MAX_WORKERS")
+    STRIPE_SESSION_CACHE_SECONDS: float = Field(10.0, env="STRIPE_SESSION_CACHE_SECONDS")
+    ENTITLEMENT_CACHE_SECONDS: float = Field(30.0, env="ENTITLEMENT_CACHE_SECONDS")
+    ENTITLEMENT_REDIS_CACHE_SECONDS: int = Field(300, env="ENTITLEMENT_REDIS_CACHE_SECONDS")
+    FREE_PLAN_MONTHLY_RESUMES: Optional[int] = Field(None, env="FREE_PLAN_MONTHLY_RESUMES")  # None = unlimited
+
+    # Read replicas: comma-separated URLs; empty sends every read to DATABASE_URL
+    DATABASE_REPLICA_URLS: str = Field("", env="DATABASE_REPLICA_URLS")
+    REPLICA_STICKY_SECONDS: float = Field(5.0, env="REPLICA_STICKY_SECONDS")
+    REPLICA_RETRY_SECONDS: float = Field(30.0, env="REPLICA_RETRY_SECONDS")
 
     # MinIO (required for uploads)
     MINIO_ENDPOINT: str = Field("minio:9000", env="MINIO_ENDPOINT")
     MINIO_ACCESS_KEY: str = Field("miniouser", env="MINIO_ACCESS_KEY")
     MINIO_SECRET_KEY: str = Field("miniosecret", env="MINIO_SECRET_KEY")
     MINIO_BUCKET: str = Field("resumes", env="MINIO_BUCKET")
+    MINIO_CONNECT_TIMEOUT_SECONDS: float = Field(3.0, env="MINIO_CONNECT_TIMEOUT_SECONDS")
+    MINIO_READ_TIMEOUT_SECONDS: float = Field(60.0, env="MINIO_READ_TIMEOUT_SECONDS")
+    MAX_UPLOAD_BYTES: int = Field(10 * 1024 * 1024, env="MAX_UPLOAD_BYTES")
+    IMPORT_WORKERS: int = Field(0, env="IMPORT_WORKERS")  # extraction processes; 0 = one per core
+    IMPORT_BATCH_SIZE: int = Field(200, env="IMPORT_BATCH_SIZE")
+    IMPORT_BATCH_MAX_BYTES: int = Field(64 * 1024 * 1024, env="IMPORT_BATCH_MAX_BYTES")  # file bytes held per batch
 
     # Celery / Redis
     CELERY_BROKER: str = Field("redis://redis:6379/0", env="CELERY_BROKER")
     CELERY_BACKEND: str = Field("redis://redis:6379/1", env="CELERY_BACKEND")
+    REDIS_URL: Optional[str] = Field(None, env="REDIS_URL")
+    # Evaluate interview answers in Celery instead of the API worker (needs REDIS_URL for the events)
+    INTERVIEW_EVAL_IN_CELERY: bool = Field(False, env="INTERVIEW_EVAL_IN_CELERY")
+
+    # Voice answers: speech recognition engine, and words between provisional re-scores
+    ASR_ENGINE: str = Field("", env="ASR_ENGINE")  # "" (voice answers off) or "fake"
+    ASR_FAKE_LATENCY_SECONDS: float = Field(0.0, env="ASR_FAKE_LATENCY_SECONDS")
+    VOICE_EVAL_MIN_NEW_WORDS: int = Field(12, env="VOICE_EVAL_MIN_NEW_WORDS")
+    VOICE_MAX_SECONDS: float = Field(300.0, env="VOICE_MAX_SECONDS")  # per answer, voice.start to voice.end
+    VOICE_MAX_BYTES: int = Field(16 * 1024 * 1024, env="VOICE_MAX_BYTES")  # audio per answer
+    VOICE_MAX_PROVISIONAL_EVALS: int = Field(20, env="VOICE_MAX_PROVISIONAL_EVALS")
+
+    # Usage metrics
+    USAGE_FLUSH_INTERVAL_SECONDS: float = Field(5.0, env="USAGE_FLUSH_INTERVAL_SECONDS")
+    USAGE_RETENTION_DAYS: int = Field(40, env="USAGE_RETENTION_DAYS")
+
+    # Monthly partitions (Postgres): months kept in the hot tables, months created ahead
+    PARTITION_HOT_MONTHS: int = Field(6, env="PARTITION_HOT_MONTHS")
+    PARTITION_PREMAKE_MONTHS: int = Field(3, env="PARTITION_PREMAKE_MONTHS")
+    ARCHIVE_PREFIX: str = Field("archive/", env="ARCHIVE_PREFIX")
+
+    # Tracing (OpenTelemetry)
+    TRACING_ENABLED: bool = Field(False, env="TRACING_ENABLED")
+    TRACING_SAMPLE_RATIO: float = Field(0.05, env="TRACING_SAMPLE_RATIO")
+    TRACING_SLOW_MS: float = Field(1000.0, env="TRACING_SLOW_MS")  # slower traces are always kept
+    TRACING_OTLP_ENDPOINT: Optional[str] = Field(None, env="TRACING_OTLP_ENDPOINT")
+    TRACING_FILE: str = Field("traces.jsonl", env="TRACING_FILE")
+
+    # Profiling (admin API; X-Profile per-request capture only when a token is set)
+    PROFILING_TOKEN: Optional[str] = Field(None, env="PROFILING_TOKEN")
+    PROFILE_MAX_SECONDS: float = Field(60.0, env="PROFILE_MAX_SECONDS")
+
+    # Readiness probes serve cached dependency checks refreshed at this interval
+    HEALTH_CHECK_INTERVAL_SECONDS: float = Field(10.0, env="HEALTH_CHECK_INTERVAL_SECONDS")
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = Field(2.0, env="HEALTH_CHECK_TIMEOUT_SECONDS")
+
+    # Startup: dependency warm-up (DB pool, MinIO) runs concurrently, each step bounded by this
+    STARTUP_WARMUP_TIMEOUT_SECONDS: float = Field(5.0, env="STARTUP_WARMUP_TIMEOUT_SECONDS")
 
     # App config
     DEBUG: bool = Field(False, env="DEBUG")
@@ -54,7 +128,7 @@ class Settings(BaseSettings):
         """Validate DATABASE_URL format."""
         if not v:
             raise ValueError('DATABASE_URL is required and cannot be empty')
-        if not v.startswith(('postgresql://', 'postgresql+asyncpg://', 'sqlite://')):
+        if not v.startswith(('postgresql://', 'postgresql+asyncpg://', 'sqlite://', 'sqlite+aiosqlite://')):
             raise ValueError('DATABASE_URL must be a valid PostgreSQL or SQLite URL, got: ' + v[:50])
         return v
 
@@ -0,0 +1,141 @@
+"""Cross-worker event fan-out over Redis pub/sub.
+
+A ``Fanout`` delivers JSON events published under a key (an interview
+session id, say) to every local subscriber of that key, whichever process
+published them: an API worker, another API worker, or a Celery task.
+
+Each process holds one Redis pub/sub connection per ``Fanout``, whatever
+the number of subscribers. It subscribes to a key's channel while at least
+one local subscriber wants it, and a single listener task hands incoming
+messages to the subscribers' queues. redis-py re-subscribes the channels
+after a reconnect; messages published while the connection was down are
+lost, so events should carry enough state for the client to resync.
+
+Queues are bounded. A subscriber that stops reading (a stalled socket) is
+cut off when its queue fills: its iteration ends and ``overflowed`` is set,
+instead of the process buffering for it without limit.
+
+Without Redis, publishing delivers to this process's subscribers only,
+which is enough for development and a single worker.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 256
+
+
+class Subscription:
+    """Events for one subscriber, in publish order."""
+
+    def __init__(self, size: int):
+        self._queue: asyncio.Queue = asyncio.Queue(size)
+        self.overflowed = False
+
+    def _put(self, event: dict) -> None:
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)  # ends the iteration
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> dict:
+        event = await self._queue.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+
+class Fanout:
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def channel(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def publish(self, key: str, event: dict) -> None:
+        """Send ``event`` to every subscriber of ``key`` in any process."""
+        redis = get_redis()
+        if redis is None:
+            self._deliver(key, event)
+            return
+        await redis.publish(self.channel(key), json.dumps(event, separators=(",", ":")))
+
+    def _deliver(self, key: str, event: dict) -> None:
+        for subscription in self._subscribers.get(key, ()):
+            subscription._put(event)
+
+    @asynccontextmanager
+    async def subscribe(self, key: str) -> AsyncIterator[Subscription]:
+        """Receive ``key``'s events for the duration of the block."""
+        subscription = Subscription(QUEUE_SIZE)
+        subscribers = self._subscribers.setdefault(key, set())
+        subscribers.add(subscription)
+        try:
+            if len(subscribers) == 1:
+                await self._redis_subscribe(key)
+            yield subscription
+        finally:
+            subscribers.discard(subscription)
+            if not subscribers and self._subscribers.get(key) is subscribers:
+                del self._subscribers[key]
+                await self._redis_unsubscribe(key)
+
+    async def _redis_subscribe(self, key: str) -> None:
+        redis = get_redis()
+        if redis is None:
+            return
+        if self._pubsub is None:
+            self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel(key))
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _redis_unsubscribe(self, key: str) -> None:
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.unsubscribe(self.channel(key))
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to unsubscribe from {self.channel(key)}: {e}")
+
+    async def _listen(self) -> None:
+        start = len(self.prefix) + 1
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None and message["type"] == "message":
+                    self._deliver(message["channel"][start:], json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️  {self.prefix} fan-out listener error, reconnecting: {e}")
+                await asyncio.sleep(1)
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._pubsub is not None:
+            pubsub, self._pubsub = self._pubsub, None
+            await pubsub.close()
+
+
+interview_fanout = Fanout("interview")
@@ -0,0 +1,122 @@
+"""Cached dependency checks behind the readiness probes.
+
+Load balancers and kubelets probe every pod every few seconds, so a probe
+must not cost the dependencies it checks more than the traffic it guards.
+Checks use the app's own pooled clients (a ``SELECT 1`` on a pooled
+engine connection, the shared MinIO client, the shared Redis client), run
+concurrently with a per-dependency timeout, and are refreshed by a
+background task every ``HEALTH_CHECK_INTERVAL_SECONDS``. Probes serve the
+cached result. A probe that finds the result stale (no background task
+running, e.g. in tests) refreshes it itself, and concurrent probes share
+that one refresh.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from ..db.database import engine
+from .config import settings
+from .minio_utils import get_minio_client
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# dependencies whose failure makes the pod unready; the rest are informational
+REQUIRED = ("database", "minio")
+
+
+async def check_database() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_minio() -> None:
+    client = get_minio_client()
+    if not await asyncio.to_thread(client.bucket_exists, settings.MINIO_BUCKET):
+        raise RuntimeError(f"bucket {settings.MINIO_BUCKET!r} does not exist")
+
+
+async def check_redis() -> None:
+    await get_redis().ping()
+
+
+class HealthMonitor:
+    def __init__(
+        self,
+        interval: float = settings.HEALTH_CHECK_INTERVAL_SECONDS,
+        timeout: float = settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.checks: Dict[str, Callable[[], Awaitable[None]]] = {"database": check_database, "minio": check_minio}
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_check(self, name: str, check: Callable[[], Awaitable[None]]) -> dict:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+            status = {"ok": True}
+        except asyncio.TimeoutError:
+            status = {"ok": False, "error": f"timed out after {self.timeout}s"}
+        except Exception as e:
+            status = {"ok": False, "error": str(e) or type(e).__name__}
+        status["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        if not status["ok"]:
+            logger.error(f"❌ {name} health check failed: {status['error']}")
+        return status
+
+    async def _refresh(self) -> dict:
+        checks = dict(self.checks)
+        if get_redis() is not None:
+            checks["redis"] = check_redis
+        statuses = await asyncio.gather(*(self._run_check(name, check) for name, check in checks.items()))
+        self._result = {
+            "ready": all(s["ok"] for name, s in zip(checks, statuses) if name in REQUIRED),
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checks": dict(zip(checks, statuses)),
+        }
+        self._checked_at = time.monotonic()
+        return self._result
+
+    async def refresh(self) -> dict:
+        """Run all checks now; callers arriving meanwhile share the same run."""
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh())
+            self._refreshing.add_done_callback(lambda _: setattr(self, "_refreshing", None))
+        return await asyncio.shield(self._refreshing)
+
+    async def status(self) -> dict:
+        """Latest result; refreshed first if the background refresh has fallen behind."""
+        # two intervals: the background loop refreshes every interval plus check time
+        if self._result is None or time.monotonic() - self._checked_at > 2 * self.interval:
+            await self.refresh()
+        return {**self._result, "age_seconds": round(time.monotonic() - self._checked_at, 3)}
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:  # never let the loop die
+                logger.error(f"❌ Health refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Refresh in the background so probes never wait on a dependency."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+health_monitor = HealthMonitor()
@@ -0,0 +1,173 @@
+"""Prometheus metrics for the API, its dependencies and the LLM path.
+
+Hot-path cost is kept to a dict lookup plus a lock-free-ish counter update:
+
+- label children are bound once (module level, or cached per label tuple
+  on first use) instead of calling ``.labels()`` per request;
+- request routes are labelled by their path template (``/resume/{resume_id}/similar``),
+  resolved from the matched endpoint, so label cardinality stays bounded;
+- state that already lives elsewhere (DB pool, LLM breaker counters) is read
+  by collectors at scrape time rather than mirrored on every call;
+- Celery queue depth is refreshed by the ``/metrics`` handler itself.
+
+``GET /metrics`` serves the default registry in the text exposition format.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency (to the last body byte)", ["method", "route", "status"]
+)
+MINIO_DURATION = Histogram("minio_operation_seconds", "MinIO/S3 operation latency", ["operation", "outcome"])
+LLM_DURATION = Histogram("llm_request_duration_seconds", "LLM call latency", ["prompt_id", "provider"], buckets=LLM_BUCKETS)
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens consumed", ["prompt_id", "kind"])
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by result", ["cache", "result"])
+DB_READ_ROUTES = Counter("db_read_route_total", "Read-only DB connections by target", ["target"])
+CELERY_QUEUE_LENGTH = Gauge("celery_queue_length", "Messages waiting in a Celery broker queue", ["queue"])
+
+_http_children: Dict[Tuple[str, str, int], Histogram] = {}
+_route_paths: Dict[object, str] = {}
+_llm_children: Dict[Tuple[str, str], Tuple[Histogram, Counter, Counter]] = {}
+
+
+def cache_counters(cache: str) -> Tuple[Counter, Counter]:
+    """Pre-bound (hit, miss) counters for one cache."""
+    return CACHE_LOOKUPS.labels(cache, "hit"), CACHE_LOOKUPS.labels(cache, "miss")
+
+
+def observe_llm(prompt_id: str, provider: str, seconds: float, usage: Optional[dict]) -> None:
+    children = _llm_children.get((prompt_id, provider))
+    if children is None:
+        children = _llm_children[(prompt_id, provider)] = (
+            LLM_DURATION.labels(prompt_id, provider),
+            LLM_TOKENS.labels(prompt_id, "prompt"),
+            LLM_TOKENS.labels(prompt_id, "completion"),
+        )
+    duration, prompt_tokens, completion_tokens = children
+    duration.observe(seconds)
+    if usage:
+        prompt_tokens.inc(usage.get("prompt_tokens", 0))
+        completion_tokens.inc(usage.get("completion_tokens", 0))
+
+
+@contextmanager
+def observe_minio(operation: str) -> Iterator[None]:
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        MINIO_DURATION.labels(operation, outcome).observe(time.perf_counter() - start)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled a request ("unmatched" if none)."""
+    if not _route_paths:
+        for route in scope["app"].routes:
+            _route_paths.setdefault(getattr(route, "endpoint", None), route.path)
+    return _route_paths.get(scope.get("endpoint"), "unmatched")
+
+
+class MetricsMiddleware:
+    """Per-route latency histogram and in-flight gauge (plain ASGI)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            key = (scope["method"], route_template(scope), status)
+            child = _http_children.get(key)
+            if child is None:
+                child = _http_children[key] = HTTP_DURATION.labels(*key)
+            child.observe(time.perf_counter() - start)
+
+
+class _StateCollector:
+    """Scrape-time view of the DB pool and the LLM failover counters."""
+
+    def describe(self):
+        # without this the registry calls collect() at registration, which
+        # would import ai_client while it may still be initialising
+        return []
+
+    def collect(self):
+        from ..ai.ai_client import ai_client
+        from ..db.database import engine
+
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            family = GaugeMetricFamily("db_pool_connections", "DB pool connections by state", labels=["state"])
+            family.add_metric(["checked_out"], pool.checkedout())
+            family.add_metric(["idle"], pool.checkedin())
+            family.add_metric(["overflow"], max(pool.overflow(), 0))
+            yield family
+            yield GaugeMetricFamily("db_pool_size", "Configured DB pool size", value=pool.size())
+
+        stats = ai_client.resilience.stats()
+        decisions = CounterMetricFamily("llm_decisions", "LLM failover decisions", labels=["provider", "decision"])
+        for decision in ("calls", "primary_ok", "hedges", "hedge_wins", "errors", "timeouts", "short_circuits", "fallbacks"):
+            decisions.add_metric([stats["provider"], decision], stats[decision])
+        yield decisions
+        breaker = GaugeMetricFamily("llm_breaker_open", "1 while the LLM circuit breaker is open", labels=["provider"])
+        breaker.add_metric([stats["provider"]], 0 if stats["breaker_state"] == "closed" else 1)
+        yield breaker
+        yield CounterMetricFamily("llm_breaker_trips", "LLM circuit breaker trips", value=stats["breaker_trips"])
+
+
+REGISTRY.register(_StateCollector())
+
+_broker = None
+
+
+async def refresh_queue_depth(queues: Tuple[str, ...] = ("celery", "imports")) -> None:
+    """Sample Celery queue lengths from the Redis broker (no-op for other brokers)."""
+    global _broker
+    if not settings.CELERY_BROKER.startswith(("redis://", "rediss://")):
+        return
+    try:
+        if _broker is None:
+            import redis.asyncio as aioredis
+
+            _broker = aioredis.from_url(settings.CELERY_BROKER, socket_timeout=0.5, socket_connect_timeout=0.5)
+        for queue in queues:
+            CELERY_QUEUE_LENGTH.labels(queue).set(await _broker.llen(queue))
+    except Exception as e:
+        logger.debug(f"Celery queue depth unavailable: {e}")
+
+
+async def render_metrics() -> Tuple[bytes, str]:
+    await refresh_queue_depth()
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,15 +1,30 @@
-"""MinIO utilities for S3-compatible object storage."""
+"""MinIO utilities for S3-compatible object storage.
+
+The ``minio`` SDK (and urllib3 under it) is imported when the first client
+is created, not when the app is imported. One client is shared per
+process; its connection pool uses a short connect timeout and few retries
+so an unreachable MinIO fails fast instead of stalling startup or probes.
+"""
 
 import logging
-from minio import Minio
-from minio.error import S3Error
+from typing import TYPE_CHECKING
 from .config import settings
+from .metrics import observe_minio
+from .tracing import traced
+
+if TYPE_CHECKING:
+    from minio import Minio
 
 logger = logging.getLogger(__name__)
 
+_client = None
+
+# content-addressed resume blobs (see app.core.blobs); shared by reference count
+BLOB_PREFIX = "blobs/sha256/"
+
 
-def get_minio_client() -> Minio:
-    """Get MinIO client instance.
+def get_minio_client() -> "Minio":
+    """Get the shared MinIO client instance.
     
     Returns:
         Minio: Configured MinIO client
@@ -17,18 +32,30 @@ def get_minio_client() -> Minio:
     Raises:
         Exception: If MinIO credentials are invalid
     """
-    # Remove scheme from endpoint if present
-    endpoint = settings.MINIO_ENDPOINT.replace("http://", "").replace("https://", "")
-    
-    client = Minio(
-        endpoint=endpoint,
-        access_key=settings.MINIO_ACCESS_KEY,
-        secret_key=settings.MINIO_SECRET_KEY,
-        secure=False  # Use HTTP in dev; set True for production with HTTPS
-    )
-    return client
+    global _client
+    if _client is None:
+        import urllib3
+        from minio import Minio
+
+        # Remove scheme from endpoint if present
+        endpoint = settings.MINIO_ENDPOINT.replace("http://", "").replace("https://", "")
+        http_client = urllib3.PoolManager(
+            timeout=urllib3.Timeout(connect=settings.MINIO_CONNECT_TIMEOUT_SECONDS,
+                                    read=settings.MINIO_READ_TIMEOUT_SECONDS),
+            maxsize=10,
+            retries=urllib3.Retry(total=2, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+        )
+        _client = Minio(
+            endpoint=endpoint,
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            secure=False,  # Use HTTP in dev; set True for production with HTTPS
+            http_client=http_client,
+        )
+    return _client
 
 
+@traced("minio.ensure_buckets")
 def ensure_buckets() -> None:
     """Ensure required MinIO buckets exist, create if missing.
     
@@ -38,18 +65,22 @@ def ensure_buckets() -> None:
     Raises:
         S3Error: If bucket creation fails (permissions, connection, etc.)
     """
+    from minio.error import S3Error
+
     try:
         client = get_minio_client()
         bucket_name = settings.MINIO_BUCKET
         
         # Check if bucket exists
-        exists = client.bucket_exists(bucket_name)
+        with observe_minio("bucket_exists"):
+            exists = client.bucket_exists(bucket_name)
         
         if exists:
             logger.info(f"✅ MinIO bucket exists: {bucket_name}")
         else:
             # Create bucket
-            client.make_bucket(bucket_name)
+            with observe_minio("make_bucket"):
+                client.make_bucket(bucket_name)
             logger.info(f"✅ Created MinIO bucket: {bucket_name}")
             
     except S3Error as e:
@@ -60,19 +91,31 @@ def ensure_buckets() -> None:
         raise
 
 
-def delete_object(bucket_name: str, object_name: str) -> bool:
+@traced("minio.delete_object")
+def delete_object(bucket_name: str, object_name: str, unreferenced: bool = False) -> bool:
     """Delete an object from MinIO.
     
+    Objects under ``BLOB_PREFIX`` are shared by every resume with the same
+    content. They are only removed by ``app.core.blobs`` once their
+    reference count has reached zero, which it signals with ``unreferenced``.
+    
     Args:
         bucket_name: Name of the bucket
         object_name: Path/name of the object to delete
+        unreferenced: Caller holds the blob row and its refcount is zero
         
     Returns:
         bool: True if successful, False otherwise
     """
+    from minio.error import S3Error
+
+    if object_name.startswith(BLOB_PREFIX) and not unreferenced:
+        logger.warning(f"⚠️ Refusing to delete shared blob {object_name}: release it through app.core.blobs")
+        return False
     try:
         client = get_minio_client()
-        client.remove_object(bucket_name, object_name)
+        with observe_minio("remove_object"):
+            client.remove_object(bucket_name, object_name)
         logger.info(f"Deleted object: {bucket_name}/{object_name}")
         return True
     except S3Error as e:
@@ -80,6 +123,7 @@ def delete_object(bucket_name: str, object_name: str) -> bool:
         return False
 
 
+@traced("minio.upload_file")
 def upload_file(bucket_name: str, object_name: str, file_path: str) -> bool:
     """Upload a file to MinIO.
     
@@ -91,9 +135,12 @@ def upload_file(bucket_name: str, object_name: str, file_path: str) -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
+    from minio.error import S3Error
+
     try:
         client = get_minio_client()
-        client.fput_object(bucket_name, object_name, file_path)
+        with observe_minio("fput_object"):
+            client.fput_object(bucket_name, object_name, file_path)
         logger.info(f"Uploaded file: {bucket_name}/{object_name}")
         return True
     except S3Error as e:
@@ -101,6 +148,7 @@ def upload_file(bucket_name: str, object_name: str, file_path: str) -> bool:
         return False
 
 
+@traced("minio.get_presigned_url")
 def get_presigned_url(bucket_name: str, object_name: str, expires: int = 3600) -> str:
     """Get a presigned URL for accessing an object.
     
@@ -112,15 +160,18 @@ def get_presigned_url(bucket_name: str, object_name: str, expires: int = 3600) -
     Returns:
         str: Presigned URL for accessing the object
     """
+    from minio.error import S3Error
+
     try:
         from datetime import timedelta
         client = get_minio_client()
-        url = client.get_presigned_url(
-            "GET",
-            bucket_name,
-            object_name,
-            expires=timedelta(seconds=expires)
-        )
+        with observe_minio("presign"):
+            url = client.get_presigned_url(
+                "GET",
+                bucket_name,
+                object_name,
+                expires=timedelta(seconds=expires)
+            )
         return url
     except S3Error as e:
         logger.error(f"Failed to generate presigned URL: {e}")
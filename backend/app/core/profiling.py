@@ -0,0 +1,188 @@
+"""On-demand CPU and allocation profiling of a live worker.
+
+- ``StackSampler``: a statistical CPU profiler. A background thread reads
+  every thread's current stack (``sys._current_frames()``) at a fixed
+  interval and counts identical stacks. Output is the "collapsed stack"
+  format (``root;caller;callee count``) that flamegraph.pl, speedscope
+  and most flamegraph viewers load directly.
+- ``allocation_profile``: ``tracemalloc`` is switched on for a time
+  window. Allocations that grew between the two snapshots are reported as
+  a top-N list and as collapsed stacks weighted by bytes.
+- ``RequestProfilerMiddleware``: with ``PROFILING_TOKEN`` set, a request
+  carrying ``X-Profile: <token>`` is CPU-sampled while it runs. The
+  profile id comes back in ``X-Profile-Id`` and the profile can be
+  fetched from the admin API. The sample covers the event-loop thread, so
+  other requests running at the same time show up too.
+
+Nothing is sampled or traced until a profile is requested. The middleware
+is only installed when a token is configured. Only one profile runs at a
+time per worker.
+"""
+
+import asyncio
+import hmac
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_busy = threading.Lock()
+_recent: "OrderedDict[str, Tuple[str, dict]]" = OrderedDict()
+MAX_RECENT_PROFILES = 20
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running on this worker."""
+
+
+class StackSampler:
+    def __init__(self, interval: float = 0.005, thread_ids: Optional[Set[int]] = None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == own or (self.thread_ids is not None and tid not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(tid) or f"thread-{tid}")
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.counts
+
+
+def collapsed(counts: Iterable[Tuple[str, int]]) -> str:
+    return "".join(f"{stack} {n}\n" for stack, n in sorted(counts, key=lambda item: -item[1]))
+
+
+def _claim() -> None:
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running on this worker")
+
+
+async def cpu_profile(seconds: float, interval: float = 0.005) -> Tuple[str, int]:
+    """Sample all threads for ``seconds``; returns (collapsed stacks, sample count)."""
+    _claim()
+    sampler = StackSampler(interval)
+    try:
+        sampler.start()
+        await asyncio.sleep(seconds)
+    finally:
+        sampler.stop()
+        _busy.release()
+    return collapsed(sampler.counts.items()), sampler.samples
+
+
+async def allocation_profile(seconds: float, top: int = 50, frames: int = 25) -> dict:
+    """Allocations that grew during a ``seconds`` window, by traceback."""
+    _claim()
+    started = not tracemalloc.is_tracing()
+    try:
+        if started:
+            tracemalloc.start(frames)
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        await asyncio.sleep(seconds)
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+    finally:
+        if started:
+            tracemalloc.stop()
+        _busy.release()
+
+    grown = [s for s in after.compare_to(before, "traceback") if s.size_diff > 0]
+    stacks = Counter()
+    for stat in grown:
+        # tracemalloc tracebacks run oldest frame first, as collapsed stacks do
+        stacks[";".join(f"{os.path.basename(f.filename)}:{f.lineno}" for f in stat.traceback)] += stat.size_diff
+    return {
+        "seconds": seconds,
+        "total_growth_bytes": sum(s.size_diff for s in grown),
+        "top": [
+            {
+                "location": f"{stat.traceback[-1].filename}:{stat.traceback[-1].lineno}",
+                "size_diff_bytes": stat.size_diff,
+                "count_diff": stat.count_diff,
+            }
+            for stat in grown[:top]
+        ],
+        "collapsed": collapsed(stacks.items()),
+    }
+
+
+def recent_profile(profile_id: str) -> Optional[Tuple[str, dict]]:
+    """(collapsed stacks, request info) for a profile captured via ``X-Profile``."""
+    return _recent.get(profile_id)
+
+
+class RequestProfilerMiddleware:
+    """CPU-sample single requests that opt in with ``X-Profile: <token>``."""
+
+    def __init__(self, app: ASGIApp, token: str, interval: float = 0.001):
+        self.app = app
+        self.token = token.encode()
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        header = dict(scope["headers"]).get(b"x-profile") if scope["type"] == "http" else None
+        if header is None or not hmac.compare_digest(header, self.token):
+            await self.app(scope, receive, send)
+            return
+        if not _busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        sampler = StackSampler(self.interval, thread_ids={threading.get_ident()})
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            _busy.release()
+            _recent[profile_id] = (collapsed(sampler.counts.items()), {
+                "method": scope["method"],
+                "path": scope["path"],
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+                "samples": sampler.samples,
+            })
+            while len(_recent) > MAX_RECENT_PROFILES:
+                _recent.popitem(last=False)
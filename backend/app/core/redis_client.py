@@ -0,0 +1,34 @@
+"""Shared async Redis client.
+
+Redis is optional in development: when ``REDIS_URL`` is not configured,
+``get_redis()`` returns None and callers fall back to in-process state.
+"""
+
+import logging
+from typing import Optional
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_redis() -> Optional["redis.asyncio.Redis"]:
+    """Return the process-wide Redis client, or None if Redis is not configured."""
+    global _client
+    if not settings.REDIS_URL:
+        return None
+    if _client is None:
+        import redis.asyncio as aioredis
+
+        _client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        logger.info("✅ Redis client configured")
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared client (e.g. before a Celery task's event loop ends)."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.close()
@@ -0,0 +1,158 @@
+"""Ranked full-text search over stored resumes.
+
+On Postgres, queries run against the generated ``resumes.search_vector``
+column and its GIN index (migration 006). ``websearch_to_tsquery`` parses the
+query, so users can write ``python -java "platform team"``. Skill filters
+match fuzzily through the ``pg_trgm`` index (``word_similarity``), so
+"kubernets" still finds "kubernetes". Results are ordered by ``ts_rank_cd``
+and then id, and are paged with a keyset cursor over that pair, so page 50
+costs the same as page 1. ``ts_headline`` is evaluated only for the rows of
+the returned page.
+
+Highlights are HTML: the resume text is escaped and only the ``<mark>`` tags
+around matches are markup. ``ts_headline`` wraps matches in control
+characters rather than tags, so escaping its output cannot touch them.
+
+Other databases (SQLite in development and tests) fall back to a
+substring scan ranked by term frequency. It has the same interface and
+cursor semantics, but none of the indexes.
+"""
+
+import base64
+import html
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, text
+
+from ..db.database import engine
+from ..db.routing import replica_router
+from ..db.models import Resume
+
+_START, _STOP = "\x02", "\x03"
+HIGHLIGHT_OPTIONS = f'StartSel="{_START}", StopSel="{_STOP}", MaxFragments=2, MaxWords=25, MinWords=8, FragmentDelimiter=" … "'
+SNIPPET_CHARS = 160
+
+
+@dataclass
+class SearchHit:
+    id: int
+    user_id: Optional[int]
+    filename: Optional[str]
+    created_at: Optional[datetime]
+    rank: float
+    highlight: str
+
+
+def encode_cursor(rank: float, resume_id: int) -> str:
+    raw = json.dumps([rank, resume_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Inverse of ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor was not produced by ``encode_cursor``
+    """
+    try:
+        rank, resume_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(rank), int(resume_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def search_resumes(query: str, skills: Sequence[str] = (), limit: int = 20,
+                         cursor: Optional[str] = None) -> Tuple[List[SearchHit], Optional[str]]:
+    """One page of resumes matching ``query`` (and every skill), best first.
+
+    Returns:
+        The hits and the cursor for the next page (None on the last page)
+
+    Raises:
+        ValueError: If ``cursor`` is malformed
+    """
+    after = decode_cursor(cursor) if cursor else None
+    if engine.dialect.name == "postgresql":
+        hits = await _search_postgres(query, skills, limit + 1, after)
+    else:
+        hits = await _search_scan(query, skills, limit + 1, after)
+    if len(hits) > limit:
+        hits = hits[:limit]
+        return hits, encode_cursor(hits[-1].rank, hits[-1].id)
+    return hits, None
+
+
+async def _search_postgres(query: str, skills: Sequence[str], limit: int,
+                           after: Optional[Tuple[float, int]]) -> List[SearchHit]:
+    params = {"query": query, "limit": limit, "options": HIGHLIGHT_OPTIONS}
+    filters = []
+    for i, skill in enumerate(skills):
+        filters.append(f"AND :skill_{i} <% r.extracted_text")
+        params[f"skill_{i}"] = skill
+    if after is not None:
+        # ts_rank_cd returns real; compare at that precision so the boundary row is excluded exactly
+        filters.append("AND (ts_rank_cd(r.search_vector, q.query), r.id) < (CAST(:after_rank AS real), :after_id)")
+        params.update(after_rank=after[0], after_id=after[1])
+
+    statement = text(f"""
+        WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query),
+        page AS (
+            SELECT r.id, ts_rank_cd(r.search_vector, q.query) AS rank
+            FROM resumes r, q
+            WHERE r.search_vector @@ q.query {" ".join(filters)}
+            ORDER BY rank DESC, r.id DESC
+            LIMIT :limit
+        )
+        SELECT r.id, r.user_id, r.filename, r.created_at, page.rank,
+               ts_headline('english', coalesce(r.extracted_text, ''), q.query, :options) AS highlight
+        FROM page JOIN resumes r ON r.id = page.id, q
+        ORDER BY page.rank DESC, page.id DESC
+    """)
+    async with replica_router.connect() as conn:
+        rows = (await conn.execute(statement, params)).all()
+    return [SearchHit(r.id, r.user_id, r.filename, r.created_at, float(r.rank), _headline_html(r.highlight))
+            for r in rows]
+
+
+def _headline_html(headline: str) -> str:
+    return html.escape(headline).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def _terms(query: str) -> List[str]:
+    return [t for t in re.findall(r"\w+", query.lower()) if t]
+
+
+def _snippet(body: str, terms: Sequence[str]) -> str:
+    lowered = body.lower()
+    first = min((i for i in (lowered.find(t) for t in terms) if i >= 0), default=0)
+    start = max(0, first - SNIPPET_CHARS // 2)
+    snippet = body[start:start + SNIPPET_CHARS]
+    pattern = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+    # re.split with one group alternates text, match, text, ...
+    parts = re.split(f"({pattern})", snippet, flags=re.IGNORECASE)
+    return "".join(f"<mark>{html.escape(p)}</mark>" if i % 2 else html.escape(p) for i, p in enumerate(parts))
+
+
+async def _search_scan(query: str, skills: Sequence[str], limit: int,
+                       after: Optional[Tuple[float, int]]) -> List[SearchHit]:
+    terms = _terms(query)
+    if not terms:
+        return []
+    statement = select(Resume.id, Resume.user_id, Resume.filename, Resume.created_at, Resume.extracted_text)
+    for needle in [*terms, *(s.lower() for s in skills)]:
+        statement = statement.where(func.lower(Resume.extracted_text).contains(needle))
+    async with replica_router.connect() as conn:
+        rows = (await conn.execute(statement)).all()
+
+    hits = []
+    for r in rows:
+        lowered = r.extracted_text.lower()
+        rank = sum(lowered.count(t) for t in terms) / (1 + len(lowered) // 1000)
+        if after is None or (rank, r.id) < after:
+            hits.append(SearchHit(r.id, r.user_id, r.filename, r.created_at, rank, _snippet(r.extracted_text, terms)))
+    hits.sort(key=lambda h: (h.rank, h.id), reverse=True)
+    return hits[:limit]
@@ -0,0 +1,55 @@
+"""Server-Sent Events helpers for streaming LLM output to the browser.
+
+``stream_completion`` turns an ``AIClient.stream`` iterator into SSE frames:
+
+- ``event: token``  ``{"text": "..."}`` per provider chunk,
+- ``event: usage``  token usage plus any extra fields, once at the end,
+- ``event: error``  if the provider fails mid-stream.
+
+Starlette's ``StreamingResponse`` only pulls the next frame once the
+previous one has been handed to the server, so a slow client slows the
+upstream read (backpressure) instead of buffering the document in memory.
+When the client disconnects, Starlette cancels the iteration; the
+cancellation propagates into ``AIClient.stream``, which closes the provider
+connection and so stops generation upstream.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # stop nginx from buffering the stream
+}
+
+
+def sse_event(data: Any, event: Optional[str] = None) -> bytes:
+    """Encode one SSE frame with a JSON ``data`` payload."""
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+async def stream_completion(chunks: AsyncIterator[Dict[str, Any]], **summary: Any) -> AsyncIterator[bytes]:
+    """Relay ``AIClient.stream`` events as SSE frames."""
+    try:
+        async for chunk in chunks:
+            if "text" in chunk:
+                yield sse_event({"text": chunk["text"]}, "token")
+            elif "usage" in chunk:
+                yield sse_event({**summary, **chunk["usage"]}, "usage")
+    except asyncio.CancelledError:
+        logger.info("⚠️  Client disconnected, upstream LLM stream aborted")
+        raise
+    except Exception as e:
+        logger.error(f"❌ LLM stream failed: {e}")
+        yield sse_event({"detail": "Generation failed"}, "error")
+
+
+def sse_response(frames: AsyncIterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(frames, media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,228 @@
+"""Distributed tracing (OpenTelemetry) across the API, Celery and LLM calls.
+
+With ``TRACING_ENABLED`` every request gets a server span named after its
+route template, and spans are opened around ``crud`` queries, MinIO
+operations, LLM calls and Celery tasks. The W3C ``traceparent`` is injected
+into Celery message headers when a task is published and extracted in the
+worker, so a task's spans join the request that enqueued it. The task span
+also records how long the message waited in the queue.
+
+Sampling is decided at the tail, once a process's local root span ends:
+traces slower than ``TRACING_SLOW_MS`` or containing an error are always
+kept, the rest are kept with probability ``TRACING_SAMPLE_RATIO``. Kept
+spans go to an OTLP collector when ``TRACING_OTLP_ENDPOINT`` is set (and
+``opentelemetry-exporter-otlp`` is installed), otherwise to a JSON-lines
+file, so tracing works offline.
+
+With tracing disabled no provider is installed and the OpenTelemetry API
+hands out non-recording spans, so instrumentation costs next to nothing.
+"""
+
+import functools
+import inspect
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("resume_agent")
+
+_configured = False
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Append finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        with self._lock, open(self.path, "a") as f:
+            f.write(lines)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+class TailSamplingProcessor(SpanProcessor):
+    """Buffer a trace's spans until its local root ends, then keep or drop them all."""
+
+    def __init__(
+        self,
+        delegate: SpanProcessor,
+        slow_ms: float = settings.TRACING_SLOW_MS,
+        ratio: float = settings.TRACING_SAMPLE_RATIO,
+        max_pending_traces: int = 10_000,
+    ):
+        self.delegate = delegate
+        self.slow_ns = slow_ms * 1e6
+        self.ratio = ratio
+        self.max_pending_traces = max_pending_traces
+        self._pending: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span, parent_context=None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        is_local_root = span.parent is None or span.parent.is_remote
+        with self._lock:
+            spans = self._pending.setdefault(trace_id, [])
+            spans.append(span)
+            if not is_local_root:
+                if len(self._pending) > self.max_pending_traces:
+                    self._pending.popitem(last=False)  # root never ended here; give up on it
+                return
+            del self._pending[trace_id]
+        if self._keep(span, spans):
+            for s in spans:
+                self.delegate.on_end(s)
+
+    def _keep(self, root: ReadableSpan, spans: List[ReadableSpan]) -> bool:
+        if root.end_time - root.start_time >= self.slow_ns:
+            return True
+        if any(s.status.status_code is StatusCode.ERROR for s in spans):
+            return True
+        return random.random() < self.ratio
+
+    def shutdown(self) -> None:
+        self.delegate.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.delegate.force_flush(timeout_millis)
+
+
+def _exporter() -> SpanExporter:
+    if settings.TRACING_OTLP_ENDPOINT:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+        except ImportError:
+            logger.warning("⚠️  opentelemetry-exporter-otlp not installed, writing traces to file instead")
+    return JsonLinesSpanExporter(settings.TRACING_FILE)
+
+
+def setup_tracing(service_name: str = "resume-agent-api") -> None:
+    """Install the tracer provider (once per process; no-op unless enabled)."""
+    global _configured
+    if _configured or not settings.TRACING_ENABLED:
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(TailSamplingProcessor(BatchSpanProcessor(_exporter())))
+    trace.set_tracer_provider(provider)
+    _configured = True
+    logger.info(f"✅ Tracing enabled for {service_name}")
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator: run the function (sync or async) inside a span."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracingMiddleware:
+    """Server span per HTTP request, continuing any incoming ``traceparent``."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # skip header parsing entirely while no tracer provider is installed
+        if scope["type"] != "http" or isinstance(trace.get_tracer_provider(), trace.ProxyTracerProvider):
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}", context=propagate.extract(carrier), kind=SpanKind.SERVER
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                if span.is_recording():
+                    route = route_template(scope)
+                    span.update_name(f"{scope['method']} {route}")
+                    span.set_attribute("http.method", scope["method"])
+                    span.set_attribute("http.route", route)
+                    span.set_attribute("http.status_code", status)
+                    span.set_attribute("app.router", route.split("/")[1] if route.startswith("/") else route)
+                    if status >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+
+
+# --- Celery propagation ------------------------------------------------------
+
+_task_spans: Dict[str, tuple] = {}
+
+
+def inject_task_headers(headers: Optional[dict] = None, **_) -> None:
+    """``before_task_publish`` handler: carry the current trace in message headers."""
+    if headers is not None:
+        propagate.inject(headers)
+        headers["published_at"] = time.time()
+
+
+def start_task_span(task_id: str = None, task=None, **_) -> None:
+    """``task_prerun`` handler: open the task span under the publisher's trace."""
+    request = task.request
+    carrier = {k: request.get(k) for k in ("traceparent", "tracestate") if request.get(k)}
+    span = tracer.start_span(f"celery.task {task.name}", context=propagate.extract(carrier), kind=SpanKind.CONSUMER)
+    if span.is_recording():
+        span.set_attribute("celery.task_id", task_id)
+        published_at = request.get("published_at")
+        if published_at:
+            span.set_attribute("celery.queue_wait_ms", max(0.0, (time.time() - float(published_at)) * 1000))
+    token = context.attach(trace.set_span_in_context(span))
+    _task_spans[task_id] = (span, token)
+
+
+def end_task_span(task_id: str = None, state: str = None, **_) -> None:
+    """``task_postrun`` handler: close the task span."""
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+    span, token = entry
+    if state and state != "SUCCESS":
+        span.set_status(Status(StatusCode.ERROR, state))
+    span.end()
+    context.detach(token)
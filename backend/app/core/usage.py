@@ -0,0 +1,202 @@
+"""Feature usage tracking with HyperLogLog distinct-user counting.
+
+Every request to a tracked feature is recorded per feature per UTC day as a
+hit counter plus a HyperLogLog sketch of the users who made it. With Redis
+configured, hits are buffered in-process and flushed periodically with one
+pipelined PFADD/INCRBY round trip; week and month questions are answered by
+PFCOUNT over the daily keys, which merges the sketches server side. Without
+Redis the same sketches are kept in-process.
+"""
+
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import Request
+from jose import JWTError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .hyperloglog import HyperLogLog
+from .redis_client import get_redis
+from .security import decode_access_token
+
+logger = logging.getLogger(__name__)
+
+# Route prefix -> feature id
+FEATURES = {
+    "/resume": "resume",
+    "/interview": "interview",
+    "/ats": "ats",
+    "/templates": "templates",
+}
+
+FEATURE_NAMES = {
+    "resume": "Resume Generation",
+    "interview": "Interview Prep",
+    "ats": "ATS Optimization",
+    "templates": "Cover Letter",
+}
+
+# Pseudo-feature recorded for every request, used for active-user counts
+ACTIVE = "active"
+
+# Infrastructure traffic (probes, docs, Stripe deliveries) is not user activity
+UNTRACKED_PREFIXES = ("/health", "/docs", "/redoc", "/openapi.json", "/metrics", "/payments/webhook")
+
+_Bucket = Tuple[str, str]  # (feature, YYYYMMDD)
+
+
+def _day_key(day: date) -> str:
+    return day.strftime("%Y%m%d")
+
+
+def _window(days: int, today: Optional[date] = None) -> List[str]:
+    today = today or datetime.utcnow().date()
+    return [_day_key(today - timedelta(days=i)) for i in range(days)]
+
+
+class UsageTracker:
+    """Records feature hits and answers usage-count / distinct-user queries."""
+
+    def __init__(self, retention_days: int = settings.USAGE_RETENTION_DAYS):
+        self.retention_days = retention_days
+        self._sketches: Dict[_Bucket, HyperLogLog] = {}
+        self._counts: Counter = Counter()
+        self._pending_users: Dict[_Bucket, Set[str]] = defaultdict(set)
+        self._pending_counts: Counter = Counter()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_prune: Optional[str] = None
+
+    def record(self, feature: str, user_key: str, day: Optional[date] = None) -> None:
+        """Record one hit. Never does I/O, so it is safe on the request path."""
+        bucket = (feature, _day_key(day or datetime.utcnow().date()))
+        if get_redis() is not None:
+            self._pending_users[bucket].add(user_key)
+            self._pending_counts[bucket] += 1
+            return
+        sketch = self._sketches.get(bucket)
+        if sketch is None:
+            sketch = self._sketches[bucket] = HyperLogLog()
+            self._prune(bucket[1])
+        sketch.add(user_key)
+        self._counts[bucket] += 1
+
+    def _prune(self, today: str) -> None:
+        if today == self._last_prune:
+            return
+        self._last_prune = today
+        oldest = _day_key(datetime.strptime(today, "%Y%m%d").date() - timedelta(days=self.retention_days))
+        for bucket in [b for b in self._sketches if b[1] < oldest]:
+            del self._sketches[bucket]
+            self._counts.pop(bucket, None)
+
+    async def flush(self) -> None:
+        """Push buffered hits to Redis in a single pipeline."""
+        redis = get_redis()
+        if redis is None or not self._pending_counts:
+            return
+        users, counts = self._pending_users, self._pending_counts
+        self._pending_users, self._pending_counts = defaultdict(set), Counter()
+        ttl = self.retention_days * 86400
+        pipe = redis.pipeline(transaction=False)
+        for (feature, day), hits in counts.items():
+            hll_key, count_key = f"usage:hll:{feature}:{day}", f"usage:count:{feature}:{day}"
+            pipe.pfadd(hll_key, *users[(feature, day)])
+            pipe.incrby(count_key, hits)
+            pipe.expire(hll_key, ttl)
+            pipe.expire(count_key, ttl)
+        try:
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️  Usage metrics flush failed, dropping {sum(counts.values())} hits: {e}")
+
+    async def unique_users(self, feature: str, days: int = 1, today: Optional[date] = None) -> int:
+        """Approximate distinct users of ``feature`` over the last ``days`` days."""
+        window = _window(days, today)
+        redis = get_redis()
+        if redis is not None:
+            await self.flush()
+            return await redis.pfcount(*(f"usage:hll:{feature}:{d}" for d in window))
+        merged = HyperLogLog()
+        for d in window:
+            sketch = self._sketches.get((feature, d))
+            if sketch is not None:
+                merged.merge(sketch)
+        return merged.count()
+
+    async def usage_count(self, feature: str, days: int = 1, today: Optional[date] = None) -> int:
+        """Total hits on ``feature`` over the last ``days`` days."""
+        window = _window(days, today)
+        redis = get_redis()
+        if redis is not None:
+            await self.flush()
+            values = await redis.mget([f"usage:count:{feature}:{d}" for d in window])
+            return sum(int(v) for v in values if v)
+        return sum(self._counts[(feature, d)] for d in window)
+
+    async def _flush_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    def start(self, interval: float = settings.USAGE_FLUSH_INTERVAL_SECONDS) -> None:
+        """Start the periodic Redis flush (no-op without Redis)."""
+        if get_redis() is not None and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_forever(interval))
+
+    async def stop(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+
+usage_tracker = UsageTracker()
+
+
+def _user_key(request: Request) -> str:
+    auth = request.headers.get("authorization", "")
+    if auth[:7].lower() == "bearer ":
+        try:
+            return f"user:{decode_access_token(auth[7:]).get('sub')}"
+        except JWTError:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _feature_for(path: str) -> Optional[str]:
+    for prefix, feature in FEATURES.items():
+        if path.startswith(prefix):
+            return feature
+    return None
+
+
+class UsageTrackingMiddleware:
+    """Record successful requests against their feature and the active-user sketch.
+
+    A plain ASGI middleware rather than ``BaseHTTPMiddleware``, so streamed
+    (SSE) responses pass through unbuffered and client disconnects still
+    reach the endpoint.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(UNTRACKED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_and_record(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user_key = _user_key(Request(scope))
+                usage_tracker.record(ACTIVE, user_key)
+                feature = _feature_for(scope["path"])
+                if feature:
+                    usage_tracker.record(feature, user_key)
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
@@ -1,14 +1,26 @@
+import base64
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 from sqlalchemy.future import select
-from sqlalchemy import insert
-from .models import User
+from sqlalchemy import insert, func, tuple_
+from .models import User, Resume
 from .database import AsyncSessionLocal
+from .routing import read_session
 from ..core.security import get_password_hash
+from ..core.tracing import traced
 
+@traced()
 async def get_user_by_email(email: str):
     async with AsyncSessionLocal() as session:
         q = await session.execute(select(User).where(User.email == email))
         return q.scalars().first()
 
+@traced()
+async def get_user_by_id(user_id: int):
+    async with AsyncSessionLocal() as session:
+        return await session.get(User, user_id)
+
+@traced()
 async def create_user(email: str, password: str, full_name: str | None = None):
     hashed = get_password_hash(password)
     async with AsyncSessionLocal() as session:
@@ -17,3 +29,90 @@ async def create_user(email: str, password: str, full_name: str | None = None):
         await session.commit()
         await session.refresh(user)
         return user
+
+
+# --- Admin user listing -----------------------------------------------------
+# Users are paged by the (created_at, id) key instead of OFFSET so every page
+# is an index range scan no matter how deep the caller has paged.
+
+USER_LISTING_COLUMNS = ("id", "email", "full_name", "is_active", "is_admin", "created_at")
+
+
+def encode_user_cursor(created_at: datetime, user_id: int) -> str:
+    """Encode the keyset position of a user row as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{user_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_user_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by ``encode_user_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, user_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), int(user_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+@traced()
+async def list_users_page(limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one keyset page of users with their resume counts.
+
+    The page of users is selected first (CTE) and resume counts are
+    aggregated for just those rows in the same statement, so a page costs a
+    single round trip regardless of how many users or resumes exist.
+
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+    """
+    page = select(*(getattr(User, c) for c in USER_LISTING_COLUMNS))
+    if cursor:
+        after_created_at, after_id = decode_user_cursor(cursor)
+        page = page.where(tuple_(User.created_at, User.id) > tuple_(after_created_at, after_id))
+    page = page.order_by(User.created_at, User.id).limit(limit + 1).cte("page")
+
+    stmt = (
+        select(*page.c, func.count(Resume.id).label("total_resumes"))
+        .select_from(page.outerjoin(Resume, Resume.user_id == page.c.id))
+        .group_by(*page.c)
+        .order_by(page.c.created_at, page.c.id)
+    )
+    async with read_session() as session:
+        rows = [dict(r._mapping) for r in await session.execute(stmt)]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_user_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+async def iter_users_with_resume_counts(batch_size: int = 1000) -> AsyncIterator[List[dict]]:
+    """Yield every user (with resume count) in batches from a server-side cursor.
+
+    Resume counts come from one grouped pass over ``resumes`` joined to the
+    users scan, and rows are pulled from the database ``batch_size`` at a
+    time, so memory use stays flat however large the table is.
+    """
+    counts = (
+        select(Resume.user_id, func.count(Resume.id).label("total_resumes"))
+        .group_by(Resume.user_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            *(getattr(User, c) for c in USER_LISTING_COLUMNS),
+            func.coalesce(counts.c.total_resumes, 0).label("total_resumes"),
+        )
+        .outerjoin(counts, counts.c.user_id == User.id)
+        .order_by(User.created_at, User.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async with read_session() as session:
+        result = await session.stream(stmt)
+        async for partition in result.partitions(batch_size):
+            yield [dict(r._mapping) for r in partition]
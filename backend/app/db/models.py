@@ -1,7 +1,15 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
-from sqlalchemy.sql import func
+from datetime import datetime, timezone
+from uuid import uuid4
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Text, ForeignKey, Index, Float
+from sqlalchemy.sql import func, text
 from .database import Base
 
+def _uuid() -> str:
+    return str(uuid4())
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -10,14 +18,141 @@ class User(Base):
     full_name = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
+    is_recruiter = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ResumeBlob(Base):
+    """Uploaded file content, stored once per SHA-256 and shared by every Resume with that content."""
+    __tablename__ = "resume_blobs"
+    sha256 = Column(String(64), primary_key=True)
+    s3_key = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String, nullable=True)
+    extracted_text = Column(Text, nullable=True)
+    refcount = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class Resume(Base):
     __tablename__ = "resumes"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     s3_key = Column(String, nullable=False)
+    blob_sha256 = Column(String(64), ForeignKey("resume_blobs.sha256"), nullable=True, index=True)
+    filename = Column(String, nullable=True)
     extracted_text = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-# Additional models: JobDescription, InterviewSession, PaymentRecord etc. TODO
+class StripeEvent(Base):
+    """Raw Stripe webhook event, keyed by Stripe's event id for idempotency."""
+    __tablename__ = "stripe_events"
+    id = Column(String, primary_key=True)  # evt_...
+    type = Column(String, nullable=False)
+    customer_id = Column(String, nullable=True)
+    stripe_created = Column(BigInteger, nullable=False)  # event.created (epoch seconds)
+    payload = Column(Text, nullable=False)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_stripe_events_customer_pending", "customer_id", "stripe_created", "id",
+              postgresql_where=text("processed_at IS NULL")),
+    )
+
+class Subscription(Base):
+    """A user's plan, maintained from Stripe webhook events."""
+    __tablename__ = "subscriptions"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+    stripe_customer_id = Column(String, index=True, nullable=True)
+    stripe_subscription_id = Column(String, unique=True, nullable=True)
+    plan = Column(String, nullable=False, default="free")
+    status = Column(String, nullable=False, default="active")
+    current_period_start = Column(DateTime(timezone=True), nullable=True)
+    current_period_end = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class Template(Base):
+    """AI generation template (prompt instructions plus catalog metadata)."""
+    __tablename__ = "templates"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    description = Column(String, nullable=False, default="")
+    type = Column(String, nullable=False, index=True)  # "cover_letter", "linkedin", "ats_optimization"
+    category = Column(String, nullable=False, default="default")
+    prompt = Column(Text, nullable=False)
+    is_premium = Column(Boolean, default=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ImportJob(Base):
+    """A bulk resume import (zip archive or MinIO prefix) and its progress."""
+    __tablename__ = "import_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    source = Column(String, nullable=False)  # "zip" or "minio"
+    location = Column(String, nullable=False)  # archive object key or source prefix
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    processed = Column(Integer, nullable=False, default=0)
+    imported = Column(Integer, nullable=False, default=0)
+    deduplicated = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    errors = Column(Text, nullable=True)  # JSON list of {"file", "error"}
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+# High-volume tables below are range-partitioned by month on created_at in
+# Postgres (see app.db.partitions); the partition key has to be part of the
+# primary key, and ids are generated client-side so that holds on SQLite too.
+
+class InterviewSession(Base):
+    """An interview practice session."""
+    __tablename__ = "interview_sessions"
+    __table_args__ = (
+        Index("ix_interview_sessions_user_created", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    id = Column(String(36), primary_key=True, default=_uuid)
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=_now, server_default=func.now())
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    role = Column(String, nullable=True)
+    difficulty = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="active")
+    question_count = Column(Integer, nullable=False, default=0)
+    score = Column(Float, nullable=True)
+
+class PaymentRecord(Base):
+    """One charge, refund or failed payment, as reported by Stripe (written by ``app.billing.webhooks``)."""
+    __tablename__ = "payment_records"
+    __table_args__ = (
+        Index("ix_payment_records_status_created", "status", "created_at"),
+        Index("ix_payment_records_user_created", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    id = Column(String(36), primary_key=True, default=_uuid)
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=_now, server_default=func.now())
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    stripe_customer_id = Column(String, nullable=True)
+    stripe_object_id = Column(String, nullable=True)
+    plan = Column(String, nullable=True)
+    amount = Column(Integer, nullable=False)  # smallest currency unit
+    currency = Column(String(3), nullable=False, default="usd")
+    status = Column(String, nullable=False)  # "succeeded", "failed", "refunded"
+
+class UsageEvent(Base):
+    """One use of a tracked feature by a user.
+
+    Nothing writes it yet: feature usage is counted in HyperLogLog sketches
+    (``app.core.usage``). The table and its partitions are in place for
+    per-event history.
+    """
+    __tablename__ = "usage_events"
+    __table_args__ = (
+        Index("ix_usage_events_feature_created", "feature", "created_at"),
+        Index("ix_usage_events_user_created", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    id = Column(String(36), primary_key=True, default=_uuid)
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=_now, server_default=func.now())
+    user_id = Column(Integer, nullable=True)
+    feature = Column(String, nullable=False)
+
@@ -0,0 +1,157 @@
+"""Monthly partitions for the high-volume tables, and their archival.
+
+``interview_sessions``, ``payment_records`` and ``usage_events`` are range
+partitioned on ``created_at`` in Postgres, with one partition per UTC month
+named ``<table>_pYYYYMM``. A daily Celery beat task
+(``app.tasks.maintain_partitions``) does two things:
+
+- It creates the partitions for the next ``PARTITION_PREMAKE_MONTHS``
+  months. There is no default partition, so inserts always land in a
+  month that already exists.
+- It archives every partition older than ``PARTITION_HOT_MONTHS`` months.
+  The partition is detached, its rows are streamed to MinIO as
+  gzip-compressed NDJSON under ``ARCHIVE_PREFIX<table>/YYYY/MM.ndjson.gz``,
+  the object's size is checked, and only then is the table dropped.
+
+Each step commits on its own, so a run that dies halfway leaves either an
+attached partition or a detached, not yet dropped one. The next run finds
+detached partitions by name and finishes them, so no rows are lost and the
+hot tables (and their indexes and vacuum work) stay bounded by the hot
+window.
+
+On other databases (SQLite in development and tests) the tables are
+ordinary tables and maintenance does nothing.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import re
+import tempfile
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+from ..core import minio_utils
+from ..core.config import settings
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("interview_sessions", "payment_records", "usage_events")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Month of a partition named by ``partition_name``, or None for other names."""
+    match = re.fullmatch(rf"{re.escape(table)}_p(\d{{4}})(\d{{2}})", name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def archive_key(table: str, month: date) -> str:
+    return f"{settings.ARCHIVE_PREFIX}{table}/{month:%Y}/{month:%m}.ndjson.gz"
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(table, month)}" PARTITION OF "{table}" '
+        f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')"
+    )
+
+
+def ndjson_line(row) -> bytes:
+    """One archived row; dates and decimals as strings."""
+    return json.dumps(dict(row), default=str, separators=(",", ":")).encode() + b"\n"
+
+
+async def ensure_partitions(today: Optional[date] = None) -> List[str]:
+    """Create this month's and the next PARTITION_PREMAKE_MONTHS months' partitions."""
+    if engine.dialect.name != "postgresql":
+        return []
+    first = month_start(today or datetime.now(timezone.utc).date())
+    created = []
+    async with engine.begin() as conn:
+        for table in PARTITIONED_TABLES:
+            for offset in range(settings.PARTITION_PREMAKE_MONTHS + 1):
+                month = add_months(first, offset)
+                await conn.execute(text(create_partition_sql(table, month)))
+                created.append(partition_name(table, month))
+    return created
+
+
+async def _partitions(table: str) -> List[Tuple[str, date, bool]]:
+    """(name, month, attached) of every monthly partition of a table, detached ones included."""
+    async with engine.connect() as conn:
+        rows = (await conn.execute(text(
+            "SELECT c.relname, i.inhrelid IS NOT NULL AS attached FROM pg_class c "
+            "LEFT JOIN pg_inherits i ON i.inhrelid = c.oid "
+            "WHERE c.relkind = 'r' AND c.relname LIKE :pattern"
+        ), {"pattern": f"{table}_p%"})).all()
+    found = [(r.relname, partition_month(table, r.relname), r.attached) for r in rows]
+    return sorted((name, month, attached) for name, month, attached in found if month is not None)
+
+
+async def archive_partition(table: str, name: str, month: date, attached: bool) -> int:
+    """Detach, export to MinIO and drop one partition; returns the rows archived."""
+    if attached:
+        async with engine.begin() as conn:
+            await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+
+    key = archive_key(table, month)
+    count = 0
+    with tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024) as spool:
+        # server-side cursor: the partition is never held in memory at once
+        async with engine.connect() as conn:
+            result = await conn.stream(text(f'SELECT * FROM "{name}"'))
+            with gzip.GzipFile(fileobj=spool, mode="wb") as gz:
+                async for row in result:
+                    gz.write(ndjson_line(row._mapping))
+                    count += 1
+        size = spool.tell()
+        spool.seek(0)
+        client = minio_utils.get_minio_client()
+        await asyncio.to_thread(client.put_object, settings.MINIO_BUCKET, key, spool, size,
+                                content_type="application/gzip")
+        stored = await asyncio.to_thread(client.stat_object, settings.MINIO_BUCKET, key)
+    if stored.size != size:
+        raise RuntimeError(f"Archive {key} is {stored.size} bytes, expected {size}; keeping {name}")
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f'DROP TABLE "{name}"'))
+    logger.info(f"✅ Archived {name}: {count} rows to {key}")
+    return count
+
+
+async def archive_old_partitions(today: Optional[date] = None) -> List[str]:
+    """Archive every partition older than the PARTITION_HOT_MONTHS newest months."""
+    if engine.dialect.name != "postgresql":
+        return []
+    cutoff = add_months(month_start(today or datetime.now(timezone.utc).date()), -settings.PARTITION_HOT_MONTHS)
+    archived = []
+    for table in PARTITIONED_TABLES:
+        for name, month, attached in await _partitions(table):
+            if month < cutoff:
+                await archive_partition(table, name, month, attached)
+                archived.append(name)
+    return archived
+
+
+async def maintain_partitions(today: Optional[date] = None) -> dict:
+    created = await ensure_partitions(today)
+    archived = await archive_old_partitions(today)
+    return {"ensured": len(created), "archived": archived}
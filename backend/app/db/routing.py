@@ -0,0 +1,174 @@
+"""Read-replica routing for read-only queries.
+
+Writes, and every query that is not explicitly routed, use the primary
+``engine``. Read-only paths that can tolerate a little replication lag
+(admin listings and exports, the template catalog, resume search) open
+their connection through ``replica_router`` instead. It picks replicas
+round robin from ``DATABASE_REPLICA_URLS``. A replica that refuses a
+connection is skipped for ``REPLICA_RETRY_SECONDS``, and with none
+available reads fall back to the primary.
+
+Read-your-writes: ``ReadYourWritesMiddleware`` records the caller's
+identity for the request. After a successful POST/PUT/PATCH/DELETE it marks
+that caller as having written. For ``REPLICA_STICKY_SECONDS`` afterwards
+their reads go to the primary, so they never see a replica that has not yet
+caught up with their own change. The mark is kept in process and, with
+Redis configured, shared across workers.
+"""
+
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, List, Optional
+
+from jose import JWTError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.config import settings
+from ..core.metrics import DB_READ_ROUTES
+from ..core.redis_client import get_redis
+from ..core.security import decode_access_token
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+# caller identity of the current request ("user:<id>"), set by ReadYourWritesMiddleware
+current_caller: ContextVar[Optional[str]] = ContextVar("current_caller", default=None)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReplicaRouter:
+    def __init__(self, primary: AsyncEngine, replicas: List[AsyncEngine],
+                 sticky_seconds: float = settings.REPLICA_STICKY_SECONDS,
+                 retry_seconds: float = settings.REPLICA_RETRY_SECONDS):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._next = itertools.count()
+        self._down_until: Dict[int, float] = {}
+        self._wrote: Dict[str, float] = {}
+
+    def _available(self) -> List[AsyncEngine]:
+        now = time.monotonic()
+        return [r for i, r in enumerate(self.replicas) if self._down_until.get(i, 0.0) <= now]
+
+    def pick(self) -> Optional[AsyncEngine]:
+        """Next healthy replica, round robin; None if there is none."""
+        available = self._available()
+        if not available:
+            return None
+        return available[next(self._next) % len(available)]
+
+    def mark_down(self, replica: AsyncEngine, error: Exception) -> None:
+        self._down_until[self.replicas.index(replica)] = time.monotonic() + self.retry_seconds
+        logger.warning(f"⚠️ Read replica {replica.url.host} unavailable for {self.retry_seconds}s: {error}")
+
+    async def note_write(self, caller: str) -> None:
+        """Send ``caller``'s reads to the primary for the next ``sticky_seconds``."""
+        self._wrote[caller] = time.monotonic() + self.sticky_seconds
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.set(f"db:wrote:{caller}", 1, px=int(self.sticky_seconds * 1000))
+            except Exception as e:
+                logger.error(f"❌ Failed to share read-your-writes mark: {e}")
+
+    async def is_sticky(self, caller: Optional[str]) -> bool:
+        if caller is None:
+            return False
+        if self._wrote.get(caller, 0.0) > time.monotonic():
+            return True
+        self._wrote.pop(caller, None)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                return bool(await redis.exists(f"db:wrote:{caller}"))
+            except Exception:
+                return True  # unsure: the primary is always correct
+        return False
+
+    @asynccontextmanager
+    async def connect(self, primary: bool = False) -> AsyncIterator[AsyncConnection]:
+        """A connection for read-only work: a healthy replica unless the caller just wrote."""
+        conn = None
+        if self.replicas and not primary and not await self.is_sticky(current_caller.get()):
+            replica = self.pick()
+            while replica is not None:
+                try:
+                    conn = await replica.connect()
+                    break
+                except (OSError, DBAPIError) as e:
+                    self.mark_down(replica, e)
+                    replica = self.pick()
+        DB_READ_ROUTES.labels("replica" if conn is not None else "primary").inc()
+        if conn is None:
+            conn = await self.primary.connect()
+        try:
+            yield conn
+        finally:
+            await conn.close()
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.dispose()
+
+
+def _replica_urls() -> List[str]:
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+
+replica_router = ReplicaRouter(engine, [create_async_engine(url, echo=False) for url in _replica_urls()])
+
+
+@asynccontextmanager
+async def read_session(primary: bool = False) -> AsyncIterator[AsyncSession]:
+    """An ``AsyncSession`` for read-only queries, routed by ``replica_router``."""
+    async with replica_router.connect(primary) as conn:
+        async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+            yield session
+
+
+def _caller(scope: Scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            auth = value.decode("latin-1")
+            if auth[:7].lower() != "bearer ":
+                return None
+            try:
+                claims = decode_access_token(auth[7:])
+            except JWTError:
+                return None
+            return f"user:{claims.get('user_id') or claims.get('sub')}"
+    return None
+
+
+class ReadYourWritesMiddleware:
+    """Tag the request with its caller and mark callers whose writes succeeded."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        caller = _caller(scope)
+        token = current_caller.set(caller)
+
+        async def send_and_mark(message: Message) -> None:
+            # before the response leaves, so the client's next read already sees the mark
+            if (message["type"] == "http.response.start" and message["status"] < 400
+                    and caller is not None and scope["method"] not in SAFE_METHODS):
+                await replica_router.note_write(caller)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_mark)
+        finally:
+            current_caller.reset(token)
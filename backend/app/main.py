@@ -1,18 +1,46 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
 from .core.minio_utils import ensure_buckets
-from .api import auth, health, user, resume, job, ats, interview, payments, admin, templates
+from .api import auth, health, user, resume, job, ats, interview, payments, admin, templates, search, imports
 from .core.logging import setup_logging
+from .core.usage import UsageTrackingMiddleware, usage_tracker
+from .core.metrics import MetricsMiddleware, render_metrics
+from .core.tracing import TracingMiddleware, setup_tracing
+from .core.profiling import RequestProfilerMiddleware
+from .core.health import health_monitor
+from .billing.gateway import stripe_gateway
+from .ai.template_cache import template_catalog
+from .ai.ai_client import ai_client
+from .ai.resilience import LLMUnavailable
+from .db.database import engine
+from .core.fanout import interview_fanout
+from .db.routing import ReadYourWritesMiddleware, replica_router
+import asyncio
 import logging
+import time
 
 setup_logging()
+setup_tracing()
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    yield
+    await shutdown()
+
 app = FastAPI(
     title="AI Interview & Resume Agent",
     description="AI-powered resume and interview preparation platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # return values still pass through jsonable_encoder; routes serving large,
+    # already JSON-shaped data return an ORJSONResponse to skip it
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS with proper origin handling
@@ -25,6 +53,13 @@ app.add_middleware(
     allow_headers=["*"],
     max_age=600,
 )
+app.add_middleware(UsageTrackingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+if replica_router.replicas:
+    app.add_middleware(ReadYourWritesMiddleware)
+if settings.PROFILING_TOKEN:
+    app.add_middleware(RequestProfilerMiddleware, token=settings.PROFILING_TOKEN)
 
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -36,28 +71,92 @@ app.include_router(interview.router, prefix="/interview", tags=["interview"])
 app.include_router(payments.router, prefix="/payments", tags=["payments"])
 app.include_router(templates.router, prefix="/templates", tags=["templates"])
 app.include_router(admin.router, prefix="/admin", tags=["admin"])
+app.include_router(search.router, prefix="/search", tags=["search"])
+app.include_router(imports.router, prefix="/imports", tags=["imports"])
+
+@app.exception_handler(LLMUnavailable)
+async def llm_unavailable(request, exc):
+    """No model answered: tell clients to retry once the circuit breaker's cooldown has passed."""
+    return ORJSONResponse(
+        {"detail": "AI provider temporarily unavailable, please retry"},
+        status_code=503,
+        headers={"Retry-After": str(int(settings.LLM_BREAKER_COOLDOWN_SECONDS))},
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    body, content_type = await render_metrics()
+    return Response(content=body, media_type=content_type)
+
+async def _warm_database():
+    """Open the pool's connections up front so first requests skip the connect."""
+    pool = engine.pool
+    count = pool.size() if hasattr(pool, "size") else 1
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(count)))
+
+async def _warm(name: str, coro) -> bool:
+    """Run one warm-up step with a deadline; failures are logged, never raised."""
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(coro, settings.STARTUP_WARMUP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.error(f"⚠️  {name} warm-up timed out after {settings.STARTUP_WARMUP_TIMEOUT_SECONDS}s")
+        return False
+    except Exception as e:
+        logger.error(f"⚠️  {name} warm-up failed: {e}")
+        return False
+    logger.info(f"✅ {name} ready ({(time.perf_counter() - start) * 1000:.0f}ms)")
+    return True
 
-@app.on_event("startup")
 async def startup():
-    """Initialize app on startup: DB pools, MinIO bucket, etc."""
+    """Initialize app on startup: DB pool, MinIO client and bucket, background workers.
+
+    Dependency warm-ups run concurrently, each bounded by
+    STARTUP_WARMUP_TIMEOUT_SECONDS, so one slow dependency can't hold the
+    worker back for long; a failed warm-up is retried lazily on first use.
+    """
     logger.info("="*70)
     logger.info("🚀 Starting up AI Resume Agent...")
     logger.info("="*70)
-    
-    # Initialize MinIO bucket if needed
-    try:
-        logger.info("📦 Ensuring MinIO bucket exists...")
-        ensure_buckets()
-        logger.info("✅ MinIO bucket initialization complete")
-    except Exception as e:
-        logger.error(f"⚠️  MinIO initialization failed: {e}")
+
+    _, minio_ok = await asyncio.gather(
+        _warm("Database pool", _warm_database()),
+        _warm("MinIO bucket", asyncio.to_thread(ensure_buckets)),
+    )
+    if not minio_ok:
         logger.error("Resume uploads may fail. Check MinIO configuration and connectivity.")
+
+    usage_tracker.start()
+    template_catalog.start_listener()
+    health_monitor.start()
+
+    # Pre-create/cache Stripe prices in the background so startup doesn't wait on Stripe
+    if settings.STRIPE_API_KEY:
+        asyncio.create_task(_warm_stripe_prices())
     
     logger.info("✅ Startup complete - AI Resume Agent is ready")
     logger.info("="*70)
 
-@app.on_event("shutdown")
+async def _warm_stripe_prices():
+    try:
+        await stripe_gateway.ensure_prices()
+        logger.info("✅ Stripe plan prices cached")
+    except Exception as e:
+        logger.error(f"⚠️  Stripe price warm-up failed (will retry on first checkout): {e}")
+
 async def shutdown():
     """Clean up on shutdown."""
     logger.info("🛑 Shutting down AI Resume Agent...")
-
+    await health_monitor.stop()
+    await usage_tracker.stop()
+    await template_catalog.stop_listener()
+    await interview_fanout.stop()
+    await ai_client.aclose()
+    await replica_router.dispose()
+    await engine.dispose()
@@ -1,12 +1,138 @@
+import asyncio
 from celery import Celery
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_init, worker_process_init
+from sqlalchemy import select
 from .core.config import settings
+from .db.database import engine, AsyncSessionLocal
+from .db.models import Resume
+from .core.redis_client import close_redis
+from .core import tracing
+from .billing import webhooks
+from .ai import embeddings, interviewer
+from .ai.ai_client import ai_client
+from .core import bulk_import
+from .db import partitions
 
 broker = settings.CELERY_BROKER
 backend = settings.CELERY_BACKEND
 
 worker = Celery('resume_agent', broker=broker, backend=backend)
 
+# bulk imports fork an extraction process pool: consumed by a --pool=solo worker (see docker-compose.yml)
+worker.conf.task_routes = {"app.tasks.import_resumes": {"queue": "imports"}}
+
+worker.conf.beat_schedule = {
+    # Safety net for events whose enqueue failed or whose processing exhausted retries
+    "sweep-stripe-events": {
+        "task": "app.tasks.sweep_stripe_events",
+        "schedule": 60.0,
+    },
+    # Create upcoming monthly partitions, archive the ones past the hot window
+    "maintain-partitions": {
+        "task": "app.tasks.maintain_partitions",
+        "schedule": 24 * 3600.0,
+    },
+}
+
+# Trace context travels in message headers: publisher -> worker
+before_task_publish.connect(tracing.inject_task_headers, weak=False)
+task_prerun.connect(tracing.start_task_span, weak=False)
+task_postrun.connect(tracing.end_task_span, weak=False)
+
+
+@worker_process_init.connect(weak=False)
+def init_worker_tracing(**_):
+    # after fork, so the span export thread belongs to the worker process
+    tracing.setup_tracing("resume-agent-worker")
+
+
+@worker_init.connect(weak=False)
+def init_unforked_worker_tracing(sender=None, **_):
+    # --pool=solo (the imports worker) and thread pools run tasks in the main
+    # process and never send worker_process_init
+    from celery.concurrency import get_implementation
+    from celery.concurrency.prefork import TaskPool as PreforkPool
+
+    if not issubclass(get_implementation(sender.pool_cls), PreforkPool):
+        tracing.setup_tracing("resume-agent-worker")
+
+
+def run_async(coro):
+    """Run a coroutine from a (sync) Celery task.
+
+    Each task gets a fresh event loop, so pooled DB and Redis connections
+    bound to the loop are closed before it ends.
+    """
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+            await close_redis()
+    return asyncio.run(runner())
+
 @worker.task
 def long_running_task(x):
     # placeholder for processing (e.g., transcode, long AI jobs) 
     return x * 2
+
+@worker.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_backoff_max=600, max_retries=8)
+def process_stripe_events(self, customer_id):
+    """Apply a customer's pending Stripe events in order."""
+    try:
+        return run_async(webhooks.process_pending_events(customer_id))
+    except webhooks.CustomerBusy:
+        # the lock holder drains the backlog; check back in case our event arrived after its last read
+        raise self.retry(countdown=webhooks.BUSY_RETRY_SECONDS)
+
+@worker.task
+def sweep_stripe_events():
+    """Re-enqueue processing for every customer with unprocessed events."""
+    customers = run_async(webhooks.customers_with_pending_events())
+    for customer_id in customers:
+        process_stripe_events.delay(customer_id)
+    return len(customers)
+
+@worker.task
+def index_resumes(resume_ids):
+    """Embed extracted resume text into the "resumes" similarity index."""
+    async def load():
+        async with AsyncSessionLocal() as session:
+            rows = await session.execute(
+                select(Resume.id, Resume.extracted_text)
+                .where(Resume.id.in_(resume_ids), Resume.extracted_text.isnot(None))
+            )
+            return dict(rows.all())
+    texts = run_async(load())
+    embeddings.index_texts("resumes", texts)
+    return len(texts)
+
+@worker.task
+def unindex_resumes(resume_ids):
+    """Drop deleted resumes from the "resumes" similarity index."""
+    embeddings.get_index("resumes").remove(resume_ids)
+    return len(resume_ids)
+
+@worker.task(acks_late=True)
+def import_resumes(job_id):
+    """Run a bulk resume import (routed to the "imports" queue).
+
+    Redelivered if the worker dies mid-import; ``run_job`` resumes the job
+    after the entries it already committed.
+    """
+    return run_async(bulk_import.run_job(job_id))
+
+@worker.task
+def evaluate_interview_answer(session_id, question_id, question, answer):
+    """Evaluate an interview answer; progress reaches the client's socket via Redis."""
+    async def evaluate():
+        try:
+            return await interviewer.evaluate_answer(session_id, question_id, question, answer)
+        finally:
+            await ai_client.aclose()  # its HTTP pool is bound to this task's event loop
+    return run_async(evaluate())
+
+@worker.task
+def maintain_partitions():
+    """Create upcoming monthly partitions and archive old ones to MinIO."""
+    return run_async(partitions.maintain_partitions())
@@ -0,0 +1,36 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from ..db.database import engine, Base
+from ..db import models  # noqa: F401  (register tables on Base.metadata)
+
+
+@pytest_asyncio.fixture
+async def db():
+    """Create all tables on the configured test database for one test."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def open_transactions():
+    """Number of transactions open on the engine, kept current as they begin and end."""
+    count = [0]
+
+    def begin(conn):
+        count[0] += 1
+
+    def end(conn):
+        count[0] -= 1
+
+    listeners = [("begin", begin), ("commit", end), ("rollback", end)]
+    for name, fn in listeners:
+        event.listen(engine.sync_engine, name, fn)
+    yield count
+    for name, fn in listeners:
+        event.remove(engine.sync_engine, name, fn)
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from ..main import app
+from ..core.security import create_access_token
+from ..db.database import AsyncSessionLocal
+from ..db.models import User, Resume
+
+
+def _auth(user_id: int) -> dict:
+    token = create_access_token({"sub": f"user{user_id - 1}@example.com", "user_id": user_id})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _seed(n_users: int):
+    base = datetime(2025, 1, 1)
+    async with AsyncSessionLocal() as session:
+        users = [
+            # every pair of users shares a created_at so the id tie-breaker is exercised
+            User(email=f"user{i}@example.com", hashed_password="x", is_admin=i == 0,
+                 created_at=base + timedelta(seconds=i // 2))
+            for i in range(n_users)
+        ]
+        session.add_all(users)
+        await session.flush()
+        session.add_all(Resume(user_id=u.id, s3_key=f"k{u.id}-{j}") for u in users for j in range(u.id % 3))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_visits_every_user_once(db):
+    await _seed(25)
+    seen, cursor = [], None
+    async with AsyncClient(app=app, base_url="http://test", headers=_auth(1)) as ac:
+        while True:
+            params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+            r = await ac.get("/admin/users", params=params)
+            assert r.status_code == 200
+            body = r.json()
+            seen.extend(body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+    assert [u["id"] for u in seen] == list(range(1, 26))
+    assert all(u["total_resumes"] == u["id"] % 3 for u in seen)
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(db):
+    await _seed(1)
+    async with AsyncClient(app=app, base_url="http://test", headers=_auth(1)) as ac:
+        r = await ac.get("/admin/users", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_streams_csv_and_ndjson(db):
+    await _seed(12)
+    async with AsyncClient(app=app, base_url="http://test", headers=_auth(1)) as ac:
+        r_csv = await ac.get("/admin/users/export", params={"format": "csv", "batch_size": 5})
+        r_nd = await ac.get("/admin/users/export", params={"format": "ndjson", "batch_size": 5})
+    rows = list(csv.DictReader(io.StringIO(r_csv.text)))
+    assert [int(r["id"]) for r in rows] == list(range(1, 13))
+    records = [json.loads(line) for line in r_nd.text.splitlines()]
+    assert [r["total_resumes"] for r in records] == [i % 3 for i in range(1, 13)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/admin/users", "/admin/users/export", "/admin/metrics/usage",
+                                  "/admin/metrics/llm", "/admin/metrics/daily"])
+async def test_admin_routes_require_an_admin(db, path):
+    await _seed(2)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        anonymous = await ac.get(path)
+        member = await ac.get(path, headers=_auth(2))
+    assert anonymous.status_code == 401
+    assert member.status_code == 403
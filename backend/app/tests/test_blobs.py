@@ -0,0 +1,166 @@
+import io
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, select
+
+from ..main import app
+from ..core import blobs, minio_utils
+from ..core.config import settings
+from ..core.security import create_access_token
+from ..db.database import AsyncSessionLocal, engine
+from ..db.models import Resume, ResumeBlob
+from benchmarks.fakes import FakeMinio
+
+CONTENT = b"Jane Doe\nSenior Python engineer: FastAPI, PostgreSQL, Kubernetes.\n"
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    fake = FakeMinio()
+    puts = []
+    put_object = fake.put_object
+
+    def counting_put(bucket, name, *args, **kwargs):
+        puts.append(name)
+        return put_object(bucket, name, *args, **kwargs)
+
+    fake.put_object = counting_put
+    fake.puts = puts
+    monkeypatch.setattr(minio_utils, "get_minio_client", lambda: fake)
+    fake.indexed = []
+
+    async def enqueue_indexing(resume_ids):
+        fake.indexed.extend(resume_ids)
+
+    monkeypatch.setattr(blobs, "enqueue_indexing", enqueue_indexing)
+    fake.unindexed = []
+
+    async def enqueue_unindexing(resume_ids):
+        fake.unindexed.extend(resume_ids)
+
+    monkeypatch.setattr(blobs, "enqueue_unindexing", enqueue_unindexing)
+    return fake
+
+
+async def _blob(sha256):
+    async with AsyncSessionLocal() as session:
+        return await session.get(ResumeBlob, sha256)
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_blob(db, storage, monkeypatch):
+    first = await blobs.store_resume(1, io.BytesIO(CONTENT), "a.txt", "text/plain")
+    monkeypatch.setattr(blobs, "extract_text", lambda *a: pytest.fail("re-extracted a known file"))
+    second = await blobs.store_resume(2, io.BytesIO(CONTENT), "b.txt", "text/plain")
+
+    assert (first.deduplicated, second.deduplicated) == (False, True)
+    assert first.s3_key == second.s3_key == blobs.blob_key(first.sha256)
+    assert second.extracted_text == CONTENT.decode()
+    assert storage.puts == [first.s3_key]
+    assert (await _blob(first.sha256)).refcount == 2
+
+
+@pytest.mark.asyncio
+async def test_blob_is_removed_with_its_last_reference(db, storage):
+    first = await blobs.store_resume(1, io.BytesIO(CONTENT), "a.txt")
+    second = await blobs.store_resume(2, io.BytesIO(CONTENT), "b.txt")
+    key = (settings.MINIO_BUCKET, first.s3_key)
+
+    assert await blobs.release_resume(first.id, user_id=2) is False  # not theirs
+    assert await blobs.release_resume(first.id, user_id=1) is True
+    assert key in storage.objects and (await _blob(first.sha256)).refcount == 1
+
+    assert await blobs.release_resume(second.id, user_id=2) is True
+    assert key not in storage.objects and await _blob(first.sha256) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_removal_keeps_the_blob_for_reuse(db, storage, monkeypatch):
+    stored = await blobs.store_resume(1, io.BytesIO(CONTENT), "a.txt")
+    monkeypatch.setattr(minio_utils, "delete_object", lambda *a: False)
+    await blobs.release_resume(stored.id, user_id=1)
+    assert (await _blob(stored.sha256)).refcount == 0
+
+    again = await blobs.store_resume(1, io.BytesIO(CONTENT), "a.txt")
+    assert again.deduplicated and (await _blob(stored.sha256)).refcount == 1
+
+
+@pytest.mark.asyncio
+async def test_upload_and_extraction_run_outside_any_transaction(db, storage, open_transactions, monkeypatch):
+    seen = []
+    put_blob, extract_text = blobs.put_blob, blobs.extract_text
+
+    def tracking(fn):
+        def wrapper(*args):
+            seen.append(open_transactions[0])
+            return fn(*args)
+        return wrapper
+
+    monkeypatch.setattr(blobs, "put_blob", tracking(put_blob))
+    monkeypatch.setattr(blobs, "extract_text", tracking(extract_text))
+    stored = await blobs.store_resume(1, io.BytesIO(CONTENT), "a.txt")
+    assert seen == [0, 0] and not stored.deduplicated
+    assert (await _blob(stored.sha256)).extracted_text == CONTENT.decode()
+
+
+@pytest.mark.asyncio
+async def test_object_outlives_a_release_that_rolls_back(db, storage, monkeypatch):
+    stored = await blobs.store_resume(1, io.BytesIO(CONTENT), "a.txt")
+    release_blob = blobs.release_blob
+
+    async def then_fail(conn, sha256):
+        await release_blob(conn, sha256)
+        raise RuntimeError("connection lost before commit")
+
+    monkeypatch.setattr(blobs, "release_blob", then_fail)
+    with pytest.raises(RuntimeError):
+        await blobs.release_resume(stored.id, user_id=1)
+    assert (settings.MINIO_BUCKET, stored.s3_key) in storage.objects
+    assert (await _blob(stored.sha256)).refcount == 1
+
+
+@pytest.mark.asyncio
+async def test_unreferenced_blob_whose_object_is_gone_is_restored(db, storage, monkeypatch):
+    stored = await blobs.store_resume(1, io.BytesIO(CONTENT), "a.txt")
+    async with engine.begin() as conn:  # a removal that deleted the object, then rolled back
+        await blobs.release_blob(conn, stored.sha256)
+        await conn.execute(delete(Resume).where(Resume.id == stored.id))
+    del storage.objects[(settings.MINIO_BUCKET, stored.s3_key)]
+
+    again = await blobs.store_resume(2, io.BytesIO(CONTENT), "a.txt")
+    assert (settings.MINIO_BUCKET, again.s3_key) in storage.objects
+    assert (await _blob(stored.sha256)).refcount == 1
+
+
+def test_delete_object_refuses_shared_blobs(storage):
+    key = blobs.blob_key("ab" * 32)
+    storage.objects[(settings.MINIO_BUCKET, key)] = (b"x", "text/plain")
+    assert minio_utils.delete_object(settings.MINIO_BUCKET, key) is False
+    assert (settings.MINIO_BUCKET, key) in storage.objects
+    assert minio_utils.delete_object(settings.MINIO_BUCKET, key, unreferenced=True) is True
+
+
+def test_digest_enforces_the_size_limit():
+    sha, size = blobs.digest(io.BytesIO(CONTENT), max_bytes=len(CONTENT))
+    assert size == len(CONTENT) and len(sha) == 64
+    with pytest.raises(blobs.UploadTooLarge):
+        blobs.digest(io.BytesIO(CONTENT), max_bytes=len(CONTENT) - 1)
+
+
+@pytest.mark.asyncio
+async def test_upload_endpoint_deduplicates(db, storage):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'a@example.com', 'user_id': 7})}"}
+    files = {"file": ("resume.txt", CONTENT, "text/plain")}
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        anonymous = await ac.post("/resume/upload", files=files)
+        first = await ac.post("/resume/upload", files=files, headers=headers)
+        second = await ac.post("/resume/upload", files=files, headers=headers)
+        deleted = await ac.delete(f"/resume/{first.json()['id']}", headers=headers)
+
+    assert anonymous.status_code == 401
+    assert first.json()["sha256"] == second.json()["sha256"] and "deduplicated" not in second.json()
+    assert deleted.status_code == 204 and storage.unindexed == [first.json()["id"]]
+    async with AsyncSessionLocal() as session:
+        remaining = (await session.execute(select(Resume.id))).scalars().all()
+    assert remaining == [second.json()["id"]]
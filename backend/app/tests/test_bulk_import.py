@@ -0,0 +1,170 @@
+import io
+import json
+import threading
+import zipfile
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+
+from ..main import app
+from ..core import blobs, bulk_import, minio_utils
+from ..core.config import settings
+from ..core.security import create_access_token
+from ..db.database import AsyncSessionLocal, engine
+from ..db.models import ImportJob, Resume, ResumeBlob
+from benchmarks.fakes import FakeMinio
+
+ALICE = b"Alice\nData engineer: Spark, Airflow, dbt.\n"
+BOB = b"Bob\nFrontend engineer: React, TypeScript.\n"
+
+
+def _archive() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("team/alice.txt", ALICE)
+        archive.writestr("team/alice-copy.txt", ALICE)
+        archive.writestr("team/bob.txt", BOB)
+        archive.writestr("team/notes.docx", b"binary")
+        archive.writestr("__MACOSX/team/._alice.txt", b"metadata")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    fake = FakeMinio()
+    monkeypatch.setattr(minio_utils, "get_minio_client", lambda: fake)
+    fake.indexed = []
+
+    async def enqueue_indexing(resume_ids):
+        fake.indexed.extend(resume_ids)
+
+    monkeypatch.setattr(blobs, "enqueue_indexing", enqueue_indexing)
+    monkeypatch.setattr(bulk_import, "enqueue_indexing", enqueue_indexing)
+    return fake
+
+
+async def _job(user_id, source, location):
+    async with engine.begin() as conn:
+        result = await conn.execute(insert(ImportJob).values(user_id=user_id, source=source, location=location))
+    return result.inserted_primary_key[0]
+
+
+@pytest.mark.asyncio
+async def test_zip_import_batches_dedupes_and_reports_errors(db, storage, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "IMPORT_WORKERS", 2)
+    known = await blobs.store_resume(9, io.BytesIO(BOB), "bob.txt")
+    key = bulk_import.archive_key(1, "team.zip")
+    storage.put_object(settings.MINIO_BUCKET, key, io.BytesIO(_archive()), -1)
+    job_id = await _job(1, "zip", key)
+
+    totals = await bulk_import.run_job(job_id)
+
+    assert totals == {"processed": 4, "imported": 3, "deduplicated": 2, "failed": 1}
+    async with AsyncSessionLocal() as session:
+        job = await session.get(ImportJob, job_id)
+        alice = await session.get(ResumeBlob, blobs.digest(io.BytesIO(ALICE))[0])
+        bob = await session.get(ResumeBlob, known.sha256)
+    assert job.status == "completed" and job.finished_at is not None
+    assert json.loads(job.errors) == [{"file": "team/notes.docx", "error": "unsupported file type"}]
+    assert (alice.refcount, alice.extracted_text) == (2, ALICE.decode())
+    assert bob.refcount == 2
+    assert (settings.MINIO_BUCKET, key) not in storage.objects  # archive removed
+    assert (settings.MINIO_BUCKET, alice.s3_key) in storage.objects
+    assert storage.indexed == [known.id, 2, 3, 4]  # the upload, then each imported resume
+
+
+class WorkerDied(BaseException):
+    """Stands in for a killed worker: no except-Exception cleanup runs."""
+
+
+@pytest.mark.asyncio
+async def test_redelivered_import_resumes_after_committed_batches(db, storage, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "IMPORT_WORKERS", 1)
+    key = bulk_import.archive_key(1, "team.zip")
+    storage.put_object(settings.MINIO_BUCKET, key, io.BytesIO(_archive()), -1)
+    job_id = await _job(1, "zip", key)
+    import_batch, calls = bulk_import.import_batch, []
+
+    async def dies_on_second_batch(pool, user_id, batch, record=None):
+        calls.append([e.name for e in batch])
+        if len(calls) == 2:
+            raise WorkerDied()
+        return await import_batch(pool, user_id, batch, record)
+
+    monkeypatch.setattr(bulk_import, "import_batch", dies_on_second_batch)
+    with pytest.raises(WorkerDied):
+        await bulk_import.run_job(job_id)
+    totals = await bulk_import.run_job(job_id)  # the redelivered task
+    again = await bulk_import.run_job(job_id)
+
+    first, second = ["team/alice.txt", "team/alice-copy.txt"], ["team/bob.txt", "team/notes.docx"]
+    assert calls == [first, second, second]  # the committed batch is not imported again
+    assert totals == again == {"processed": 4, "imported": 3, "deduplicated": 1, "failed": 1}
+    async with AsyncSessionLocal() as session:
+        resumes = (await session.execute(select(Resume.filename).order_by(Resume.id))).scalars().all()
+        alice = await session.get(ResumeBlob, blobs.digest(io.BytesIO(ALICE))[0])
+    assert resumes == ["team/alice.txt", "team/alice-copy.txt", "team/bob.txt"]
+    assert alice.refcount == 2
+
+
+@pytest.mark.asyncio
+async def test_objects_are_uploaded_and_sources_read_outside_transactions(db, storage, open_transactions,
+                                                                          monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "IMPORT_WORKERS", 1)
+    key = bulk_import.archive_key(1, "team.zip")
+    storage.put_object(settings.MINIO_BUCKET, key, io.BytesIO(_archive()), -1)
+    uploads, reads = [], []
+    put_blob, iter_zip = bulk_import.put_blob, bulk_import.iter_zip
+
+    def tracked_put(*args):
+        uploads.append(open_transactions[0])
+        return put_blob(*args)
+
+    def tracked_iter(path):
+        for entry in iter_zip(path):
+            reads.append(threading.current_thread() is threading.main_thread())
+            yield entry
+
+    monkeypatch.setattr(bulk_import, "put_blob", tracked_put)
+    monkeypatch.setattr(bulk_import, "iter_zip", tracked_iter)
+    await bulk_import.run_job(await _job(1, "zip", key))
+    assert uploads == [0, 0]  # alice and bob
+    assert reads and not any(reads)
+
+
+def test_batches_are_capped_by_bytes():
+    entries = [bulk_import.Entry(f"{i}.txt", b"x" * 40) for i in range(5)] + [bulk_import.Entry("a.doc", error="no")]
+    sizes = [len(b) for b in bulk_import._batches(entries, size=4, max_bytes=100)]
+    assert sizes == [3, 3]
+
+
+@pytest.mark.asyncio
+async def test_minio_prefix_import(db, storage, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_WORKERS", 1)
+    prefix = bulk_import.user_prefix(1)
+    storage.put_object(settings.MINIO_BUCKET, prefix + "alice.txt", io.BytesIO(ALICE), -1)
+    storage.put_object(settings.MINIO_BUCKET, "imports/2/bob.txt", io.BytesIO(BOB), -1)
+
+    totals = await bulk_import.run_job(await _job(1, "minio", prefix))
+    assert totals["imported"] == 1 and totals["failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_import_endpoints_require_enterprise_and_ownership(db, storage):
+    def auth(user_id):
+        return {"Authorization": f"Bearer {create_access_token({'sub': 'x@example.com', 'user_id': user_id})}"}
+
+    job_id = await _job(1, "zip", "import-archives/1/a.zip")
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        upload = await ac.post("/imports/zip", files={"file": ("a.zip", _archive(), "application/zip")},
+                               headers=auth(1))
+        mine = await ac.get(f"/imports/{job_id}", headers=auth(1))
+        theirs = await ac.get(f"/imports/{job_id}", headers=auth(2))
+
+    assert upload.status_code == 403  # free plan
+    assert mine.json()["status"] == "queued" and mine.json()["errors"] == []
+    assert theirs.status_code == 404
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+from httpx import AsyncClient
+
+from ..main import app
+from ..ai import embeddings
+from ..ai.embeddings import HashingEmbedder, VectorIndex, normalize
+from ..core.config import settings
+from ..core.security import create_access_token
+from ..db import crud
+from ..db.database import AsyncSessionLocal
+from ..db.models import Resume
+
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_INDEX_DIR", str(tmp_path))
+    embeddings._indexes.clear()
+    yield tmp_path
+    embeddings._indexes.clear()
+
+
+def test_hashing_embedder_is_deterministic_and_semantic_enough():
+    embedder = HashingEmbedder(256)
+    a, b, c = embedder.embed([
+        "Senior Python engineer, Django and PostgreSQL",
+        "Python backend engineer with Django, PostgreSQL",
+        "Registered nurse, intensive care unit",
+    ])
+    assert np.allclose(a, HashingEmbedder(256).embed(["Senior Python engineer, Django and PostgreSQL"])[0])
+    assert a.dtype == np.float32 and abs(float(np.linalg.norm(a)) - 1) < 1e-5
+    assert a @ b > a @ c
+
+
+def test_index_persists_upserts_and_ann_matches_exact(tmp_path):
+    rng = np.random.default_rng(0)
+    centers = normalize(rng.standard_normal((20, 32), dtype=np.float32))
+    data = normalize(centers[rng.integers(0, 20, 3000)] + 0.2 * rng.standard_normal((3000, 32), dtype=np.float32))
+
+    index = VectorIndex(str(tmp_path / "ns"), 32, ann_threshold=1000, nprobe=6)
+    index.upsert(list(range(3000)), data)  # grows past the initial capacity
+    index.upsert([5], data[7:8])  # overwrite in place
+    assert len(index) == 3000
+
+    reopened = VectorIndex(str(tmp_path / "ns"), 32, ann_threshold=1000, nprobe=6)
+    assert np.allclose(reopened.vector(5), data[7])
+    hits = 0
+    for q in data[:50]:
+        exact = {i for i, _ in reopened.search(q, 10, exact=True)}
+        hits += len(exact & {i for i, _ in reopened.search(q, 10)})
+    assert hits / 500 > 0.9
+
+
+def test_writers_in_separate_processes_do_not_overwrite_each_other(tmp_path):
+    # two handles on one directory stand in for an API worker and the indexing task
+    data = normalize(np.random.default_rng(1).standard_normal((4, 16), dtype=np.float32))
+    api = VectorIndex(str(tmp_path / "ns"), 16)
+    task = VectorIndex(str(tmp_path / "ns"), 16)
+    api.upsert([1], data[0:1])
+    task.upsert([2], data[1:2])  # would reuse row 0 without catching up first
+    api.upsert([3, 2], data[2:4])
+    assert len(api) == 3
+
+    reopened = VectorIndex(str(tmp_path / "ns"), 16)
+    assert len(reopened) == 3
+    assert [np.allclose(reopened.vector(i), v) for i, v in ((1, data[0]), (2, data[3]), (3, data[2]))] == [True] * 3
+
+
+def test_removed_items_are_not_returned(tmp_path):
+    data = normalize(np.random.default_rng(2).standard_normal((3, 16), dtype=np.float32))
+    index = VectorIndex(str(tmp_path / "ns"), 16)
+    other = VectorIndex(str(tmp_path / "ns"), 16)  # a process that indexed before the removal
+    index.upsert([1, 2, 3], data)
+    other.refresh()
+    index.remove([2])
+    assert sorted(i for i, _ in other.search(data[1], 3)) == [1, 3]
+    assert other.vector(2) is None and len(other) == 3
+
+
+@pytest.mark.asyncio
+async def test_job_matching_and_similar_resumes(db):
+    admin = await crud.create_user(email="admin@example.com", password="pw")
+    candidate = await crud.create_user(email="candidate@example.com", password="pw")
+    async with AsyncSessionLocal() as session:
+        (await session.get(type(admin), admin.id)).is_admin = True
+        session.add_all([
+            Resume(id=1, user_id=admin.id, s3_key="a", extracted_text="Python Django PostgreSQL backend developer"),
+            Resume(id=2, user_id=admin.id, s3_key="b", extracted_text="Django and Python web developer, PostgreSQL"),
+            Resume(id=3, user_id=admin.id, s3_key="c", extracted_text="Pastry chef, bakery and desserts"),
+        ])
+        await session.commit()
+    embeddings.index_texts("resumes", {2: "Django and Python web developer, PostgreSQL", 3: "Pastry chef, bakery and desserts"})
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.email, 'user_id': admin.id})}"}
+    jobs = [
+        {"id": 10, "text": "Hiring a pastry chef for our bakery"},
+        {"id": 11, "text": "Backend developer: Python, Django, PostgreSQL"},
+    ]
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        assert (await ac.post("/job/index", json=jobs, headers=headers)).json() == {"indexed": 2}
+        match = await ac.post("/job/match", json={"resume_id": 1, "k": 1}, headers=headers)
+        similar = await ac.get("/resume/1/similar", params={"k": 2}, headers=headers)
+        missing = await ac.get("/resume/99/similar", headers=headers)
+        token = create_access_token({"sub": candidate.email, "user_id": candidate.id})
+        forbidden = await ac.get("/resume/1/similar", headers={"Authorization": f"Bearer {token}"})
+        async with AsyncSessionLocal() as session:
+            await session.delete(await session.get(Resume, 3))  # deleted, not yet dropped from the index
+            await session.commit()
+        after_delete = await ac.get("/resume/1/similar", params={"k": 2}, headers=headers)
+    assert [m["id"] for m in match.json()] == [11]
+    assert [s["id"] for s in similar.json()] == [2, 3]
+    assert missing.status_code == 404 and forbidden.status_code == 403
+    assert [s["id"] for s in after_delete.json()] == [2]
@@ -0,0 +1,128 @@
+import json
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from ..main import app
+from ..api.deps import QuotaCharge
+from ..ai.ai_client import ai_client
+from ..ai.template_cache import template_catalog
+from ..billing import webhooks
+from ..billing.entitlements import entitlements
+from ..core.security import create_access_token
+from ..db import crud
+from ..db.database import AsyncSessionLocal
+from ..db.models import Subscription, Template
+
+
+@pytest.fixture(autouse=True)
+def fresh_entitlements():
+    entitlements._local.clear()
+    entitlements._counters.clear()
+
+
+async def _user_and_token(email="dana@example.com"):
+    user = await crud.create_user(email=email, password="pw")
+    return user, {"Authorization": f"Bearer {create_access_token({'sub': email, 'user_id': user.id})}"}
+
+
+async def _apply(event_type, obj, event_id, created):
+    event = {"id": event_id, "type": event_type, "created": created, "data": {"object": obj}}
+    await webhooks.record_event(event, json.dumps(event).encode())
+    await webhooks.process_pending_events(obj.get("customer"))
+
+
+async def _basic_plan(user):
+    async with AsyncSessionLocal() as session:
+        session.add(Subscription(user_id=user.id, plan="basic", status="active"))
+        session.add(Template(name="Cover Letter", description="d", type="cover_letter", prompt="Write."))
+        await session.commit()
+    template_catalog.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_plan_quota_is_enforced(db):
+    user, headers = await _user_and_token()
+    await _basic_plan(user)
+    body = {"template_type": "cover_letter", "resume_content": "r"}
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        statuses = [(await ac.post("/templates/templates/generate", json=body, headers=headers)).status_code
+                    for _ in range(6)]
+        sub = (await ac.get("/user/subscription", headers=headers)).json()
+        anonymous = await ac.post("/templates/templates/generate", json=body)
+    assert statuses == [200] * 5 + [402]
+    assert sub["subscription"] == "basic" and sub["credits"] == 0
+    assert anonymous.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_failed_requests_are_not_charged(db, monkeypatch):
+    user, headers = await _user_and_token()
+    await _basic_plan(user)
+
+    async def call(prompt, max_tokens=512, system=None, prompt_id="adhoc"):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(ai_client, "call", call)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        missing = await ac.post("/templates/templates/generate", headers=headers,
+                                json={"template_type": "nope", "resume_content": "r"})
+        with pytest.raises(RuntimeError):
+            await ac.post("/templates/templates/generate", headers=headers,
+                          json={"template_type": "cover_letter", "resume_content": "r"})
+    assert missing.status_code == 404
+    assert await entitlements.usage(user.id, "resumes") == 0
+
+    async def failing_stream():
+        yield {"text": "partial"}
+        raise RuntimeError("provider down")
+
+    charge = QuotaCharge(user.id, "resumes", 1)
+    await charge.spend()
+    with pytest.raises(RuntimeError):
+        async for _ in charge.guard(failing_stream()):
+            pass
+    assert await entitlements.usage(user.id, "resumes") == 0
+
+
+@pytest.mark.asyncio
+async def test_free_plan_is_unlimited_by_default(db):
+    user, _ = await _user_and_token()
+    assert (await entitlements.get(user.id)).limit("resumes") is None
+
+
+@pytest.mark.asyncio
+async def test_webhook_events_drive_entitlements(db):
+    user, headers = await _user_and_token()
+    assert (await entitlements.get(user.id)).plan == "free"
+
+    await _apply("checkout.session.completed", {
+        "id": "cs_1", "customer": "cus_9", "subscription": "sub_9",
+        "customer_email": user.email, "metadata": {"plan_type": "pro"},
+    }, "evt_1", 1)
+    ent = await entitlements.get(user.id)
+    assert ent.plan == "pro" and ent.limit("resumes") is None
+
+    await _apply("customer.subscription.updated", {
+        "id": "sub_9", "customer": "cus_9", "status": "active",
+        "current_period_start": 1_900_000_000, "current_period_end": 1_902_592_000,
+        "items": {"data": [{"price": {"lookup_key": "basic_990_usd_month"}}]},
+    }, "evt_2", 2)
+    ent = await entitlements.get(user.id)
+    assert ent.plan == "basic" and int(ent.period_end.timestamp()) == 1_902_592_000
+
+    await _apply("customer.subscription.deleted", {"id": "sub_9", "customer": "cus_9", "status": "canceled"}, "evt_3", 3)
+    assert (await entitlements.get(user.id)).plan == "free"
+
+
+@pytest.mark.asyncio
+async def test_cached_quota_check_is_sub_millisecond(db):
+    user, _ = await _user_and_token()
+    await _basic_plan(user)
+    await entitlements.get(user.id)  # warm the local tier
+    n = 2000
+    start = time.perf_counter()
+    results = [await entitlements.consume(user.id, "resumes") for _ in range(n)]
+    assert (time.perf_counter() - start) / n < 0.0002
+    assert sum(r.allowed for r in results) == 5
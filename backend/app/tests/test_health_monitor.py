@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from ..main import app
+from ..api import health as health_api
+from ..core.health import HealthMonitor, check_database
+
+
+def _monitor(interval=60.0, timeout=0.2, **checks):
+    monitor = HealthMonitor(interval=interval, timeout=timeout)
+    monitor.checks = checks
+    return monitor
+
+
+def _counting(calls, name, delay=0.0, error=None):
+    async def check():
+        calls[name] = calls.get(name, 0) + 1
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+    return check
+
+
+@pytest.mark.asyncio
+async def test_probes_share_one_cached_run():
+    calls = {}
+    monitor = _monitor(database=_counting(calls, "database", 0.05), minio=_counting(calls, "minio", 0.05))
+
+    results = await asyncio.gather(*(monitor.status() for _ in range(10)))
+    await monitor.status()
+
+    assert calls == {"database": 1, "minio": 1}
+    assert all(r["ready"] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_checks_run_concurrently_with_timeouts():
+    calls = {}
+    monitor = _monitor(
+        timeout=0.2,
+        database=_counting(calls, "database", 5.0),
+        minio=_counting(calls, "minio", 0.1),
+    )
+    start = time.perf_counter()
+    result = await monitor.status()
+
+    assert time.perf_counter() - start < 0.5
+    assert result["ready"] is False
+    assert result["checks"]["minio"]["ok"] is True
+    assert "timed out" in result["checks"]["database"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_stale_result_is_refreshed():
+    calls = {}
+    monitor = _monitor(interval=0.01, database=_counting(calls, "database"), minio=_counting(calls, "minio"))
+    await monitor.status()
+    await asyncio.sleep(0.05)
+    await monitor.status()
+    assert calls["database"] == 2
+
+
+@pytest.mark.asyncio
+async def test_database_check_uses_the_pooled_engine(db):
+    await check_database()
+
+
+@pytest.mark.asyncio
+async def test_ready_endpoint_serves_cached_status(monkeypatch):
+    calls = {}
+    monitor = _monitor(database=_counting(calls, "database"), minio=_counting(calls, "minio", error=OSError("down")))
+    monkeypatch.setattr(health_api, "health_monitor", monitor)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        not_ready = await ac.get("/health/ready")
+        detailed = await ac.get("/health/detailed")
+        monitor.checks["minio"] = _counting(calls, "minio")
+        await monitor.refresh()
+        ready = await ac.get("/health/ready")
+
+    assert not_ready.status_code == 503
+    assert detailed.json()["checks"]["minio"] == {"ok": False, "error": "down", "latency_ms": pytest.approx(0, abs=50)}
+    assert ready.status_code == 200 and ready.json()["minio"] is True
+    assert calls == {"database": 2, "minio": 2}
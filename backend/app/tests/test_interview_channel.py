@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from ..main import app
+from ..ai import interviewer
+from ..core import fanout
+from ..core.fanout import Fanout
+from ..core.security import create_access_token
+from ..db.database import engine
+from ..db.models import InterviewSession
+
+
+def _token(user_id):
+    return create_access_token({"sub": "x@example.com", "user_id": user_id})
+
+
+@pytest.mark.asyncio
+async def test_fanout_delivers_in_order_and_cuts_off_slow_subscribers(monkeypatch):
+    monkeypatch.setattr(fanout, "QUEUE_SIZE", 3)
+    hub = Fanout("test")
+    async with hub.subscribe("a") as fast, hub.subscribe("a") as slow, hub.subscribe("b") as other:
+        for i in range(2):
+            await hub.publish("a", {"n": i})
+        assert [await fast.__anext__() for _ in range(2)] == [{"n": 0}, {"n": 1}]
+        for i in range(2, 5):
+            await hub.publish("a", {"n": i})
+        assert [await fast.__anext__() for _ in range(3)] == [{"n": 2}, {"n": 3}, {"n": 4}]
+        assert slow.overflowed and [e async for e in slow] == []
+        assert other._queue.empty()
+    assert hub._subscribers == {}
+
+
+def test_parse_score():
+    assert interviewer.parse_score('{"score": 82, "feedback": "Clear."}') == 82.0
+    assert interviewer.parse_score("Score: 140/100") == 100.0
+    assert interviewer.parse_score("no number here") is None
+
+
+@pytest.mark.asyncio
+async def test_websocket_pushes_questions_and_streamed_evaluation(db, monkeypatch):
+    async def stream(prompt, max_tokens=512, system=None, prompt_id="adhoc"):
+        assert prompt_id == "eval_v1" and "profile first" in prompt
+        for text in ('{"score": 7', '5, "feedback": ', '"Good."}'):
+            yield {"text": text}
+        yield {"usage": {"total_tokens": 10}}
+
+    monkeypatch.setattr(interviewer.ai_client, "stream", stream)
+    session_id = await interviewer.create_session("Backend Engineer", "medium", user_id=1)
+
+    def converse():
+        with TestClient(app) as client:
+            with client.websocket_connect(f"/interview/session/{session_id}/ws?token={_token(1)}") as ws:
+                ws.send_json({"type": "answer", "question_id": "q0", "answer": "too early"})
+                unasked = ws.receive_json()
+                ws.send_json({"type": "next_question"})
+                question = ws.receive_json()
+                ws.send_json({"type": "answer", "question_id": "q999999", "answer": "made up"})
+                made_up = ws.receive_json()
+                ws.send_json({"type": "answer", "question_id": question["question"]["id"],
+                              "answer": "I would profile first."})
+                events = [ws.receive_json() for _ in range(5)]
+                ws.send_json({"type": "dance"})
+                return question, events, ws.receive_json(), [unasked, made_up]
+
+    question, events, error, rejected = await asyncio.to_thread(converse)
+    assert rejected == [{"type": "error", "detail": "question_id was not asked"}] * 2
+    assert question == {"type": "question", "question": {
+        "id": "q0", "text": "Sample question for role Backend Engineer (difficulty medium)"}}
+    assert [e["type"] for e in events] == ["evaluation.started"] + ["feedback.delta"] * 3 + ["evaluation.completed"]
+    assert events[-1] == {"type": "evaluation.completed", "question_id": "q0", "score": 75.0,
+                          "feedback": '{"score": 75, "feedback": "Good."}'}
+    assert error["type"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_websocket_rejects_other_users(db):
+    session_id = await interviewer.create_session("Backend Engineer", "medium", user_id=1)
+
+    def connect(token):
+        with TestClient(app) as client:
+            with client.websocket_connect(f"/interview/session/{session_id}/ws?token={token}") as ws:
+                ws.receive_json()
+
+    for token in (_token(2), "garbage"):
+        with pytest.raises(WebSocketDisconnect) as closed:
+            await asyncio.to_thread(connect, token)
+        assert closed.value.code == 1008
+
+
+@pytest.mark.asyncio
+async def test_next_question_of_a_deleted_session_is_an_error(db):
+    session_id = await interviewer.create_session("Backend Engineer", "medium", user_id=1)
+
+    def ask(delete):
+        with TestClient(app) as client:
+            with client.websocket_connect(f"/interview/session/{session_id}/ws?token={_token(1)}") as ws:
+                delete()
+                ws.send_json({"type": "next_question"})
+                return ws.receive_json()
+
+    async def delete_session():
+        async with engine.begin() as conn:
+            await conn.execute(delete(InterviewSession).where(InterviewSession.id == session_id))
+
+    loop = asyncio.get_running_loop()
+    reply = await asyncio.to_thread(ask, lambda: asyncio.run_coroutine_threadsafe(delete_session(), loop).result())
+    assert reply == {"type": "error", "detail": "session not found"}
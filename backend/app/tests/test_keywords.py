@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from ..ai import keywords
+from ..ai.ai_client import ai_client
+from ..ai.resilience import LLMUnavailable
+from ..ai.keywords import Scratch, TermVector, Vocabulary, extract_keywords, keyword_match
+
+JOB = ("Senior Python engineer. Python, PostgreSQL and Kubernetes required; Kubernetes operators a plus. "
+       "You will own our Python services, PostgreSQL tuning and on-call.")
+RESUME = "Backend engineer: eight years of Python and PostgreSQL, Django, Celery, Redis."
+
+
+def test_extract_keywords_keeps_first_distinct_long_words_in_order():
+    text = "Build the data platform. Build pipelines, own the platform, and ship, ship, ship " * 100
+    reference = list(dict.fromkeys([w.strip(".,") for w in text.split() if len(w) > 3][:50]))
+    assert extract_keywords(text) == reference == ["Build", "data", "platform", "pipelines", "ship"]
+    assert extract_keywords(text, limit=2) == ["Build", "data"]
+
+
+def test_extract_keywords_leaves_the_shared_vocabulary_alone(monkeypatch):
+    monkeypatch.setattr(keywords, "vocabulary", Vocabulary(max_terms=100))
+    extract_keywords("Arbitrary Posting-Text with UPPERCASE tokens")
+    assert len(keywords.vocabulary) == 0
+
+
+def test_vocabulary_is_capped_and_overflow_ids_stay_per_call():
+    vocabulary = Vocabulary(max_terms=2)
+    scratch = Scratch(vocabulary)
+    ids = [vocabulary.id(t, scratch) for t in ("python", "sql", "rust", "go", "rust")]
+    assert ids == [0, 1, 2, 3, 2] and len(vocabulary) == 2
+    assert [vocabulary.term(i, scratch) for i in ids[2:4]] == ["rust", "go"]
+    assert vocabulary.id("rust", Scratch(vocabulary)) == 2  # a new call starts its own ids
+
+
+def test_term_vector_is_sorted_sparse_log_tf(monkeypatch):
+    monkeypatch.setattr(keywords, "vocabulary", Vocabulary(max_terms=100))
+    vector = TermVector.from_text("Kubernetes and the kubernetes operators", Scratch(keywords.vocabulary))
+    assert list(vector.ids) == [0, 1] and vector.ids.typecode == "I"
+    assert [round(w, 3) for w in vector.weights] == [1.693, 1.0]
+    assert 1 in vector and 2 not in vector
+
+
+def test_keyword_match():
+    match = keyword_match(RESUME, JOB)
+    assert match.matched[:2] == ["python", "postgresql"]
+    assert "kubernetes" in match.missing and "django" not in match.missing
+    assert 0 < match.score < 100
+    assert not hasattr(match, "__dict__")
+
+
+@pytest.mark.asyncio
+async def test_ats_score_falls_back_to_keyword_match(monkeypatch):
+    async def call(prompt, max_tokens=512, system=None, prompt_id="adhoc"):
+        raise LLMUnavailable("circuit open")
+
+    monkeypatch.setattr(ai_client, "call", call)
+    result = await ai_client.ats_score(RESUME, JOB)
+    assert json.loads(result["text"]) == {**keyword_match(RESUME, JOB).as_dict(), "suggested_bullets": []}
+    assert result["degraded"] is True and result["provider"] == "keywords"
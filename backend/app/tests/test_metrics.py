@@ -0,0 +1,28 @@
+import pytest
+from httpx import AsyncClient
+
+from ..main import app
+from ..ai.ai_client import ai_client
+
+
+def _sample(text: str, prefix: str) -> float:
+    line = next(l for l in text.splitlines() if l.startswith(prefix))
+    return float(line.rsplit(" ", 1)[1])
+
+
+@pytest.mark.asyncio
+async def test_metrics_expose_routes_llm_and_failover_state():
+    await ai_client.call("Score this resume", prompt_id="ats_v1")
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        for _ in range(3):
+            await ac.get("/health/live")
+        await ac.get("/no/such/route")
+        r = await ac.get("/metrics")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert _sample(body, 'http_request_duration_seconds_count{method="GET",route="/health/live",status="200"}') >= 3
+    assert 'route="unmatched",status="404"' in body
+    assert _sample(body, 'llm_tokens_total{kind="prompt",prompt_id="ats_v1"}') > 0
+    assert 'llm_request_duration_seconds_count{prompt_id="ats_v1",provider="openai"}' in body
+    assert 'llm_decisions_total{decision="calls",provider="openai"}' in body
+    assert "http_requests_in_flight" in body
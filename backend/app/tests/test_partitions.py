@@ -0,0 +1,51 @@
+import gzip
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from ..core import minio_utils
+from ..core.config import settings
+from ..db import partitions
+from ..db.database import engine
+from benchmarks.fakes import FakeMinio
+
+
+def test_month_arithmetic_and_names():
+    assert partitions.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert partitions.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    name = partitions.partition_name("usage_events", date(2026, 3, 1))
+    assert name == "usage_events_p202603"
+    assert partitions.partition_month("usage_events", name) == date(2026, 3, 1)
+    assert partitions.partition_month("usage_events", "usage_events_default") is None
+    assert partitions.partition_month("usage_events", "payment_records_p202603") is None
+    assert "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in \
+        partitions.create_partition_sql("usage_events", date(2026, 12, 1))
+
+
+@pytest.mark.asyncio
+async def test_maintenance_is_a_no_op_without_postgres(db):
+    assert await partitions.maintain_partitions() == {"ensured": 0, "archived": []}
+
+
+@pytest.mark.asyncio
+async def test_detached_partition_is_archived_then_dropped(db, monkeypatch):
+    fake = FakeMinio()
+    monkeypatch.setattr(minio_utils, "get_minio_client", lambda: fake)
+    created = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE usage_events_p202601 (id TEXT, created_at TIMESTAMP, feature TEXT)"))
+        for i in range(3):
+            await conn.execute(text("INSERT INTO usage_events_p202601 VALUES (:id, :created_at, 'ats')"),
+                               {"id": f"e{i}", "created_at": created})
+
+    count = await partitions.archive_partition("usage_events", "usage_events_p202601", date(2026, 1, 1), attached=False)
+
+    data, _ = fake.objects[(settings.MINIO_BUCKET, "archive/usage_events/2026/01.ndjson.gz")]
+    rows = [json.loads(line) for line in gzip.decompress(data).splitlines()]
+    assert count == 3 and [r["id"] for r in rows] == ["e0", "e1", "e2"]
+    assert rows[0]["feature"] == "ats"
+    async with engine.connect() as conn:
+        left = (await conn.execute(text("SELECT name FROM sqlite_master WHERE name = 'usage_events_p202601'"))).all()
+    assert left == []
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from ..core import profiling
+from ..core.profiling import ProfilerBusy, RequestProfilerMiddleware
+
+
+def _spin_in_profiled_code(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+@pytest.mark.asyncio
+async def test_cpu_profile_collapses_busy_thread_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin_in_profiled_code, args=(stop,), name="busy")
+    worker.start()
+    try:
+        stacks, samples = await profiling.cpu_profile(0.2, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert samples > 5
+    busy = [line for line in stacks.splitlines() if line.startswith("busy;")]
+    assert busy and any("_spin_in_profiled_code" in line for line in busy)
+    stack, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+
+@pytest.mark.asyncio
+async def test_only_one_profile_at_a_time():
+    running = asyncio.ensure_future(profiling.cpu_profile(0.1))
+    await asyncio.sleep(0.01)
+    with pytest.raises(ProfilerBusy):
+        await profiling.allocation_profile(0.01)
+    await running
+    await profiling.cpu_profile(0.01)  # lock released afterwards
+
+
+@pytest.mark.asyncio
+async def test_allocation_profile_reports_growth():
+    kept = []
+
+    async def allocate():
+        await asyncio.sleep(0.02)
+        kept.extend(bytearray(10_000) for _ in range(100))
+
+    task = asyncio.ensure_future(allocate())
+    report = await profiling.allocation_profile(0.1, top=5)
+    await task
+
+    assert report["total_growth_bytes"] >= 1_000_000
+    assert len(report["top"]) <= 5
+    assert any("test_profiling.py" in entry["location"] for entry in report["top"])
+    assert "test_profiling.py" in report["collapsed"]
+
+
+def _app() -> Starlette:
+    async def slow(request):
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return PlainTextResponse("ok")
+
+    return RequestProfilerMiddleware(Starlette(routes=[Route("/slow", slow)]), token="secret")
+
+
+@pytest.mark.asyncio
+async def test_request_profile_only_with_matching_token():
+    async with AsyncClient(app=_app(), base_url="http://test") as client:
+        plain = await client.get("/slow")
+        wrong = await client.get("/slow", headers={"X-Profile": "nope"})
+        profiled = await client.get("/slow", headers={"X-Profile": "secret"})
+
+    assert "x-profile-id" not in plain.headers and "x-profile-id" not in wrong.headers
+    stacks, info = profiling.recent_profile(profiled.headers["x-profile-id"])
+    assert info["path"] == "/slow" and info["samples"] > 0
+    assert "slow (test_profiling.py" in stacks
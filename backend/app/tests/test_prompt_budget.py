@@ -0,0 +1,55 @@
+import pytest
+
+from ..ai import prompt_budget
+from ..ai.ai_client import ai_client
+from ..ai.prompt_budget import assemble, count_tokens, fit_fields, strip_boilerplate
+from ..ai.prompts import PROMPTS
+
+JOB_POST = """Senior Backend Engineer
+
+Requirements: Python, FastAPI, PostgreSQL, Redis and Celery experience.
+
+Requirements: Python, FastAPI, PostgreSQL, Redis and Celery experience.
+
+Benefits
+Unlimited PTO, gym stipend, catered lunches and a generous 401k match.
+
+Acme is an equal opportunity employer. All qualified applicants will receive consideration without regard to race, color, religion or sex."""
+
+
+def test_strip_boilerplate_removes_eeo_benefits_and_duplicates():
+    cleaned = strip_boilerplate(JOB_POST)
+    assert cleaned.count("Requirements:") == 1
+    assert "PTO" not in cleaned and "equal opportunity" not in cleaned
+    assert cleaned.startswith("Senior Backend Engineer")
+
+
+def test_fit_fields_keeps_short_fields_and_relevant_paragraphs():
+    filler = "\n\n".join(f"Hobby paragraph {i}: sailing, chess, baking and travel photography." for i in range(200))
+    resume = "Backend engineer.\n\n" + filler + "\n\nBuilt FastAPI services on PostgreSQL with Celery and Redis."
+    fitted = fit_fields({"job": JOB_POST, "resume": resume}, budget=120)
+    assert fitted["job"] == strip_boilerplate(JOB_POST)
+    assert sum(count_tokens(v) for v in fitted.values()) <= 120
+    assert "Built FastAPI services on PostgreSQL" in fitted["resume"]
+
+
+def test_assemble_respects_template_budget(monkeypatch):
+    monkeypatch.setitem(PROMPTS, "ats_v1", {**PROMPTS["ats_v1"], "max_input_tokens": 300})
+    huge = "Led migrations of legacy systems. " * 2000
+    prompt = assemble("ats_v1", job=JOB_POST, resume=huge)
+    assert prompt.input_tokens <= 300
+    assert "Requirements:" in prompt.text
+
+
+def test_truncate_tokens_is_prefix():
+    text = "alpha beta gamma delta epsilon"
+    cut = prompt_budget.truncate_tokens(text, 3)
+    assert text.startswith(cut) and count_tokens(cut) == 3
+
+
+@pytest.mark.asyncio
+async def test_call_reports_counted_usage():
+    result = await ai_client.call("Rewrite this resume", system="You are a writer.")
+    usage = result["usage"]
+    assert usage["prompt_tokens"] == count_tokens("Rewrite this resume") + count_tokens("You are a writer.")
+    assert usage["total_tokens"] == usage["prompt_tokens"] + count_tokens(result["text"])
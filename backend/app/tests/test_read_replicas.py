@@ -0,0 +1,85 @@
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from ..core.security import create_access_token
+from ..db import routing
+from ..db.routing import ReadYourWritesMiddleware, ReplicaRouter, current_caller
+
+
+@pytest_asyncio.fixture
+async def router(tmp_path):
+    engines = []
+    for name in ("primary", "replica1", "replica2"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE node (name TEXT)"))
+            await conn.execute(text("INSERT INTO node VALUES (:name)"), {"name": name})
+        engines.append(engine)
+    yield ReplicaRouter(engines[0], engines[1:], sticky_seconds=60, retry_seconds=60)
+    for engine in engines:
+        await engine.dispose()
+
+
+async def _node(router, **kwargs):
+    async with router.connect(**kwargs) as conn:
+        return (await conn.execute(text("SELECT name FROM node"))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_reads_round_robin_over_replicas(router):
+    assert [await _node(router) for _ in range(4)] == ["replica1", "replica2", "replica1", "replica2"]
+    assert await _node(router, primary=True) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_is_skipped(router, tmp_path):
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router.replicas = [broken, router.replicas[1]]
+    assert {await _node(router) for _ in range(3)} == {"replica2"}
+    assert router._available() == [router.replicas[1]]
+
+    router.replicas = [broken]
+    router._down_until.clear()
+    assert await _node(router) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_reads_after_own_write_go_to_primary(router):
+    await router.note_write("user:1")
+    token = current_caller.set("user:1")
+    try:
+        assert await _node(router) == "primary"
+    finally:
+        current_caller.reset(token)
+    assert await _node(router) == "replica1"  # other callers still use replicas
+
+
+@pytest.mark.asyncio
+async def test_middleware_marks_successful_writes(router, monkeypatch):
+    monkeypatch.setattr(routing, "replica_router", router)
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/ok")
+    async def ok():
+        return {}
+
+    @app.post("/fail", status_code=400)
+    async def fail():
+        return {}
+
+    def auth(user_id):
+        return {"Authorization": f"Bearer {create_access_token({'sub': 'x@example.com', 'user_id': user_id})}"}
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        await ac.post("/ok", headers=auth(1))
+        await ac.post("/fail", headers=auth(2))
+        await ac.post("/ok")
+
+    assert await router.is_sticky("user:1")
+    assert not await router.is_sticky("user:2")
+    assert list(router._wrote) == ["user:1"]
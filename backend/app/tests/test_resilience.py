@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from ..ai.fake_provider import FakeProvider
+from ..ai.resilience import CircuitBreaker, LLMUnavailable, ResilientLLM
+
+
+async def local(prompt, max_tokens, system):
+    return {"text": "local", "usage": {}}
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _llm(provider, breaker=None, **kwargs):
+    options = dict(hedge_min_delay=0.02, hedge_max_delay=0.05, max_hedge_ratio=1.0, timeout=2.0)
+    options.update(kwargs)
+    return ResilientLLM("fake", provider, local, breaker=breaker or CircuitBreaker(min_calls=5), **options)
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_over_slow_attempt_and_cancels_it():
+    latencies = iter([1.0, 0.01])
+    provider = FakeProvider()
+
+    async def scripted(prompt, max_tokens, system):
+        provider.latency = next(latencies)
+        return await provider(prompt, max_tokens, system)
+
+    llm = _llm(scripted)
+    start = time.monotonic()
+    result = await llm.call("hi")
+    assert time.monotonic() - start < 0.5
+    assert result["provider"] == "fake" and result["text"] == "(fake) response for prompt"
+    assert llm.counts["hedges"] == 1 and llm.counts["hedge_wins"] == 1
+    await asyncio.sleep(0)
+    assert provider.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_hedging_bounds_tail_latency_under_injected_slowness():
+    provider = FakeProvider(latency=0.01, jitter=0.005, slow_rate=0.1, slow_latency=1.0, seed=7)
+    llm = _llm(provider)
+
+    async def timed():
+        start = time.monotonic()
+        await llm.call("hi")
+        return time.monotonic() - start
+
+    latencies = await asyncio.gather(*(timed() for _ in range(40)))
+    assert llm.counts["hedges"] > 0
+    # ~10% of attempts take 1s; only calls whose hedge was slow too still do
+    p90 = sorted(latencies)[int(0.9 * len(latencies))]
+    assert p90 < 0.5
+
+
+@pytest.mark.asyncio
+async def test_breaker_trips_on_errors_then_recovers_through_probe():
+    clock = ManualClock()
+    provider = FakeProvider(latency=0, error_rate=1.0)
+    llm = _llm(provider, CircuitBreaker(min_calls=5, cooldown=30, clock=clock), hedge=False)
+
+    results = [await llm.call("hi") for _ in range(8)]
+    assert all(r["provider"] == "local" for r in results)
+    assert llm.breaker.state == CircuitBreaker.OPEN and provider.calls == 5
+    assert llm.counts["short_circuits"] == 3
+
+    clock.now = 31
+    provider.error_rate = 0.0
+    assert (await llm.call("hi"))["provider"] == "fake"
+    assert llm.breaker.state == CircuitBreaker.CLOSED
+    assert llm.stats()["breaker_trips"] == 1
+
+
+@pytest.mark.asyncio
+async def test_breaker_trips_on_latency_slo_and_timeout_falls_back():
+    provider = FakeProvider(latency=0.03)
+    llm = _llm(provider, CircuitBreaker(min_calls=3, slow_seconds=0.01), hedge=False)
+    for _ in range(3):
+        assert (await llm.call("hi"))["provider"] == "fake"
+    assert llm.breaker.state == CircuitBreaker.OPEN
+
+    stuck = _llm(FakeProvider(latency=5.0), hedge=False, timeout=0.05)
+    assert (await stuck.call("hi"))["provider"] == "local"
+    assert stuck.counts["timeouts"] == 1 and stuck.counts["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_without_a_fallback_an_unavailable_provider_raises(monkeypatch):
+    from httpx import AsyncClient
+
+    from ..ai.ai_client import ai_client
+    from ..main import app
+
+    async def failing(prompt, max_tokens, system):
+        raise RuntimeError("provider down")
+
+    llm = ResilientLLM("fake", failing, breaker=CircuitBreaker(min_calls=1), hedge=False)
+    with pytest.raises(LLMUnavailable):
+        await llm.call("hi")  # fails and trips the breaker
+    with pytest.raises(LLMUnavailable):
+        await llm.call("hi")  # short-circuited
+    assert llm.counts["unavailable"] == 2 and llm.counts["fallbacks"] == 0
+
+    monkeypatch.setattr(ai_client, "resilience", llm)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        r = await ac.post("/interview/evaluate", json={"transcript": "t"})
+    assert r.status_code == 503 and r.headers["retry-after"]
@@ -0,0 +1,73 @@
+import pytest
+from httpx import AsyncClient
+
+from ..main import app
+from ..core import search
+from ..core.security import create_access_token
+from ..db.database import AsyncSessionLocal
+from ..db.models import Resume, User
+
+
+async def _seed():
+    async with AsyncSessionLocal() as session:
+        session.add_all([
+            User(id=1, email="recruiter@example.com", hashed_password="x", is_recruiter=True),
+            User(id=2, email="candidate@example.com", hashed_password="x"),
+        ])
+        for i in range(7):
+            body = "Python engineer. " * (i + 1) + ("Kubernetes operator." if i % 2 else "Java services.")
+            session.add(Resume(user_id=2, s3_key=f"r{i}", filename=f"r{i}.pdf", extracted_text=body))
+        session.add(Resume(user_id=2, s3_key="other", extracted_text="Product designer"))
+        await session.commit()
+
+
+def _auth(user_id):
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'x@example.com', 'user_id': user_id})}"}
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_all_matches_in_rank_order(db):
+    await _seed()
+    seen, cursor = [], None
+    while True:
+        hits, cursor = await search.search_resumes("python", limit=3, cursor=cursor)
+        seen.extend(hits)
+        if cursor is None:
+            break
+
+    assert len(seen) == len({h.id for h in seen}) == 7
+    assert [h.rank for h in seen] == sorted((h.rank for h in seen), reverse=True)
+    assert "<mark>Python</mark>" in seen[0].highlight
+
+
+@pytest.mark.asyncio
+async def test_skill_filter_and_cursor_validation(db):
+    await _seed()
+    hits, cursor = await search.search_resumes("python", skills=["kubernetes"], limit=10)
+    assert len(hits) == 3 and cursor is None
+    with pytest.raises(ValueError):
+        search.decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_is_for_recruiters(db):
+    await _seed()
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        denied = await ac.get("/search/resumes", params={"q": "python"}, headers=_auth(2))
+        page = await ac.get("/search/resumes", params={"q": "python", "limit": 5}, headers=_auth(1))
+        bad = await ac.get("/search/resumes", params={"q": "python", "cursor": "zz"}, headers=_auth(1))
+
+    assert denied.status_code == 403
+    assert len(page.json()["items"]) == 5 and page.json()["next_cursor"]
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_highlight_escapes_resume_markup(db):
+    async with AsyncSessionLocal() as session:
+        session.add(Resume(user_id=2, s3_key="x", extracted_text='<script>alert("python")</script> Python & Go'))
+        await session.commit()
+    hits, _ = await search.search_resumes("python")
+    assert hits[0].highlight == ("&lt;script&gt;alert(&quot;<mark>python</mark>&quot;)&lt;/script&gt; "
+                                 "<mark>Python</mark> &amp; Go")
+    assert search._headline_html("<b>\x02Go\x03</b>") == "&lt;b&gt;<mark>Go</mark>&lt;/b&gt;"
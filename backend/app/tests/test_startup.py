@@ -0,0 +1,52 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from .. import main
+from ..core.config import settings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_heavy_sdks_are_not_imported_at_startup():
+    code = (
+        "import json, sys; import app.main; "
+        "print(json.dumps([m for m in ('stripe', 'minio', 'urllib3', 'numpy', 'httpx', 'passlib', 'celery')"
+        " if m in sys.modules]))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+                         env={**os.environ, "DATABASE_URL": "sqlite+aiosqlite:///:memory:"})
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == []
+
+
+@pytest.mark.asyncio
+async def test_warm_up_step_is_bounded_and_never_raises(monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_WARMUP_TIMEOUT_SECONDS", 0.05)
+
+    async def boom():
+        raise ConnectionError("refused")
+
+    start = time.perf_counter()
+    assert await main._warm("slow", asyncio.sleep(5)) is False
+    assert time.perf_counter() - start < 1
+    assert await main._warm("broken", boom()) is False
+    assert await main._warm("fine", asyncio.sleep(0)) is True
+
+
+@pytest.mark.asyncio
+async def test_lifespan_warms_dependencies_concurrently(db, monkeypatch):
+    async def slow_database():
+        await asyncio.sleep(0.3)
+
+    monkeypatch.setattr(main, "_warm_database", slow_database)
+    monkeypatch.setattr(main, "ensure_buckets", lambda: time.sleep(0.3))
+
+    start = time.perf_counter()
+    async with main.lifespan(main.app):
+        elapsed = time.perf_counter() - start
+    assert 0.3 <= elapsed < 0.55
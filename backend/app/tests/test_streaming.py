@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from httpx import AsyncClient
+
+from ..main import app
+from ..ai.ai_client import ai_client
+from ..billing.entitlements import entitlements
+from ..core.config import settings
+from ..core.security import create_access_token
+from ..db import crud
+
+
+@pytest.fixture(autouse=True)
+def fresh_entitlements():
+    entitlements._local.clear()
+    entitlements._counters.clear()
+
+
+async def _headers(email="sse@example.com"):
+    user = await crud.create_user(email=email, password="pw")
+    return {"Authorization": f"Bearer {create_access_token({'sub': email, 'user_id': user.id})}"}
+
+
+def _events(body: str):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_rewrite_stream_relays_tokens_then_usage(db):
+    headers = await _headers()
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        r = await ac.post("/resume/rewrite/stream", headers=headers,
+                          json={"resume_text": "Built APIs in Python.", "role": "Backend engineer"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = _events(r.text)
+    assert [e for e, _ in events[:-1]] == ["token"] * (len(events) - 1)
+    assert "".join(d["text"] for _, d in events[:-1]) == "(simulated) response for prompt"
+    kind, usage = events[-1]
+    assert kind == "usage" and usage["prompt_id"] == "rewrite_v1" and usage["total_tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_provider_stream_is_parsed(monkeypatch):
+    chunks = [{"choices": [{"delta": {"content": c}}]} for c in ("Hel", "lo")]
+    chunks.append({"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}})
+    body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(ai_client, "provider", "openai")
+    monkeypatch.setattr(ai_client, "_http", httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://llm"))
+    events = [e async for e in ai_client.stream("hi")]
+    assert events == [{"text": "Hel"}, {"text": "lo"}, {"usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}}]
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_upstream(db, monkeypatch):
+    headers = await _headers()
+    first_token_sent = asyncio.Event()
+    upstream_closed = asyncio.Event()
+
+    async def slow_stream(prompt, max_tokens=512, system=None, prompt_id="adhoc"):
+        try:
+            yield {"text": "first"}
+            while True:
+                await asyncio.sleep(0.05)
+                yield {"text": "more"}
+        finally:
+            upstream_closed.set()
+
+    monkeypatch.setattr(ai_client, "stream", slow_stream)
+    body = json.dumps({"resume_text": "x", "role": "y"}).encode()
+    received = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if received:
+            return received.pop()
+        await first_token_sent.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and b"first" in message.get("body", b""):
+            first_token_sent.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/resume/rewrite/stream", "raw_path": b"/resume/rewrite/stream",
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 1), "server": ("test", 80),
+        "headers": [(b"content-type", b"application/json"),
+                    (b"authorization", headers["Authorization"].encode())],
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=5)
+    assert upstream_closed.is_set()
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import stripe
+
+from ..billing.gateway import StripeGateway
+from ..billing.plans import STRIPE_PLANS, plan_lookup_key
+
+
+class StubStripe(BaseHTTPRequestHandler):
+    """Just enough of the Stripe REST API for the gateway."""
+
+    prices = {}  # lookup_key -> price id
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.requests.append(("GET", url.path, query))
+        if url.path == "/v1/prices":
+            keys = [v for k, vs in query.items() if k.startswith("lookup_keys") for v in vs]
+            data = [{"id": self.prices[k], "object": "price", "lookup_key": k} for k in keys if k in self.prices]
+            self._send({"object": "list", "data": data, "has_more": False, "url": "/v1/prices"})
+        elif url.path.startswith("/v1/checkout/sessions/"):
+            sid = url.path.rsplit("/", 1)[1]
+            self._send({"id": sid, "object": "checkout.session", "payment_status": "paid",
+                        "customer_email": "a@example.com", "subscription": "sub_1"})
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        self.requests.append(("POST", self.path, form))
+        if self.path == "/v1/products":
+            self._send({"id": f"prod_{len(self.requests)}", "object": "product"})
+        elif self.path == "/v1/prices":
+            key = form["lookup_key"][0]
+            self.prices[key] = f"price_{key}"
+            self._send({"id": self.prices[key], "object": "price", "lookup_key": key})
+        elif self.path == "/v1/checkout/sessions":
+            self._send({"id": "cs_test_1", "object": "checkout.session", "url": "https://checkout.test/cs_test_1"})
+
+
+@pytest.fixture
+def stub_stripe(monkeypatch):
+    StubStripe.prices, StubStripe.requests = {}, []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubStripe)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(stripe, "api_base", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(stripe, "api_key", "sk_test_stub")
+    yield StubStripe
+    server.shutdown()
+
+
+def _calls(stub, method, path):
+    return [r for r in stub.requests if r[0] == method and r[1] == path]
+
+
+@pytest.mark.asyncio
+async def test_prices_are_created_once_and_reused(stub_stripe):
+    first = await StripeGateway().ensure_prices()
+    assert set(first) == set(STRIPE_PLANS)
+    assert len(_calls(stub_stripe, "POST", "/v1/prices")) == len(STRIPE_PLANS)
+
+    # a fresh worker finds the existing prices by lookup key instead of creating new ones
+    second = await StripeGateway().ensure_prices()
+    assert second == first
+    assert len(_calls(stub_stripe, "POST", "/v1/prices")) == len(STRIPE_PLANS)
+
+
+@pytest.mark.asyncio
+async def test_checkout_session_references_cached_price(stub_stripe):
+    gateway = StripeGateway()
+    session = await gateway.create_checkout_session("pro", "a@example.com")
+    assert session.id == "cs_test_1"
+    (_, _, form), = _calls(stub_stripe, "POST", "/v1/checkout/sessions")
+    assert form["line_items[0][price]"] == [f"price_{plan_lookup_key('pro')}"]
+    assert not any(k.startswith("line_items[0][price_data]") for k in form)
+
+
+@pytest.mark.asyncio
+async def test_retrieve_session_is_cached_and_coalesced(stub_stripe):
+    gateway = StripeGateway(session_cache_ttl=60)
+    results = await asyncio.gather(*(gateway.retrieve_session("cs_abc") for _ in range(5)))
+    results.append(await gateway.retrieve_session("cs_abc"))
+    assert all(r["subscription_id"] == "sub_1" for r in results)
+    assert len(_calls(stub_stripe, "GET", "/v1/checkout/sessions/cs_abc")) == 1
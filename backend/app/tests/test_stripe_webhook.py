@@ -0,0 +1,174 @@
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from ..main import app
+from ..core.config import settings
+from ..billing import webhooks
+from ..db.database import AsyncSessionLocal
+from ..db.models import PaymentRecord, StripeEvent, Subscription, User
+
+SECRET = "whsec_test_fixture"
+
+
+def make_event(event_id, event_type, customer="cus_123", created=1_700_000_000):
+    return {
+        "id": event_id,
+        "object": "event",
+        "type": event_type,
+        "created": created,
+        "data": {"object": {"id": f"obj_{event_id}", "customer": customer}},
+    }
+
+
+def sign(payload: bytes, secret: str = SECRET, timestamp: int = None) -> str:
+    """Build a Stripe-Signature header the way Stripe does."""
+    timestamp = timestamp or int(time.time())
+    mac = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256)
+    return f"t={timestamp},v1={mac.hexdigest()}"
+
+
+@pytest.fixture
+def stripe_webhooks(monkeypatch):
+    monkeypatch.setattr(settings, "STRIPE_WEBHOOK_SECRET", SECRET)
+    enqueued = []
+
+    async def fake_enqueue(customer_id):
+        enqueued.append(customer_id)
+
+    monkeypatch.setattr(webhooks, "enqueue_processing", fake_enqueue)
+    return enqueued
+
+
+async def post_event(ac, event, secret=SECRET):
+    payload = json.dumps(event).encode()
+    return await ac.post("/payments/webhook", content=payload, headers={"stripe-signature": sign(payload, secret)})
+
+
+@pytest.mark.asyncio
+async def test_duplicate_delivery_is_stored_and_enqueued_once(db, stripe_webhooks):
+    event = make_event("evt_1", "checkout.session.completed")
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        first = await post_event(ac, event)
+        second = await post_event(ac, event)
+    assert first.json() == {"status": "success"}
+    assert second.json() == {"status": "duplicate"}
+    assert stripe_webhooks == ["cus_123"]
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(select(StripeEvent))).scalars().all()
+    assert [r.id for r in rows] == ["evt_1"]
+
+
+@pytest.mark.asyncio
+async def test_bad_signature_is_rejected(db, stripe_webhooks):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        r = await post_event(ac, make_event("evt_2", "checkout.session.completed"), secret="whsec_wrong")
+    assert r.status_code == 400
+    assert stripe_webhooks == []
+
+
+@pytest.mark.asyncio
+async def test_events_are_applied_in_stripe_order_and_only_once(db, stripe_webhooks, monkeypatch):
+    seen = []
+
+    async def record(conn, obj):
+        seen.append(obj["id"])
+
+    monkeypatch.setitem(webhooks.EVENT_HANDLERS, "customer.subscription.updated", record)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        # delivered out of order
+        for event_id, created in [("evt_b", 20), ("evt_a", 10), ("evt_c", 30)]:
+            await post_event(ac, make_event(event_id, "customer.subscription.updated", created=created))
+
+    assert await webhooks.process_pending_events("cus_123") == 3
+    assert await webhooks.process_pending_events("cus_123") == 0
+    assert seen == ["obj_evt_a", "obj_evt_b", "obj_evt_c"]
+    assert await webhooks.customers_with_pending_events() == []
+
+
+@pytest.mark.asyncio
+async def test_failed_event_blocks_later_events_until_retry(db, stripe_webhooks, monkeypatch):
+    calls = []
+
+    async def flaky(conn, obj):
+        calls.append(obj["id"])
+        if len(calls) == 1:
+            raise RuntimeError("db hiccup")
+
+    monkeypatch.setitem(webhooks.EVENT_HANDLERS, "invoice.paid", flaky)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        await post_event(ac, make_event("evt_x", "invoice.paid", created=1))
+        await post_event(ac, make_event("evt_y", "invoice.paid", created=2))
+
+    with pytest.raises(RuntimeError):
+        await webhooks.process_pending_events("cus_123")
+    assert await webhooks.customers_with_pending_events() == ["cus_123"]
+    assert await webhooks.process_pending_events("cus_123") == 2
+    assert calls == ["obj_evt_x", "obj_evt_x", "obj_evt_y"]
+
+
+@pytest.mark.asyncio
+async def test_entitlements_are_invalidated_after_the_event_commits(db, stripe_webhooks, monkeypatch):
+    seen = {}
+
+    async def plan_changed(conn, obj):
+        seen["conn"] = conn
+        return 7
+
+    async def invalidate(user_id):
+        seen["invalidated"] = (user_id, seen["conn"].in_transaction())
+
+    monkeypatch.setitem(webhooks.EVENT_HANDLERS, "customer.subscription.updated", plan_changed)
+    monkeypatch.setattr(webhooks.entitlements, "invalidate", invalidate)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        await post_event(ac, make_event("evt_p", "customer.subscription.updated"))
+
+    assert await webhooks.process_pending_events("cus_123") == 1
+    assert seen["invalidated"] == (7, False)
+
+
+def test_busy_customer_is_retried_instead_of_waiting_for_the_lock(monkeypatch):
+    from ..tasks import process_stripe_events
+
+    calls = []
+
+    async def process(customer_id):
+        calls.append(customer_id)
+        if len(calls) == 1:
+            raise webhooks.CustomerBusy(customer_id)
+        return 2
+
+    monkeypatch.setattr(webhooks, "process_pending_events", process)
+    result = process_stripe_events.apply(args=("cus_123",))  # eager: the retry runs inline
+    assert (result.state, result.result, calls) == ("SUCCESS", 2, ["cus_123", "cus_123"])
+
+
+def test_events_without_a_customer_share_one_lock():
+    assert webhooks._lock_name(None) == webhooks._lock_name(None) != webhooks._lock_name("cus_123")
+    assert webhooks._lock_name("cus_123") == "stripe:cus_123"
+
+
+@pytest.mark.asyncio
+async def test_invoices_and_refunds_are_recorded_as_payments(db):
+    async with AsyncSessionLocal() as session:
+        session.add(User(id=4, email="payer@example.com", hashed_password="x"))
+        session.add(Subscription(user_id=4, stripe_customer_id="cus_123", plan="pro"))
+        await session.commit()
+    for event_id, event_type, amounts in [("evt_1", "invoice.payment_succeeded", {"amount_paid": 1990}),
+                                          ("evt_2", "invoice.payment_failed", {"amount_due": 1990}),
+                                          ("evt_3", "charge.refunded", {"amount_refunded": 500})]:
+        event = make_event(event_id, event_type)
+        event["data"]["object"].update(currency="usd", **amounts)
+        await webhooks.record_event(event, json.dumps(event).encode())
+    assert await webhooks.process_pending_events("cus_123") == 3
+
+    async with AsyncSessionLocal() as session:
+        payments = (await session.execute(select(PaymentRecord).order_by(PaymentRecord.stripe_object_id))).scalars()
+        assert [(p.user_id, p.plan, p.amount, p.status) for p in payments] == [
+            (4, "pro", 1990, "succeeded"), (4, "pro", 1990, "failed"), (4, "pro", 500, "refunded"),
+        ]
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+from ..main import app
+from ..ai import template_cache
+from ..ai.template_cache import TemplateCatalog, template_catalog
+from ..core.security import create_access_token
+from ..db.database import AsyncSessionLocal
+from ..db.models import Template, User
+
+
+@pytest_asyncio.fixture
+async def catalog(db):
+    async with AsyncSessionLocal() as session:
+        admin = User(email="admin@example.com", hashed_password="x", is_admin=True)
+        session.add_all([
+            admin,
+            Template(name="Cover Letter", description="d", type="cover_letter", category="standard",
+                     prompt="Write a cover letter.", is_premium=False),
+            Template(name="LinkedIn", description="d", type="linkedin", category="premium",
+                     prompt="Summarize {resume_content} for LinkedIn.", is_premium=True),
+        ])
+        await session.commit()
+        token = create_access_token({"sub": admin.email, "user_id": admin.id})
+    template_catalog.invalidate()
+    yield {"Authorization": f"Bearer {token}"}
+    template_catalog.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_listing_is_served_with_etag_and_304(catalog):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        first = await ac.get("/templates/templates")
+        etag = first.headers["etag"]
+        again = await ac.get("/templates/templates", headers={"If-None-Match": etag})
+        premium = await ac.get("/templates/templates", params={"category": "premium"})
+    assert first.status_code == 200 and len(first.json()) == 2
+    assert again.status_code == 304 and again.content == b""
+    assert [t["type"] for t in premium.json()] == ["linkedin"]
+    assert premium.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_unknown_categories_are_not_cached(catalog):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        responses = [await ac.get("/templates/templates", params={"category": f"junk{i}"}) for i in range(3)]
+    assert [r.json() for r in responses] == [[]] * 3
+    assert len({r.headers["etag"] for r in responses}) == 1
+    assert not any(key and key.startswith("junk") for key in (await template_catalog.snapshot())._listings)
+
+
+@pytest.mark.asyncio
+async def test_admin_edit_invalidates_catalog(catalog):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        etag = (await ac.get("/templates/templates")).headers["etag"]
+        updated = await ac.put("/templates/templates/1", headers=catalog, json={
+            "name": "Cover Letter v2", "description": "d", "type": "cover_letter",
+            "category": "standard", "prompt": "Write a short cover letter.",
+        })
+        after = await ac.get("/templates/templates", headers={"If-None-Match": etag})
+        single = await ac.get("/templates/templates/1")
+        bad = await ac.post("/templates/templates", headers=catalog, json={
+            "name": "x", "description": "d", "type": "t", "prompt": "Use {unknown_field}",
+        })
+        forbidden = await ac.delete("/templates/templates/1")
+    assert updated.status_code == 200
+    assert after.status_code == 200 and after.json()[0]["name"] == "Cover Letter v2"
+    assert single.json()["name"] == "Cover Letter v2"
+    assert bad.status_code == 422
+    assert forbidden.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_compiled_prompt_places_fields(catalog):
+    snapshot = await template_catalog.snapshot()
+    inline = snapshot.by_type["linkedin"].render({"resume_content": "RESUME", "job_description": "JOB"})
+    appended = snapshot.by_type["cover_letter"].render({"resume_content": "RESUME"})
+    assert inline == "Summarize RESUME for LinkedIn.\n\nJob description:\nJOB"
+    assert appended == "Write a cover letter.\n\nResume:\nRESUME"
+
+
+@pytest.mark.asyncio
+async def test_listener_closes_each_pubsub_before_reconnecting(monkeypatch):
+    opened, closed = [], []
+
+    class BrokenPubSub:
+        async def subscribe(self, channel):
+            raise ConnectionError("redis went away")
+
+        async def close(self):
+            closed.append(self)
+
+    class FakeRedis:
+        def pubsub(self):
+            opened.append(BrokenPubSub())
+            return opened[-1]
+
+    monkeypatch.setattr(template_cache, "get_redis", lambda: FakeRedis())
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(template_cache.asyncio, "sleep", lambda seconds: real_sleep(0))
+    listener = asyncio.create_task(TemplateCatalog()._listen())
+    while len(opened) < 3:
+        await real_sleep(0)
+    listener.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await listener
+    assert closed == opened
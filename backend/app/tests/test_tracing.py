@@ -0,0 +1,92 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+from ..main import app
+from ..ai.ai_client import ai_client
+from ..core import tracing
+from ..core.tracing import TailSamplingProcessor
+
+exporter = InMemorySpanExporter()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def global_provider():
+    # the global provider can only be installed once per process; keep every trace
+    provider = TracerProvider()
+    provider.add_span_processor(TailSamplingProcessor(SimpleSpanProcessor(exporter), ratio=1.0))
+    trace.set_tracer_provider(provider)
+
+
+@pytest.fixture(autouse=True)
+def clear_spans():
+    exporter.clear()
+
+
+def _local_tracer(slow_ms=50.0, ratio=0.0):
+    sink = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(TailSamplingProcessor(SimpleSpanProcessor(sink), slow_ms=slow_ms, ratio=ratio))
+    return provider.get_tracer("test"), sink
+
+
+def test_tail_sampling_keeps_slow_and_failed_traces_only():
+    tracer, sink = _local_tracer()
+    with tracer.start_as_current_span("fast-root"):
+        with tracer.start_as_current_span("fast-child"):
+            pass
+    with tracer.start_as_current_span("slow-root"):
+        with tracer.start_as_current_span("slow-child"):
+            time.sleep(0.06)
+    with tracer.start_as_current_span("failed-root"):
+        with tracer.start_as_current_span("failed-child") as child:
+            child.set_status(trace.Status(StatusCode.ERROR))
+    assert sorted(s.name for s in sink.get_finished_spans()) == ["failed-child", "failed-root", "slow-child", "slow-root"]
+
+
+@pytest.mark.asyncio
+async def test_request_span_continues_incoming_trace_and_wraps_llm_call():
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+    headers = {"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"}
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        r = await ac.get("/health/live", headers=headers)
+    assert r.status_code == 200
+    with trace.get_tracer("test").start_as_current_span("job"):
+        await ai_client.call("hello", prompt_id="eval_v1")
+
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+    server = spans["GET /health/live"]
+    assert format(server.context.trace_id, "032x") == trace_id
+    assert server.attributes["http.route"] == "/health/live" and server.attributes["http.status_code"] == 200
+    assert spans["llm.call"].parent.span_id == spans["job"].context.span_id
+    assert spans["llm.call"].attributes["llm.prompt_id"] == "eval_v1"
+
+
+def test_celery_headers_carry_trace_to_task_span():
+    tracer = trace.get_tracer("test")
+    headers = {}
+    with tracer.start_as_current_span("enqueue") as parent:
+        tracing.inject_task_headers(headers=headers)
+    request = SimpleNamespace(get=lambda k: headers.get(k))
+    task = SimpleNamespace(name="app.tasks.index_resumes", request=request)
+    tracing.start_task_span(task_id="t1", task=task)
+    assert trace.get_current_span().get_span_context().trace_id == parent.get_span_context().trace_id
+    tracing.end_task_span(task_id="t1", state="SUCCESS")
+    assert not trace.get_current_span().get_span_context().is_valid
+
+
+def test_workers_that_do_not_fork_set_up_tracing_at_init(monkeypatch):
+    from .. import tasks
+
+    services = []
+    monkeypatch.setattr(tracing, "setup_tracing", services.append)
+    for pool in ("solo", "threads", "prefork"):
+        tasks.init_unforked_worker_tracing(sender=SimpleNamespace(pool_cls=pool))
+    assert services == ["resume-agent-worker"] * 2
@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from ..main import app
+from ..core.hyperloglog import HyperLogLog
+from ..core.security import create_access_token
+from ..core.usage import UsageTracker, UsageTrackingMiddleware, usage_tracker, ACTIVE
+
+
+def test_hyperloglog_estimate_is_within_error_bounds():
+    hll = HyperLogLog()
+    hll.update(f"user-{i}" for i in range(50_000))
+    hll.update(f"user-{i}" for i in range(10_000))  # repeats must not count
+    assert abs(hll.count() - 50_000) / 50_000 < 0.05
+    assert len(hll.registers) == 4096
+
+
+def test_hyperloglog_merge_is_union():
+    a, b = HyperLogLog(), HyperLogLog()
+    a.update(f"u{i}" for i in range(0, 6000))
+    b.update(f"u{i}" for i in range(3000, 9000))
+    a.merge(b)
+    assert abs(a.count() - 9000) / 9000 < 0.05
+
+
+@pytest.mark.asyncio
+async def test_tracker_merges_daily_windows():
+    tracker = UsageTracker()
+    today = date(2026, 3, 10)
+    for offset in range(7):
+        for i in range(100):
+            # 100 users a day, half of them returning every day
+            tracker.record("ats", f"u{i if i < 50 else offset * 100 + i}", day=today - timedelta(days=offset))
+    assert await tracker.usage_count("ats", days=7, today=today) == 700
+    assert await tracker.unique_users("ats", days=1, today=today) == pytest.approx(100, abs=3)
+    assert await tracker.unique_users("ats", days=7, today=today) == pytest.approx(400, rel=0.05)
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_feature_hits_per_user():
+    token = create_access_token({"sub": "carol@example.com"})
+    before = await usage_tracker.usage_count("ats")
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        for _ in range(3):
+            r = await ac.post("/ats/score", json={"resume": "python", "job": "python"}, headers={"Authorization": f"Bearer {token}"})
+            assert r.status_code == 200
+        active_before = await usage_tracker.usage_count(ACTIVE)
+        await ac.get("/health/live")
+    assert await usage_tracker.usage_count("ats") == before + 3
+    assert await usage_tracker.usage_count(ACTIVE) == active_before
+
+
+@pytest.mark.asyncio
+async def test_stripe_deliveries_are_not_user_activity():
+    async def ok(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    before = await usage_tracker.usage_count(ACTIVE)
+    async with AsyncClient(app=UsageTrackingMiddleware(ok), base_url="http://test") as ac:
+        await ac.post("/payments/webhook")
+        await ac.get("/user/subscription")
+    assert await usage_tracker.usage_count(ACTIVE) == before + 1
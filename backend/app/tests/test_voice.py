@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from ..ai import interviewer
+from ..ai.asr import FakeAsr
+from ..ai.voice import VoiceAnswer, VoiceLimitExceeded
+from ..core.config import settings
+from ..core.fanout import interview_fanout
+
+
+@pytest.mark.asyncio
+async def test_fake_asr_holds_back_split_words():
+    stream = FakeAsr().stream()
+    assert await stream.feed(b"I would pro") == "I would"
+    assert await stream.feed(b"file first, th") == "profile first,"
+    assert await stream.feed(b"") == ""
+    assert await stream.close() == "th"
+    assert await FakeAsr().transcribe(b"  profile first ") == "profile first"
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    calls = []
+
+    async def score_answer(question, answer):
+        calls.append(answer)
+        await asyncio.sleep(0.05)
+        return float(len(answer.split())), f"{len(answer.split())} words"
+
+    monkeypatch.setattr(interviewer, "score_answer", score_answer)
+    return calls
+
+
+async def _drain(events):
+    received = []
+    while not events._queue.empty():
+        received.append(await events.__anext__())
+    return received
+
+
+@pytest.mark.asyncio
+async def test_score_is_ready_when_speech_ends_after_a_pause(scored):
+    answer = VoiceAnswer("s1", "q0", "How do you find a slow query?", FakeAsr(), min_new_words=4)
+    async with interview_fanout.subscribe("s1") as events:
+        for chunk in (b"I would turn on the slow ", b"query log and then ", b"look at it "):
+            await answer.feed(chunk)
+            await asyncio.sleep(0.06)  # the speaker keeps talking while evaluation runs
+        await answer.feed(b"")  # a pause: the full transcript is scored now
+        await asyncio.sleep(0.01)
+        score = await answer.finish()
+        received = await _drain(events)
+
+    assert score == 13.0
+    assert scored == ["I would turn on the slow", "I would turn on the slow query log and then",
+                      "I would turn on the slow query log and then look at it"]
+    assert [e["type"] for e in received if e["type"] == "evaluation.partial"] == ["evaluation.partial"] * 2
+    assert received[-1] == {"type": "evaluation.completed", "question_id": "q0", "score": 13.0,
+                            "feedback": "13 words", "transcript": scored[-1]}
+
+
+@pytest.mark.asyncio
+async def test_words_after_the_last_evaluation_are_scored_at_the_end(scored):
+    answer = VoiceAnswer("s2", "q1", "Why?", FakeAsr(), min_new_words=100)
+    async with interview_fanout.subscribe("s2"):
+        await answer.feed(b"because it ")
+        await answer.feed(b"")
+        assert await answer.finish(b"was slow") == 4.0
+    assert scored == ["because it", "because it was slow"]
+
+
+@pytest.mark.asyncio
+async def test_provisional_evaluations_are_capped(scored, monkeypatch):
+    monkeypatch.setattr(settings, "VOICE_MAX_PROVISIONAL_EVALS", 1)
+    answer = VoiceAnswer("s3", "q0", "Why?", FakeAsr(), min_new_words=1)
+    async with interview_fanout.subscribe("s3"):
+        for chunk in (b"one ", b"two ", b"three "):
+            await answer.feed(chunk)
+            await asyncio.sleep(0.06)
+        assert await answer.finish() == 3.0
+    assert scored == ["one", "one two three"]
+
+
+@pytest.mark.asyncio
+async def test_answers_over_the_size_or_time_limit_are_rejected(scored, monkeypatch):
+    monkeypatch.setattr(settings, "VOICE_MAX_BYTES", 10)
+    answer = VoiceAnswer("s4", "q0", "Why?", FakeAsr(), min_new_words=100)
+    await answer.feed(b"short ")
+    with pytest.raises(VoiceLimitExceeded):
+        await answer.feed(b"and then long")
+
+    monkeypatch.setattr(settings, "VOICE_MAX_SECONDS", 0.0)
+    with pytest.raises(VoiceLimitExceeded):
+        await VoiceAnswer("s4", "q0", "Why?", FakeAsr()).feed(b"x")
+    assert scored == []
+
+
+@pytest.mark.asyncio
+async def test_transcribe_is_a_stub_without_an_asr_engine(monkeypatch):
+    from httpx import AsyncClient
+
+    from ..main import app
+
+    monkeypatch.setattr(settings, "ASR_ENGINE", "")
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        r = await ac.post("/interview/transcribe", files={"file": ("a.wav", b"RIFF\x00binary", "audio/wav")})
+    assert r.json() == {"transcript": "(simulated) transcribed text"}
+
+
+@pytest.mark.asyncio
+async def test_voice_answer_over_the_interview_socket(db, scored, monkeypatch):
+    from starlette.testclient import TestClient
+
+    from ..core.security import create_access_token
+    from ..main import app
+
+    monkeypatch.setattr(settings, "ASR_ENGINE", "fake")
+    session_id = await interviewer.create_session("SRE", "hard", user_id=1)
+    token = create_access_token({"sub": "x@example.com", "user_id": 1})
+
+    def speak():
+        with TestClient(app) as client:
+            with client.websocket_connect(f"/interview/session/{session_id}/ws?token={token}") as ws:
+                ws.send_json({"type": "next_question"})
+                ws.receive_json()
+                ws.send_json({"type": "voice.start", "question_id": "q0"})
+                ws.send_bytes(b"roll back ")
+                ws.send_bytes(b"first")
+                ws.send_json({"type": "voice.end"})
+                events = [ws.receive_json()]
+                while events[-1]["type"] != "evaluation.completed":
+                    events.append(ws.receive_json())
+                return [e for e in events if e["type"] != "evaluation.partial"]
+
+    events = await asyncio.to_thread(speak)
+    assert [e["type"] for e in events] == ["transcript.partial", "transcript.partial", "evaluation.completed"]
+    assert events[-1]["transcript"] == "roll back first" and events[-1]["score"] == 3.0
@@ -0,0 +1,106 @@
+"""Recall/latency benchmark for the embedding index.
+
+Builds a clustered synthetic corpus (real resume and job embeddings are
+strongly clustered by role), then compares exact search against the ANN
+path on the same queries and reports recall@k against the exact results
+plus per-query latency percentiles. Also measures embedding throughput of
+the hashing embedder.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_embeddings --sizes 10000 100000 --queries 200 > results.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.ai.embeddings import HashingEmbedder, VectorIndex, normalize
+
+
+def clustered_corpus(n: int, dim: int, clusters: int, rng, spread: float = 1.4) -> np.ndarray:
+    centers = normalize(rng.standard_normal((clusters, dim), dtype=np.float32))
+    noise = rng.standard_normal((n, dim), dtype=np.float32) * np.float32(spread / dim ** 0.5)
+    return normalize(centers[rng.integers(0, clusters, size=n)] + noise)
+
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3), "p95_ms": round(float(np.percentile(ms, 95)), 3)}
+
+
+def bench_index(n: int, dim: int, queries: int, k: int, nprobe: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    data = clustered_corpus(n + queries, dim, clusters=max(8, n // 500), rng=rng)
+    corpus, qs = data[:n], data[n:]
+    with tempfile.TemporaryDirectory() as directory:
+        index = VectorIndex(directory, dim, ann_threshold=0, nprobe=nprobe)
+        start = time.perf_counter()
+        index.upsert(list(range(n)), corpus)
+        load_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index.search(qs[0], k, exact=False)  # builds the ANN structure
+        build_s = time.perf_counter() - start
+
+        exact_times, ann_times, hits = [], [], 0
+        for q in qs:
+            t0 = time.perf_counter()
+            truth = {i for i, _ in index.search(q, k, exact=True)}
+            t1 = time.perf_counter()
+            approx = {i for i, _ in index.search(q, k, exact=False)}
+            t2 = time.perf_counter()
+            exact_times.append(t1 - t0)
+            ann_times.append(t2 - t1)
+            hits += len(truth & approx)
+
+    return {
+        "n": n,
+        "dim": dim,
+        "k": k,
+        "nprobe": nprobe,
+        "upsert_s": round(load_s, 3),
+        "ann_build_s": round(build_s, 3),
+        "exact": percentiles(exact_times),
+        "ann": percentiles(ann_times),
+        f"recall_at_{k}": round(hits / (queries * k), 4),
+    }
+
+
+def bench_embedder(docs: int, dim: int) -> dict:
+    words = ("python kubernetes sql react leadership aws docker java terraform product "
+             "analytics machine learning design mentoring agile testing").split()
+    rng = np.random.default_rng(0)
+    texts = [" ".join(rng.choice(words, size=400)) for _ in range(docs)]
+    embedder = HashingEmbedder(dim)
+    start = time.perf_counter()
+    embedder.embed(texts)
+    elapsed = time.perf_counter() - start
+    return {"docs": docs, "words_per_doc": 400, "docs_per_s": round(docs / elapsed, 1)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    results = {
+        "benchmark": "embeddings",
+        "embedder": bench_embedder(500, args.dim),
+        "index": [bench_index(n, args.dim, args.queries, args.k, args.nprobe, args.seed) for n in args.sizes],
+    }
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
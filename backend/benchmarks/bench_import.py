@@ -0,0 +1,118 @@
+"""Throughput benchmark for the bulk resume import pipeline.
+
+Builds a zip of ``--docs`` distinct synthetic resumes (a ``--pdf-fraction``
+of them rendered as PDFs with reportlab, so extraction does real parsing),
+then imports it once per ``--workers`` setting through
+``app.core.bulk_import.run_import``. Each run uses a fresh SQLite file and
+an in-memory MinIO, so the numbers cover archive streaming, hashing,
+process-pool extraction and the batched inserts. Reports documents per
+second per worker count; with PDFs in the mix, throughput should grow
+with workers up to the core count.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_import --docs 10000 --workers 1 2 4 8 > import.json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .corpus import resume_text
+
+
+def pdf_bytes(body: str) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    page = canvas.Canvas(buffer, pagesize=letter)
+    y = 750
+    for line in body.splitlines():
+        page.drawString(40, y, line[:110])
+        y -= 14
+        if y < 40:
+            page.showPage()
+            y = 750
+    page.save()
+    return buffer.getvalue()
+
+
+def build_archive(path: str, docs: int, pdf_fraction: float, words: int) -> None:
+    pdf_every = round(1 / pdf_fraction) if pdf_fraction else 0
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(docs):
+            body = resume_text(words, seed=i)
+            if pdf_every and i % pdf_every == 0:
+                archive.writestr(f"resumes/{i:05d}.pdf", pdf_bytes(body))
+            else:
+                archive.writestr(f"resumes/{i:05d}.txt", body)
+
+
+async def run_once(archive: str, workers: int, batch_size: int) -> dict:
+    from sqlalchemy import insert
+
+    from app.core import bulk_import, minio_utils
+    from app.db.database import Base, engine
+    from app.db.models import ImportJob
+
+    from .fakes import FakeMinio, skip_enqueue
+
+    fake_minio = FakeMinio()
+    minio_utils.get_minio_client = lambda: fake_minio
+    bulk_import.enqueue_indexing = skip_enqueue
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        job_id = (await conn.execute(insert(ImportJob).values(user_id=1, source="zip", location=archive))
+                  ).inserted_primary_key[0]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(abs, range(workers)))  # start the workers before the clock
+        start = time.perf_counter()
+        totals = await bulk_import.run_import(job_id, 1, bulk_import.iter_zip(archive), pool=pool,
+                                              batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+    return {"workers": workers, "elapsed_s": round(elapsed, 3), "docs_per_s": round(totals["processed"] / elapsed, 1),
+            "failed": totals["failed"]}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--pdf-fraction", type=float, default=0.5)
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    from .scenarios import _configure_offline
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _configure_offline(os.path.join(tmp, "import.db"))
+        archive = os.path.join(tmp, "resumes.zip")
+        start = time.perf_counter()
+        build_archive(archive, args.docs, args.pdf_fraction, args.words)
+        print(f"built {args.docs} documents in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        runs = []
+        for workers in sorted(set(args.workers)):
+            runs.append(asyncio.run(run_once(archive, workers, args.batch_size)))
+            print(f"{workers} workers: {runs[-1]['docs_per_s']} docs/s", file=sys.stderr)
+
+    results = {"benchmark": "bulk_import", "docs": args.docs, "pdf_fraction": args.pdf_fraction,
+               "cpu_count": os.cpu_count(), "runs": runs}
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
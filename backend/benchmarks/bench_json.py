@@ -0,0 +1,106 @@
+"""Encode time and memory of API response bodies: stdlib JSON vs orjson.
+
+Representative payloads from ``app/api/admin.py`` and ``app/api/ats.py``:
+
+- ``daily_metrics``: ``GET /admin/metrics/daily?days=365``
+- ``user_page``: a 1000-row ``GET /admin/users`` page, validated into ``UserPage``
+- ``ats_batch``: ``--batch`` ``/ats/score`` results, as a batch endpoint would return
+- ``template_catalog``: a 500-template catalog listing
+
+Each payload is rendered three ways:
+
+- ``stdlib``: FastAPI's previous default, ``jsonable_encoder`` then ``JSONResponse``
+  (``json.dumps``),
+- ``orjson``: ``jsonable_encoder`` then ``ORJSONResponse`` (the new default
+  response class),
+- ``orjson_direct``: returning an ``ORJSONResponse`` of the payload, which
+  skips ``jsonable_encoder`` (the bypass used for pre-validated data).
+
+Reports mean microseconds per render and the tracemalloc peak of one render.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_json > json.json
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone
+
+
+def payloads(batch: int) -> dict:
+    from app.api.admin import UserPage
+
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    daily = {"period_days": 365, "daily_data": [
+        {"date": date(2026, 1, 1) - timedelta(days=i), "new_users": 15 + i % 10, "active_users": 100 + i * 5,
+         "revenue": 500.0 + i * 50}
+        for i in range(365)
+    ]}
+    users = UserPage(items=[
+        {"id": i, "email": f"user{i}@example.com", "full_name": f"User {i}", "created_at": now - timedelta(minutes=i),
+         "total_resumes": i % 7}
+        for i in range(1000)
+    ], next_cursor="MjAyNi0wMS0wMVQwMDowMDowMCswMDowMHwxMDAw").dict()
+    ats = [
+        {"text": json.dumps({"score": 70 + i % 30, "matched_keywords": ["python", "postgresql", "kubernetes"],
+                             "missing_keywords": ["terraform", "go"], "suggested_bullets": []}),
+         "provider": "openai", "usage": {"prompt_tokens": 812, "completion_tokens": 96, "total_tokens": 908}}
+        for i in range(batch)
+    ]
+    catalog = [
+        {"id": i, "name": f"Template {i}", "description": "Tailored cover letter for a role " * 3,
+         "type": "cover_letter", "category": "letters", "is_premium": i % 3 == 0}
+        for i in range(500)
+    ]
+    return {"daily_metrics": daily, "user_page": users, "ats_batch": ats, "template_catalog": catalog}
+
+
+def renderers() -> dict:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, ORJSONResponse
+
+    return {
+        "stdlib": lambda p: JSONResponse(jsonable_encoder(p)).body,
+        "orjson": lambda p: ORJSONResponse(jsonable_encoder(p)).body,
+        "orjson_direct": lambda p: ORJSONResponse(p).body,
+    }
+
+
+def measure(render, payload, iterations: int) -> dict:
+    render(payload)  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render(payload)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    render(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"mean_us": round(elapsed / iterations * 1e6, 1), "peak_bytes": peak}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    from .scenarios import _configure_offline
+
+    _configure_offline(":memory:")  # settings need a DATABASE_URL; nothing is stored
+    results = {"benchmark": "json_responses", "iterations": args.iterations, "payloads": {}}
+    for name, payload in payloads(args.batch).items():
+        runs = {label: measure(render, payload, args.iterations) for label, render in renderers().items()}
+        results["payloads"][name] = runs
+        print(f"{name}: " + ", ".join(f"{k} {v['mean_us']}us" for k, v in runs.items()), file=sys.stderr)
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
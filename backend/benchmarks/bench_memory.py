@@ -0,0 +1,111 @@
+"""tracemalloc benchmark for keyword extraction and local ATS scoring.
+
+Compares ``app.ai.keywords`` with list-of-strings equivalents (the previous
+``extract_keywords`` and a ``Counter``-based keyword match):
+
+- per call: peak traced bytes while handling one job posting / resume pair,
+- retained: bytes held by ``--docs`` job term vectors kept in memory
+  (``TermVector`` vs a ``Counter`` of strings per document).
+
+The vocabulary is warmed first, as it would be in a long-running worker.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_memory --docs 2000 > memory.json
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import tracemalloc
+from collections import Counter
+
+from .corpus import job_text, resume_text
+
+_TERM_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def list_keywords(text: str, limit: int = 50):
+    words = [w.strip('.,') for w in text.split() if len(w) > 3][:limit]
+    return list(dict.fromkeys(words))
+
+
+def counter_vector(text: str) -> dict:
+    from app.ai.keywords import STOPWORDS
+
+    terms = [t.rstrip(".") for t in _TERM_RE.findall(text.lower())]
+    counts = Counter(t for t in terms if len(t) > 1 and t not in STOPWORDS)
+    return {t: 1.0 + math.log(n) for t, n in counts.items()}
+
+
+def counter_match(resume: str, job: str, limit: int = 50) -> dict:
+    job_vector, resume_vector = counter_vector(job), counter_vector(resume)
+    top = sorted(job_vector.items(), key=lambda p: -p[1])[:limit]
+    matched = [t for t, _ in top if t in resume_vector]
+    missing = [t for t, _ in top if t not in resume_vector]
+    total = sum(w for _, w in top)
+    return {"score": 100.0 * sum(w for t, w in top if t in resume_vector) / total,
+            "matched_keywords": matched, "missing_keywords": missing}
+
+
+def peak(fn, *args) -> int:
+    tracemalloc.start()
+    fn(*args)
+    _, high = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return high
+
+
+def retained(build, texts) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(t) for t in texts]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--job-words", type=int, default=1500)
+    parser.add_argument("--resume-words", type=int, default=800)
+    args = parser.parse_args(argv)
+
+    from .scenarios import _configure_offline
+
+    _configure_offline(":memory:")  # settings need a DATABASE_URL; nothing is stored
+    from app.ai.keywords import Scratch, TermVector, extract_keywords, keyword_match, vocabulary
+
+    jobs = [job_text(args.job_words, seed=i) for i in range(args.docs)]
+    resume = resume_text(args.resume_words, seed=1)
+    for text in jobs:  # warm the vocabulary
+        TermVector.from_text(text, Scratch(vocabulary))
+    job = jobs[0]
+
+    results = {
+        "benchmark": "keyword_memory",
+        "docs": args.docs,
+        "vocabulary_terms": len(vocabulary),
+        "extract_keywords_peak_bytes": {"lists": peak(list_keywords, job), "compact": peak(extract_keywords, job)},
+        "keyword_match_peak_bytes": {"lists": peak(counter_match, resume, job),
+                                     "compact": peak(keyword_match, resume, job)},
+        "retained_vectors_bytes": {
+            "lists": retained(counter_vector, jobs),
+            "compact": retained(lambda t: TermVector.from_text(t, Scratch(vocabulary)), jobs),
+        },
+    }
+    for name in ("extract_keywords_peak_bytes", "keyword_match_peak_bytes", "retained_vectors_bytes"):
+        pair = results[name]
+        print(f"{name}: {pair['lists']} -> {pair['compact']} ({pair['compact'] / pair['lists']:.0%})",
+              file=sys.stderr)
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Cold-start benchmark: import time and lifespan startup of the API.
+
+Every run is a fresh interpreter that imports ``app.main`` and then runs
+the lifespan startup (dependency warm-up included) against a throwaway
+SQLite database and an unreachable MinIO, so the numbers cover our own
+code and imports rather than network round trips. Reports median and max
+wall time for both phases, the biggest imports by cumulative time
+(``python -X importtime``) and whether any of the SDKs that are meant to
+load lazily were imported anyway.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_startup --runs 5 > startup.json
+    python -m benchmarks.bench_startup --max-import-ms 900   # exit 1 if over budget
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# imported on first use, never by ``import app.main``
+LAZY_MODULES = ("stripe", "minio", "urllib3", "numpy", "httpx", "passlib", "celery")
+
+CHILD = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+at_import = [m for m in {lazy!r} if m in sys.modules]
+
+async def boot():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({{"import_ms": (imported - start) * 1000, "startup_ms": (ready - imported) * 1000,
+                   "lazy_loaded_at_import": at_import}}))
+"""
+
+
+def _env(tmp: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(tmp, 'startup.db')}",
+        "MINIO_ENDPOINT": "127.0.0.1:9",  # refused at once: warm-up fails fast
+        "MINIO_CONNECT_TIMEOUT_SECONDS": "0.5",
+        "LLM_PROVIDER": "fake",
+        "OPENAI_API_KEY": "",
+        "STRIPE_API_KEY": "",
+        "REDIS_URL": "",
+        "TRACING_ENABLED": "false",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    return env
+
+
+def run_once(env: dict) -> dict:
+    out = subprocess.run([sys.executable, "-c", CHILD.format(lazy=LAZY_MODULES)], env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def top_imports(env: dict, limit: int) -> list:
+    """Slowest modules imported directly by app code (depth <= 2), by cumulative time."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], env=env,
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 2:
+            rows.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+    return sorted(rows, key=lambda r: -r["cumulative_ms"])[:limit]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-import-ms", type=float, help="fail if the median import time exceeds this")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(tmp)
+        run_once(env)  # first run compiles bytecode / warms the OS page cache
+        runs = [run_once(env) for _ in range(args.runs)]
+        imports = top_imports(env, args.top)
+
+    import_ms = [r["import_ms"] for r in runs]
+    startup_ms = [r["startup_ms"] for r in runs]
+    results = {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "import": {"median_ms": round(statistics.median(import_ms), 1), "max_ms": round(max(import_ms), 1)},
+        "startup": {"median_ms": round(statistics.median(startup_ms), 1), "max_ms": round(max(startup_ms), 1)},
+        "lazy_loaded_at_import": sorted({m for r in runs for m in r["lazy_loaded_at_import"]}),
+        "top_imports": imports,
+    }
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+    if results["lazy_loaded_at_import"]:
+        print(f"lazy SDKs imported at startup: {results['lazy_loaded_at_import']}", file=sys.stderr)
+        return 1
+    if args.max_import_ms and results["import"]["median_ms"] > args.max_import_ms:
+        print(f"import took {results['import']['median_ms']}ms, budget {args.max_import_ms}ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
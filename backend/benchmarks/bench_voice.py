@@ -0,0 +1,112 @@
+"""Time from end of speech to final score: serial vs streaming voice scoring.
+
+A synthetic ``--words``-word answer is "spoken" as ``--chunks`` audio chunks
+paced ``--chunk-seconds`` apart and followed by one silent chunk. The fake
+ASR engine takes ``--asr-latency`` per chunk, and the fake LLM provider
+takes ``--llm-latency`` per ``eval_v1`` call.
+
+- serial: the flow of ``/interview/transcribe`` followed by
+  ``/interview/evaluate``. Transcribe the whole recording once it ends (one
+  ASR pass over every chunk), then evaluate.
+- streaming: ``app.ai.voice.VoiceAnswer`` fed while recording; the clock
+  starts after the last chunk has been sent.
+
+Reports the median latency to the final score over ``--runs`` runs, and
+the LLM calls the streaming path spent on provisional scores.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_voice --words 150 --chunks 15 > voice.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from .corpus import resume_text
+
+
+def _chunks(words: int, chunks: int):
+    spoken = resume_text(words, seed=7).split()[:words]
+    per = max(1, len(spoken) // chunks)
+    return [(" ".join(spoken[i:i + per]) + " ").encode() for i in range(0, len(spoken), per)]
+
+
+async def serial(chunks, args) -> float:
+    from app.ai import interviewer
+    from app.ai.asr import FakeAsr
+
+    start = time.perf_counter()
+    transcript = await FakeAsr(args.asr_latency * len(chunks)).transcribe(b"".join(chunks))
+    await interviewer.score_answer("Tell me about a hard bug.", transcript)
+    return time.perf_counter() - start
+
+
+async def streaming(chunks, args) -> tuple:
+    from app.ai.ai_client import ai_client
+    from app.ai.asr import FakeAsr
+    from app.ai.voice import VoiceAnswer
+    from app.core.fanout import interview_fanout
+
+    calls = ai_client._fake.calls
+    answer = VoiceAnswer("bench", "q0", "Tell me about a hard bug.", FakeAsr(args.asr_latency),
+                         min_new_words=args.min_new_words)
+    async with interview_fanout.subscribe("bench"):
+        for chunk in chunks + [b""]:
+            sent = time.perf_counter()
+            await answer.feed(chunk)
+            await asyncio.sleep(max(0.0, args.chunk_seconds - (time.perf_counter() - sent)))
+        start = time.perf_counter()
+        await answer.finish()
+        return time.perf_counter() - start, ai_client._fake.calls - calls
+
+
+async def run(args) -> dict:
+    from app.ai.ai_client import ai_client
+
+    ai_client._fake.latency = args.llm_latency
+    chunks = _chunks(args.words, args.chunks)
+    serial_s, streaming_s, calls = [], [], []
+    for _ in range(args.runs):
+        serial_s.append(await serial(chunks, args))
+        elapsed, spent = await streaming(chunks, args)
+        streaming_s.append(elapsed)
+        calls.append(spent)
+    return {
+        "benchmark": "voice_scoring", "words": args.words, "chunks": len(chunks),
+        "asr_latency_s": args.asr_latency, "llm_latency_s": args.llm_latency,
+        "serial_p50_s": round(statistics.median(serial_s), 3),
+        "streaming_p50_s": round(statistics.median(streaming_s), 3),
+        "streaming_llm_calls": statistics.median(calls),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=150)
+    parser.add_argument("--chunks", type=int, default=15)
+    parser.add_argument("--chunk-seconds", type=float, default=0.5)
+    parser.add_argument("--asr-latency", type=float, default=0.08)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--min-new-words", type=int, default=12)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from .scenarios import _configure_offline
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _configure_offline(os.path.join(tmp, "voice.db"))
+        results = asyncio.run(run(args))
+    print(f"serial {results['serial_p50_s']}s, streaming {results['streaming_p50_s']}s", file=sys.stderr)
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Compare two benchmark result files and flag regressions.
+
+Reads the JSON written by ``benchmarks.scenarios``, ``bench_embeddings``,
+``bench_startup`` or ``pytest --benchmark-json`` (micro-benchmarks).
+Numeric results are matched by path; whether lower or higher is better
+follows from the name (``*_ms``/``*_s`` latencies and ``errors`` lower,
+``rps``/``recall*``/``*_per_s`` higher). A metric that moved the wrong way by more than
+``--threshold`` is a regression, and the exit status is 1 if any did.
+
+Usage:
+    cd backend
+    python -m benchmarks.compare baseline.json current.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Optional
+
+IGNORED = {"elapsed_s", "duration_s"}
+
+
+def _direction(key: str) -> Optional[int]:
+    """+1 if higher is better, -1 if lower is better, None if not a metric."""
+    if key in IGNORED:
+        return None
+    if key == "rps" or key.startswith("recall") or key.endswith("_per_s"):
+        return 1
+    if key == "errors" or key.endswith(("_ms", "_s")):
+        return -1
+    return None
+
+
+def _flatten(node, prefix: str, out: Dict[str, float]) -> None:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            path = f"{prefix}.{key}" if prefix else key
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if _direction(key) is not None:
+                    out[path] = value
+            else:
+                _flatten(value, path, out)
+    elif isinstance(node, list):
+        for i, item in enumerate(node):
+            label = str(i)
+            if isinstance(item, dict):
+                if "n" in item:
+                    label = f"n={item['n']}"
+                elif "workers" in item:
+                    label = f"workers={item['workers']}"
+                else:
+                    label = item.get("module", label)
+            _flatten(item, f"{prefix}[{label}]", out)
+
+
+def metrics(results: dict) -> Dict[str, float]:
+    if "benchmarks" in results and "machine_info" in results:  # pytest-benchmark
+        results = {
+            b["name"]: {"median_ms": b["stats"]["median"] * 1000, "mean_ms": b["stats"]["mean"] * 1000}
+            for b in results["benchmarks"]
+        }
+    out: Dict[str, float] = {}
+    _flatten(results, "", out)
+    return out
+
+
+def compare(baseline: dict, current: dict, threshold: float):
+    """Yield (metric, baseline, current, relative change, regressed) for shared metrics."""
+    before, after = metrics(baseline), metrics(current)
+    for path in sorted(before.keys() & after.keys()):
+        old, new = before[path], after[path]
+        better = _direction(path.rsplit(".", 1)[-1])
+        change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+        yield path, old, new, change, change * better < -threshold
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change tolerated (default 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = list(compare(baseline, current, args.threshold))
+    width = max((len(row[0]) for row in rows), default=10)
+    print(f"{baseline.get('commit') or args.baseline} -> {current.get('commit') or args.current}")
+    for path, old, new, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{path:<{width}}  {old:>12.3f}  {new:>12.3f}  {change:>+8.1%}  {flag}")
+    regressions = sum(row[4] for row in rows)
+    print(f"{len(rows)} metrics compared, {regressions} regressed beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
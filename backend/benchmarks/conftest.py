@@ -0,0 +1,7 @@
+import os
+
+# settings are read at import time: no database is touched, and without an
+# API key the LLM client stays on its simulated provider
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ["LLM_PROVIDER"] = "openai"
+os.environ["OPENAI_API_KEY"] = ""
@@ -0,0 +1,26 @@
+"""Deterministic resume / job description text shared by the benchmarks."""
+
+import random
+
+SKILLS = (
+    "python kubernetes postgresql react leadership aws docker java terraform product analytics "
+    "machine-learning design mentoring agile testing fastapi celery redis graphql typescript "
+    "observability incident-response stakeholder roadmap budgeting hiring"
+).split()
+
+FILLER = "led built owned shipped improved reduced migrated designed scaled automated".split()
+
+
+def paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(SKILLS if i % 3 else FILLER) for i in range(words)) + "."
+
+
+def resume_text(words: int = 600, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    bullets = [f"- {paragraph(rng, 25)}" for _ in range(max(1, words // 25))]
+    return "Jane Doe\nSenior Engineer\n\nExperience\n" + "\n".join(bullets)
+
+
+def job_text(words: int = 300, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    return "We are hiring a Senior Engineer.\n\nRequirements:\n" + paragraph(rng, words)
@@ -0,0 +1,89 @@
+"""In-memory stand-ins for external services used by the scenario runner.
+
+The LLM already has one (``LLM_PROVIDER=fake``) and Stripe stays offline
+while ``STRIPE_API_KEY`` is unset; MinIO is replaced by ``FakeMinio``,
+installed in place of ``minio_utils.get_minio_client``. There is no Celery
+broker, so ``skip_enqueue`` replaces the helpers that queue tasks.
+"""
+
+import io
+import threading
+from typing import Dict, Tuple
+
+from minio.error import S3Error
+
+
+async def skip_enqueue(*_args) -> None:
+    """Drop a task that would go to the (absent) Celery broker."""
+
+
+class _Stat:
+    def __init__(self, size: int, content_type: str):
+        self.size = size
+        self.content_type = content_type
+
+
+class _Object:
+    def __init__(self, name: str, size: int):
+        self.object_name = name
+        self.size = size
+
+
+class _Response(io.BytesIO):
+    def release_conn(self) -> None:
+        pass
+
+
+class FakeMinio:
+    """The subset of the ``minio.Minio`` client the app calls, kept in a dict."""
+
+    def __init__(self):
+        self.buckets = set()
+        self.objects: Dict[Tuple[str, str], Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def _missing(self, bucket: str, name: str) -> S3Error:
+        return S3Error("NoSuchKey", "Object does not exist", name, "fake", "fake", None, bucket, name)
+
+    def bucket_exists(self, bucket: str) -> bool:
+        return bucket in self.buckets
+
+    def make_bucket(self, bucket: str) -> None:
+        self.buckets.add(bucket)
+
+    def put_object(self, bucket: str, name: str, data, length: int, content_type: str = "application/octet-stream", **_):
+        with self._lock:
+            self.objects[(bucket, name)] = (data.read(length) if length >= 0 else data.read(), content_type)
+
+    def fput_object(self, bucket: str, name: str, file_path: str, content_type: str = "application/octet-stream", **_):
+        with open(file_path, "rb") as f:
+            self.put_object(bucket, name, f, -1, content_type)
+
+    def fget_object(self, bucket: str, name: str, file_path: str, **_) -> None:
+        with open(file_path, "wb") as f:
+            f.write(self.get_object(bucket, name).read())
+
+    def list_objects(self, bucket: str, prefix: str = "", recursive: bool = False, **_):
+        for (b, name), (data, _) in sorted(self.objects.items()):
+            if b == bucket and name.startswith(prefix):
+                yield _Object(name, len(data))
+
+    def get_object(self, bucket: str, name: str, **_) -> _Response:
+        try:
+            return _Response(self.objects[(bucket, name)][0])
+        except KeyError:
+            raise self._missing(bucket, name)
+
+    def stat_object(self, bucket: str, name: str, **_) -> _Stat:
+        try:
+            data, content_type = self.objects[(bucket, name)]
+        except KeyError:
+            raise self._missing(bucket, name)
+        return _Stat(len(data), content_type)
+
+    def remove_object(self, bucket: str, name: str, **_) -> None:
+        with self._lock:
+            self.objects.pop((bucket, name), None)
+
+    def get_presigned_url(self, method: str, bucket: str, name: str, **_) -> str:
+        return f"http://fake-minio/{bucket}/{name}"
@@ -0,0 +1,257 @@
+"""Scenario load tests for the API: throughput and latency percentiles.
+
+Each scenario is a short user journey run in a closed loop by
+``--concurrency`` virtual users for ``--duration`` seconds, after a
+warm-up period that is not recorded:
+
+- ``login_storm``: POST /auth/login for a pre-registered user (bcrypt-bound)
+- ``upload_burst``: POST /resume/upload of the same ~50 KB text resume (deduplicated after the first)
+- ``interview_session``: create a session, then three question/answer rounds
+- ``ats_batch``: a batch of concurrent POST /ats/score calls per iteration
+
+By default requests go to the ASGI app in-process (no sockets), backed by
+a throwaway SQLite file, the fake LLM provider, an in-memory MinIO and no
+Stripe key, so the numbers measure this code rather than its neighbours.
+``--base-url`` runs the same scenarios against a live server instead
+(e.g. one backed by a local Postgres).
+
+Results are JSON: requests, errors, rps and p50/p95/p99 per scenario and
+per step, plus the git commit they were taken at.
+
+Usage:
+    cd backend
+    python -m benchmarks.scenarios --duration 10 --concurrency 20 > scenarios.json
+    python -m benchmarks.compare baseline-scenarios.json scenarios.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from .corpus import job_text, resume_text
+
+RESUME = resume_text(600)
+JOB = job_text(300)
+UPLOAD = resume_text(6000).encode()
+PASSWORD = "bench-password-123"
+
+
+class Recorder:
+    """Latencies and errors per step, for requests started after ``started_at``."""
+
+    def __init__(self, started_at: float):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.started_at = started_at
+
+    async def request(self, client: httpx.AsyncClient, step: str, method: str, url: str,
+                      expect: int = 200, **kwargs) -> Optional[httpx.Response]:
+        began = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+            ok = resp.status_code == expect
+        except httpx.HTTPError:
+            resp, ok = None, False
+        if began >= self.started_at:
+            self.latencies[step].append(time.perf_counter() - began)
+            if not ok:
+                self.errors[step] += 1
+        return resp
+
+
+def _percentiles(samples: List[float]) -> dict:
+    ms = np.array(samples) * 1000
+    return {f"p{q}_ms": round(float(np.percentile(ms, q)), 3) for q in (50, 95, 99)}
+
+
+def summarize(recorder: Recorder, elapsed: float, iterations: int) -> dict:
+    everything = [s for samples in recorder.latencies.values() for s in samples]
+    if not everything:
+        return {"requests": 0, "errors": 0, "iterations": iterations}
+    return {
+        "requests": len(everything),
+        "errors": sum(recorder.errors.values()),
+        "iterations": iterations,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(everything) / elapsed, 1),
+        **_percentiles(everything),
+        "steps": {
+            step: {"requests": len(samples), "errors": recorder.errors[step], **_percentiles(samples)}
+            for step, samples in sorted(recorder.latencies.items())
+        },
+    }
+
+
+# --- scenarios ---------------------------------------------------------------
+
+async def _setup_login(client: httpx.AsyncClient) -> None:
+    # a 400 means the user exists already (re-run against a live server)
+    await client.post("/auth/register", json={"email": "bench-login@example.com", "password": PASSWORD})
+
+
+async def login_storm(client, rec: Recorder, batch_size: int) -> None:
+    await rec.request(client, "login", "POST", "/auth/login",
+                      json={"email": "bench-login@example.com", "password": PASSWORD})
+
+
+async def _setup_upload(client: httpx.AsyncClient) -> None:
+    await client.post("/auth/register", json={"email": "bench-upload@example.com", "password": PASSWORD})
+    resp = await client.post("/auth/login", json={"email": "bench-upload@example.com", "password": PASSWORD})
+    client.headers["Authorization"] = f"Bearer {resp.json()['access_token']}"
+
+
+async def upload_burst(client, rec: Recorder, batch_size: int) -> None:
+    await rec.request(client, "upload", "POST", "/resume/upload",
+                      files={"file": ("resume.txt", UPLOAD, "text/plain")})
+
+
+async def interview_session(client, rec: Recorder, batch_size: int) -> None:
+    resp = await rec.request(client, "create", "POST", "/interview/session/create",
+                             json={"role": "Backend Engineer", "difficulty": "medium"})
+    if resp is None or resp.status_code != 200:
+        return
+    session = resp.json()["id"]
+    for _ in range(3):
+        await rec.request(client, "next_question", "POST", f"/interview/session/{session}/next_question")
+        await rec.request(client, "submit_answer", "POST", f"/interview/session/{session}/submit_answer",
+                          params={"answer": "I would profile first, then fix the hot path."})
+
+
+async def ats_batch(client, rec: Recorder, batch_size: int) -> None:
+    await asyncio.gather(*(
+        rec.request(client, "score", "POST", "/ats/score", json={"resume": RESUME, "job": JOB})
+        for _ in range(batch_size)
+    ))
+
+
+SCENARIOS = {
+    "login_storm": (login_storm, _setup_login),
+    "upload_burst": (upload_burst, _setup_upload),
+    "interview_session": (interview_session, None),
+    "ats_batch": (ats_batch, None),
+}
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, concurrency: int, duration: float,
+                       warmup: float, batch_size: int) -> dict:
+    iteration, setup = SCENARIOS[name]
+    if setup is not None:
+        await setup(client)
+
+    # recording starts by the clock: in-process requests that never block
+    # would starve a loop timer until the run was over
+    rec = Recorder(time.perf_counter() + warmup)
+    deadline = rec.started_at + duration
+    iterations = 0
+
+    async def virtual_user() -> None:
+        nonlocal iterations
+        while time.perf_counter() < deadline:
+            began = time.perf_counter()
+            await iteration(client, rec, batch_size)
+            iterations += began >= rec.started_at
+            await asyncio.sleep(0)  # let the other virtual users in
+
+    await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+    return summarize(rec, time.perf_counter() - rec.started_at, iterations)
+
+
+# --- offline target ----------------------------------------------------------
+
+def _configure_offline(db_path: str) -> None:
+    # must run before anything imports app.core.config
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ["LLM_PROVIDER"] = "fake"
+    for name in ("OPENAI_API_KEY", "STRIPE_API_KEY", "REDIS_URL", "PROFILING_TOKEN"):
+        os.environ[name] = ""
+    os.environ["TRACING_ENABLED"] = "false"
+
+
+async def _offline_app(llm_latency: float):
+    from app.ai.ai_client import ai_client
+    from app.core import blobs, minio_utils
+    from app.db import models  # noqa: F401  (register tables on Base.metadata)
+    from app.db.database import Base, engine
+    from app.main import app
+
+    from .fakes import FakeMinio, skip_enqueue
+
+    fake_minio = FakeMinio()
+    minio_utils.get_minio_client = lambda: fake_minio
+    blobs.enqueue_indexing = skip_enqueue
+    ai_client._fake.latency = llm_latency
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return app
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60,
+                                   limits=httpx.Limits(max_connections=args.concurrency * args.batch_size))
+    else:
+        client = httpx.AsyncClient(app=await _offline_app(args.llm_latency), base_url="http://bench", timeout=60)
+
+    results = {}
+    async with client:
+        for name in args.scenarios:
+            print(f"running {name}...", file=sys.stderr)
+            results[name] = await run_scenario(client, name, args.concurrency, args.duration,
+                                               args.warmup, args.batch_size)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="recorded seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--batch-size", type=int, default=5, help="concurrent calls per ats_batch iteration")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="fake provider latency (offline only)")
+    parser.add_argument("--base-url", help="run against a live server instead of in-process")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.base_url:
+            _configure_offline(os.path.join(tmp, "bench.db"))
+        scenarios = asyncio.run(run(args))
+
+    results = {
+        "benchmark": "scenarios",
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "scenarios": scenarios,
+    }
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Micro-benchmarks for CPU-bound pieces of the request hot paths.
+
+Usage:
+    cd backend
+    python -m pytest benchmarks --benchmark-json=micro.json
+    python -m benchmarks.compare baseline-micro.json micro.json
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.ai.ai_client import AIClient
+from app.ai.prompt_budget import assemble
+from app.api.job import extract_keywords
+from app.core.security import create_access_token, decode_access_token, get_password_hash, verify_password
+
+from .corpus import job_text, resume_text
+
+RESUME = resume_text(600)
+LONG_RESUME = resume_text(6000)
+JOB = job_text(300)
+
+
+def test_extract_keywords(benchmark):
+    keywords = benchmark(extract_keywords, JOB)
+    assert keywords
+
+
+def test_jwt_encode(benchmark):
+    token = benchmark(create_access_token, {"sub": "bench@example.com", "user_id": 1})
+    assert token.count(".") == 2
+
+
+def test_jwt_verify(benchmark):
+    token = create_access_token({"sub": "bench@example.com", "user_id": 1})
+    assert benchmark(decode_access_token, token)["user_id"] == 1
+
+
+def test_password_verify(benchmark):
+    # bcrypt dominates /auth/login; few rounds, it is deliberately slow
+    hashed = get_password_hash("correct horse battery staple")
+    assert benchmark.pedantic(verify_password, ("correct horse battery staple", hashed), rounds=5)
+
+
+def test_prompt_assembly_within_budget(benchmark):
+    prompt = benchmark(assemble, "ats_v1", job=JOB, resume=RESUME)
+    assert prompt.prompt_id == "ats_v1"
+
+
+def test_prompt_assembly_over_budget(benchmark):
+    # forces relevance-based truncation of the resume
+    prompt = benchmark(assemble, "ats_v1", job=JOB, resume=LONG_RESUME)
+    assert len(prompt.text) < len(LONG_RESUME)
+
+
+def test_ats_score_overhead(benchmark):
+    # simulated provider: measures assembly, resilience bookkeeping and metrics only
+    client = AIClient()
+    loop = asyncio.new_event_loop()
+    try:
+        result = benchmark(lambda: loop.run_until_complete(client.ats_score(RESUME, JOB)))
+    finally:
+        loop.close()
+    assert result["text"]